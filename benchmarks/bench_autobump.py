@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+
+"""
+Measures bverautobump under concurrent publishers.
+
+It builds a synthetic publish directory (under a temporary stand-in for
+$BACKBONE_ROOT, using a stubbed binstall that copies the published
+configs as a release would) and runs N bverautobump workloads at the same
+time (each one in its own process, bumping a varying number of softwares).
+
+Each workload reports the time spent waiting for the lock, assigning
+the versions (including the index/manifest), bumping the bver version and
+installing (binstall), its end-to-end latency and the files/bytes it
+wrote. The report contains the p50/p99 of each measurement, the
+throughput and the number of overlapping critical sections (publishers
+holding the lock at the same time).
+
+Usage: python benchmarks/bench_autobump.py [--workers N] [--rounds N] [--sizes 1,10,100]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import builtins
+import subprocess
+import importlib.util
+import importlib.machinery
+
+rootDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+autoBumpFilePath = os.path.join(rootDirectory, 'src', 'bin', 'bverautobump')
+phases = ['lock', 'assign', 'bump', 'install']
+
+stubBinstall = '''#!/bin/bash
+# stand-in for binstall: copying the published configs as a release would
+version=$(grep -Po "\\"version\\": *\\K\\"[^\\"]*\\"" info.json | cut -d '"' -f 2)
+target="$BACKBONE_ROOT/releases/$version-$$"
+mkdir -p "$target"
+cp -r src info.json "$target"
+'''
+
+def createPublishDirectory(backboneRoot, softwareCount, fileCount):
+    """
+    Create a synthetic publish directory returning its path.
+
+    Every 5th software uses inline versions and every 10th a ".versions" directory.
+    """
+    publishDirectory = os.path.join(backboneRoot, 'configs', 'bver', 'publish')
+    versionsDirectory = os.path.join(publishDirectory, 'src', 'versions')
+    os.makedirs(versionsDirectory)
+
+    with open(os.path.join(publishDirectory, 'info.json'), 'w') as f:
+        json.dump({'name': 'bver-config', 'type': 'config', 'version': '1.0.0'}, f, indent=4, sort_keys=True)
+
+    with open(os.path.join(publishDirectory, 'binstall'), 'w') as f:
+        f.write(stubBinstall)
+
+    contents = [{} for _ in range(fileCount)]
+    for index in range(softwareCount):
+        name = softwareName(index)
+        if index % 10 == 0:
+            splitDirectory = os.path.join(versionsDirectory, '{0}.versions'.format(name))
+            os.makedirs(splitDirectory)
+            with open(os.path.join(splitDirectory, '1.0.0.json'), 'w') as f:
+                json.dump({'options': {'foo': index}}, f)
+            contents[index % fileCount][name] = {'active': '1.0.0', 'versions': '{0}.versions'.format(name)}
+        elif index % 5 == 0:
+            contents[index % fileCount][name] = {'active': '1.0.0', 'versions': {'1.0.0': {'options': {'foo': index}}}}
+        else:
+            contents[index % fileCount][name] = '1.0.0'
+
+    for index, content in enumerate(contents):
+        with open(os.path.join(versionsDirectory, 'group{0}.json'.format(index)), 'w') as f:
+            json.dump(content, f, indent=4, sort_keys=True)
+
+    return publishDirectory
+
+def softwareName(index):
+    """
+    Return the name of a synthetic software.
+    """
+    return 'software{0}'.format(index)
+
+def percentile(values, ratio):
+    """
+    Return the nearest rank percentile of a list of values.
+    """
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(ratio * len(values) + 0.5)) - 1))]
+
+def runWorker(spec):
+    """
+    Run a single bverautobump workload writing its measurements to the result file of the spec.
+    """
+    loader = importlib.machinery.SourceFileLoader('bverautobump', autoBumpFilePath)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader('bverautobump', loader))
+    loader.exec_module(module)
+    BverAutoBump = module.BverAutoBump
+
+    timings = dict((x, 0.0) for x in phases)
+    criticalSection = {}
+    bytesWritten = [0]
+    filesWritten = [0]
+
+    def timed(phase, function):
+        def wrapper(*args, **kwargs):
+            startTime = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings[phase] += time.time() - startTime
+                if phase == 'lock':
+                    criticalSection['start'] = time.time()
+        return wrapper
+
+    def unlock(function):
+        def wrapper(*args, **kwargs):
+            criticalSection['end'] = time.time()
+            return function(*args, **kwargs)
+        return wrapper
+
+    BverAutoBump.lock = staticmethod(timed('lock', BverAutoBump.lock))
+    BverAutoBump.unlock = staticmethod(unlock(BverAutoBump.unlock))
+    for phase, methodName in [('assign', '_BverAutoBump__assignResourceVersions'), ('assign', '_BverAutoBump__writeManifest'), ('bump', '_BverAutoBump__bumpBver'), ('install', '_BverAutoBump__installBver')]:
+        setattr(BverAutoBump, methodName, timed(phase, getattr(BverAutoBump, methodName)))
+
+    # counting the bytes written through python
+    originalOpen = builtins.open
+    originalFdOpen = os.fdopen
+    originalCopyFile = shutil.copyfile
+
+    def countingOpen(function):
+        def wrapper(*args, **kwargs):
+            result = function(*args, **kwargs)
+            mode = args[1] if len(args) > 1 else kwargs.get('mode', 'r')
+            if isinstance(mode, str) and any(x in mode for x in 'wax+'):
+                filesWritten[0] += 1
+                return CountingFile(result, bytesWritten)
+            return result
+        return wrapper
+
+    def countingCopyFile(source, target, *args, **kwargs):
+        result = originalCopyFile(source, target, *args, **kwargs)
+        bytesWritten[0] += os.path.getsize(target)
+        filesWritten[0] += 1
+        return result
+
+    while time.time() < spec['startAt']:
+        time.sleep(0.001)
+
+    startTime = time.time()
+    builtins.open = countingOpen(originalOpen)
+    os.fdopen = countingOpen(originalFdOpen)
+    shutil.copyfile = countingCopyFile
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    error = None
+    try:
+        BverAutoBump(spec['versions'])
+    except Exception as err:
+        # failures are reported (for instance, caused by a race on the lock)
+        error = '{0}: {1}'.format(type(err).__name__, err)
+    finally:
+        sys.stdout = stdout
+        builtins.open = originalOpen
+        os.fdopen = originalFdOpen
+        shutil.copyfile = originalCopyFile
+    endTime = time.time()
+
+    # the release copy is done by binstall (outside of python)
+    with open(spec['resultFile'], 'w') as f:
+        json.dump(
+            {
+                'timings': timings,
+                'total': endTime - startTime,
+                'start': criticalSection.get('start'),
+                'end': criticalSection.get('end'),
+                'bytes': bytesWritten[0],
+                'files': filesWritten[0],
+                'size': len(spec['versions']),
+                'error': error
+            },
+            f
+        )
+
+class CountingFile(object):
+    """
+    Proxy of a file object counting the bytes written to it.
+    """
+
+    def __init__(self, fileObject, counter):
+        """
+        Create a counting file object.
+        """
+        self.__fileObject = fileObject
+        self.__counter = counter
+
+    def write(self, data):
+        """
+        Write the data counting its size.
+        """
+        self.__counter[0] += len(data.encode('utf-8') if isinstance(data, str) else data)
+        return self.__fileObject.write(data)
+
+    def __getattr__(self, name):
+        """
+        Delegate to the file object.
+        """
+        return getattr(self.__fileObject, name)
+
+    def __enter__(self):
+        """
+        Enter the file object context returning the proxy.
+        """
+        self.__fileObject.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        """
+        Exit the file object context.
+        """
+        return self.__fileObject.__exit__(*args)
+
+def runRound(backboneRoot, publishDirectory, workers, sizes, softwareCount, roundIndex):
+    """
+    Run the workloads of a round concurrently returning their measurements.
+    """
+    env = dict(os.environ)
+    env.update({
+        'BACKBONE_ROOT': backboneRoot,
+        'BACKBONE_USER': 'bench',
+        'BACKBONE_BASH_EXECUTABLE': shutil.which('bash') or '/bin/bash',
+        'BVER_AUTO_BUMP_BASE_PUBLISH_DIRECTORY': publishDirectory,
+        'PYTHONPATH': os.pathsep.join(filter(None, [os.path.join(rootDirectory, 'src', 'lib'), os.environ.get('PYTHONPATH')]))
+    })
+
+    startAt = time.time() + 1.0
+    processes = []
+    for workerIndex in range(workers):
+        size = sizes[workerIndex % len(sizes)]
+        versions = {}
+        for offset in range(size):
+            index = (workerIndex * size + offset) % softwareCount
+            versions[softwareName(index)] = '2.{0}.{1}'.format(roundIndex, workerIndex)
+
+        resultFile = os.path.join(backboneRoot, 'result-{0}-{1}.json'.format(roundIndex, workerIndex))
+        spec = {'versions': versions, 'startAt': startAt, 'resultFile': resultFile}
+        processes.append((
+            resultFile,
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--worker', json.dumps(spec)],
+                env=env,
+                stdout=subprocess.DEVNULL
+            )
+        ))
+
+    results = []
+    for resultFile, process in processes:
+        process.wait()
+        if os.path.exists(resultFile):
+            with open(resultFile) as f:
+                results.append(json.load(f))
+        else:
+            results.append({'error': 'worker exited with code {0}'.format(process.returncode)})
+
+    return (results, time.time() - startAt)
+
+def countOverlaps(results):
+    """
+    Return the number of critical sections (lock held) overlapping another one.
+    """
+    sections = sorted((x['start'], x['end']) for x in results if x.get('start') and x.get('end'))
+    overlaps = 0
+    latestEnd = None
+    for start, end in sections:
+        if latestEnd is not None and start < latestEnd:
+            overlaps += 1
+        latestEnd = end if latestEnd is None else max(latestEnd, end)
+
+    return overlaps
+
+def report(allResults, wallTime, overlaps):
+    """
+    Output the measurements (of the successful workloads) and the failures.
+    """
+    results = [x for x in allResults if not x['error']]
+    errors = [x['error'] for x in allResults if x['error']]
+
+    sys.stdout.write('{0:<14}{1:>12}{2:>12}\n'.format('', 'p50 (ms)', 'p99 (ms)'))
+    for label, values in [(x, [y['timings'][x] for y in results]) for x in phases] + [('end-to-end', [x['total'] for x in results])]:
+        sys.stdout.write(
+            '{0:<14}{1:>12.1f}{2:>12.1f}\n'.format(
+                label,
+                percentile(values, 0.5) * 1000.0,
+                percentile(values, 0.99) * 1000.0
+            )
+        )
+
+    bumps = len(results)
+    bytesWritten = [x['bytes'] for x in results]
+    sys.stdout.write('bumps: {0} ({1} failed), softwares bumped: {2}\n'.format(bumps, len(errors), sum(x['size'] for x in results)))
+    sys.stdout.write('throughput: {0:.2f} bumps/s (wall time {1:.2f}s)\n'.format(bumps / wallTime if wallTime else 0.0, wallTime))
+    sys.stdout.write(
+        'bytes written: {0} total, {1} p50 per bump, {2} p99 per bump\n'.format(
+            sum(bytesWritten),
+            percentile(bytesWritten, 0.5),
+            percentile(bytesWritten, 0.99)
+        )
+    )
+    filesWritten = [x['files'] for x in results]
+    sys.stdout.write(
+        'files written: {0} total, {1} p50 per bump, {2} p99 per bump\n'.format(
+            sum(filesWritten),
+            percentile(filesWritten, 0.5),
+            percentile(filesWritten, 0.99)
+        )
+    )
+    sys.stdout.write('overlapping critical sections: {0}\n'.format(overlaps))
+    for error in sorted(set(errors)):
+        sys.stdout.write('failure ({0}x): {1}\n'.format(errors.count(error), error))
+
+
+parser = argparse.ArgumentParser(
+    description='Measures bverautobump under concurrent publishers'
+)
+
+parser.add_argument(
+    '--workers',
+    metavar='n',
+    default=4,
+    type=int,
+    help='number of concurrent bverautobump workloads per round (default: 4)'
+)
+
+parser.add_argument(
+    '--rounds',
+    metavar='n',
+    default=2,
+    type=int,
+    help='number of rounds (default: 2)'
+)
+
+parser.add_argument(
+    '--sizes',
+    metavar='s',
+    default='1,10,100',
+    type=str,
+    help='comma separated list with the number of softwares bumped by each workload (cycled among the workers, default: 1,10,100)'
+)
+
+parser.add_argument(
+    '--softwares',
+    metavar='n',
+    default=1000,
+    type=int,
+    help='number of softwares in the synthetic publish directory (default: 1000)'
+)
+
+parser.add_argument(
+    '--files',
+    metavar='n',
+    default=20,
+    type=int,
+    help='number of json files holding the softwares (default: 20)'
+)
+
+parser.add_argument(
+    '--worker',
+    metavar='spec',
+    default=None,
+    help=argparse.SUPPRESS
+)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        runWorker(json.loads(args.worker))
+        sys.exit(0)
+
+    backboneRoot = tempfile.mkdtemp(prefix='bver-bench-')
+    try:
+        publishDirectory = createPublishDirectory(backboneRoot, args.softwares, args.files)
+        sizes = [int(x) for x in args.sizes.split(',') if x]
+
+        results = []
+        wallTime = 0.0
+        overlaps = 0
+        for roundIndex in range(args.rounds):
+            roundResults, roundTime = runRound(
+                backboneRoot,
+                publishDirectory,
+                args.workers,
+                sizes,
+                args.softwares,
+                roundIndex
+            )
+            results.extend(roundResults)
+            wallTime += roundTime
+            overlaps += countOverlaps(roundResults)
+
+        sys.stdout.write(
+            '{0} workers x {1} rounds, sizes {2}, {3} softwares in {4} files\n'.format(
+                args.workers,
+                args.rounds,
+                sizes,
+                args.softwares,
+                args.files
+            )
+        )
+        report(results, wallTime, overlaps)
+    finally:
+        shutil.rmtree(backboneRoot, ignore_errors=True)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""
+Compares the installed json backends (@see bver.JsonBackend).
+
+It reports, for each backend, the time spent decoding a synthetic config
+file from str, bytes and mmap, plus loading a synthetic config directory
+through the JsonLoader. The encoded output is verified to be identical
+among the backends.
+
+Usage: python benchmarks/bench_json.py [--softwares N] [--files N] [--repeat N]
+"""
+
+import os
+import sys
+import json
+import mmap
+import timeit
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'lib'))
+
+import bver  # noqa: E402
+
+def createConfigDirectory(directory, softwareCount, fileCount):
+    """
+    Write a synthetic config directory.
+    """
+    contents = [{} for _ in range(fileCount)]
+    for index in range(softwareCount):
+        name = 'software{0}'.format(index)
+        contents[index % fileCount][name] = {
+            'active': '1.{0}.0'.format(index % 5),
+            'versions': dict(
+                (
+                    '1.{0}.0'.format(version),
+                    {
+                        'options': {'foo': index, 'label': 'software {0}'.format(index), 'ratio': index / 7.0},
+                        'addons': {'software{0}'.format((index + 1) % softwareCount): {'options': {'enabled': bool(version % 2)}}}
+                    }
+                ) for version in range(5)
+            )
+        }
+
+    for index, content in enumerate(contents):
+        with open(os.path.join(directory, 'group{0}.json'.format(index)), 'w') as f:
+            json.dump(content, f, indent=4, sort_keys=True)
+
+def measure(label, function, repeat):
+    """
+    Output the best time of a function.
+    """
+    sys.stdout.write(
+        '{0:<28}{1:>12.2f}\n'.format(
+            label,
+            min(timeit.repeat(function, number=1, repeat=repeat)) * 1000.0
+        )
+    )
+
+
+parser = argparse.ArgumentParser(
+    description='Compares the installed json backends'
+)
+
+parser.add_argument(
+    '--softwares',
+    metavar='n',
+    default=5000,
+    type=int,
+    help='number of softwares in the synthetic config (default: 5000)'
+)
+
+parser.add_argument(
+    '--files',
+    metavar='n',
+    default=20,
+    type=int,
+    help='number of json files holding the softwares (default: 20)'
+)
+
+parser.add_argument(
+    '--repeat',
+    metavar='n',
+    default=5,
+    type=int,
+    help='number of times each measurement is repeated (default: 5)'
+)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        createConfigDirectory(directory, args.softwares, args.files)
+        filePath = os.path.join(directory, 'group0.json')
+        with open(filePath, 'rb') as f:
+            encoded = f.read()
+        text = encoded.decode('utf-8')
+
+        sys.stdout.write(
+            '{0} softwares in {1} files ({2} bytes per file)\n'.format(
+                args.softwares,
+                args.files,
+                len(encoded)
+            )
+        )
+        sys.stdout.write('{0:<28}{1:>12}\n'.format('', 'best (ms)'))
+
+        outputs = set()
+        for name in bver.JsonBackend.availableBackends():
+            jsonBackend = bver.JsonBackend.backend(name)
+
+            measure('{0}: decode str'.format(name), lambda: jsonBackend.loads(text), args.repeat)
+            measure('{0}: decode bytes'.format(name), lambda: jsonBackend.loads(encoded), args.repeat)
+
+            with open(filePath, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mappedData:
+                    measure('{0}: decode mmap'.format(name), lambda: jsonBackend.loads(mappedData), args.repeat)
+
+            measure(
+                '{0}: JsonLoader directory'.format(name),
+                lambda: bver.Loader.JsonLoader(jsonBackend).addFromJsonDirectory(directory),
+                args.repeat
+            )
+
+            outputs.add(jsonBackend.dumps(jsonBackend.loads(encoded), indent=4, sortKeys=True))
+
+        sys.stdout.write('identical output: {0}\n'.format('yes' if len(outputs) == 1 and outputs.pop().encode('utf-8') == encoded else 'no'))
+    finally:
+        shutil.rmtree(directory)
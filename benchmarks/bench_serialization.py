@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+"""
+Compares the serialization of the resolved softwares against pickle.
+
+It reports the time spent serializing/deserializing a synthetic catalog
+(plus the payload size) for:
+    - pickle: pickling the software/addon instances
+    - table: the resolved table serialization (@see bver.ResolvedTable.serialize)
+    - table (slice): deserializing only a subset of the softwares
+
+Usage: python benchmarks/bench_serialization.py [--softwares N] [--addons N]
+"""
+
+import os
+import sys
+import pickle
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'lib'))
+
+import bver  # noqa: E402
+
+def createLoader(softwareCount, addonCount):
+    """
+    Return a loader containing a synthetic catalog.
+    """
+    loader = bver.Loader.Loader()
+    with loader.batch():
+        for index in range(softwareCount):
+            loader.addSoftwareInfo(
+                'software{0}'.format(index),
+                '{0}.{1}.{2}'.format(index % 7, index % 13, index),
+                {'foo': index, 'label': 'software {0}'.format(index)}
+            )
+
+        for index in range(softwareCount):
+            for addonIndex in range(addonCount):
+                loader.addAddonInfo(
+                    'software{0}'.format(index),
+                    'software{0}'.format((index + addonIndex + 1) % softwareCount),
+                    {'enabled': bool(addonIndex % 2)}
+                )
+
+    return loader
+
+def measure(label, serialize, deserialize, repeat):
+    """
+    Output the average serialization/deserialization time and the payload size.
+    """
+    data = serialize()
+    serializeTime = min(timeit.repeat(serialize, number=1, repeat=repeat))
+    deserializeTime = min(timeit.repeat(lambda: deserialize(data), number=1, repeat=repeat))
+
+    sys.stdout.write(
+        '{0:<16}{1:>12.2f}{2:>14.2f}{3:>12}\n'.format(
+            label,
+            serializeTime * 1000.0,
+            deserializeTime * 1000.0,
+            len(data)
+        )
+    )
+
+
+parser = argparse.ArgumentParser(
+    description='Compares the serialization of the resolved softwares against pickle'
+)
+
+parser.add_argument(
+    '--softwares',
+    metavar='n',
+    default=5000,
+    type=int,
+    help='number of softwares in the synthetic catalog (default: 5000)'
+)
+
+parser.add_argument(
+    '--addons',
+    metavar='n',
+    default=3,
+    type=int,
+    help='number of addons per software (default: 3)'
+)
+
+parser.add_argument(
+    '--repeat',
+    metavar='n',
+    default=5,
+    type=int,
+    help='number of times each measurement is repeated (the best is reported, default: 5)'
+)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    loader = createLoader(args.softwares, args.addons)
+    table = loader.resolvedTable()
+    softwares = table.softwares()
+    sliceNames = table.names()[::100]
+
+    sys.stdout.write('{0} softwares, {1} addons per software\n'.format(args.softwares, args.addons))
+    sys.stdout.write('{0:<16}{1:>12}{2:>14}{3:>12}\n'.format('', 'dumps (ms)', 'loads (ms)', 'bytes'))
+
+    measure(
+        'pickle',
+        lambda: pickle.dumps(softwares, pickle.HIGHEST_PROTOCOL),
+        pickle.loads,
+        args.repeat
+    )
+
+    measure(
+        'table',
+        table.serialize,
+        bver.ResolvedTable.deserialize,
+        args.repeat
+    )
+
+    measure(
+        'table+objects',
+        table.serialize,
+        lambda x: bver.ResolvedTable.deserialize(x).softwares(validate=False),
+        args.repeat
+    )
+
+    measure(
+        'table (slice)',
+        table.serialize,
+        lambda x: bver.ResolvedTable.deserialize(x, sliceNames),
+        args.repeat
+    )
@@ -0,0 +1,214 @@
+import os
+from collections import namedtuple
+from . import JsonBackend
+from .Versioned import Versioned
+from .Loader import JsonLoader
+
+class CheckError(namedtuple('CheckError', ['fileName', 'softwareName', 'errorType', 'message'])):
+    """
+    Error found when checking a json file.
+
+    The softwareName is None when the error is about the file itself.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        """
+        Return the error formatted as "<file>: [<software>: ]<type>: <message>".
+        """
+        location = self.fileName
+        if self.softwareName is not None:
+            location = '{0}: {1}'.format(location, self.softwareName)
+
+        return '{0}: {1}: {2}'.format(location, self.errorType, self.message)
+
+class Checker(object):
+    """
+    Validates json files used by the JsonLoader reporting every error at once.
+
+    The files are checked in parallel (through a process pool) for the root
+    type, the version format, the options, the addon contents and the
+    versioned names.
+    Every version of a software is checked (not only the active one).
+    Once all files are checked the addon references are resolved against
+    the softwares found among all files (dangling addons are reported as
+    AddonNotFoundError).
+    """
+
+    def __init__(self, processes=None):
+        """
+        Create a checker object.
+
+        The processes define the size of the process pool (by default the
+        number of cpus).
+        """
+        self.__processes = processes or os.cpu_count() or 1
+
+    def processes(self):
+        """
+        Return the number of processes used to check the files.
+        """
+        return self.__processes
+
+    def check(self, paths, recursive=False):
+        """
+        Return a list of errors (@see CheckError) found in the json files of the paths.
+
+        The paths are collected by {@link JsonLoader.jsonFiles}. The errors
+        follow the order of the files (paths that could not be found are
+        reported first).
+        """
+        jsonFiles = JsonLoader.jsonFiles(paths, recursive)
+
+        # checking the files
+        if self.__processes > 1 and len(jsonFiles) > 1:
+            # imported on demand (expensive import)
+            from concurrent.futures import ProcessPoolExecutor
+
+            workers = min(self.__processes, len(jsonFiles))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    Checker.checkFile,
+                    jsonFiles,
+                    chunksize=max(1, len(jsonFiles) // (workers * 4))
+                ))
+        else:
+            results = list(map(Checker.checkFile, jsonFiles))
+
+        # collecting the errors and resolving the addons among all files
+        result = [
+            CheckError(x, None, 'InvalidFileError', 'Could not find path "{0}"'.format(x))
+            for x in paths if not os.path.exists(x)
+        ]
+        softwareNames = set()
+        for fileErrors, fileSoftwareNames, fileAddonReferences in results:
+            result.extend(fileErrors)
+            softwareNames.update(fileSoftwareNames)
+
+        for fileName, (fileErrors, fileSoftwareNames, fileAddonReferences) in zip(jsonFiles, results):
+            for softwareName, addonName in fileAddonReferences:
+                if addonName in softwareNames:
+                    continue
+
+                result.append(CheckError(
+                    fileName,
+                    softwareName,
+                    'AddonNotFoundError',
+                    'Could not find a version for the addon "{0}" for the software: "{1}"'.format(
+                        addonName,
+                        softwareName
+                    )
+                ))
+
+        order = dict((fileName, index) for index, fileName in enumerate(jsonFiles))
+        result.sort(key=lambda x: order.get(x.fileName, -1))
+
+        return result
+
+    @staticmethod
+    def checkFile(fileName):
+        """
+        Check a single json file.
+
+        Return a tuple containing the list of errors, the list of software
+        names and the list of addon references (software name, addon name)
+        found in the file.
+        """
+        errors = []
+        softwareNames = []
+        addonReferences = []
+
+        try:
+            contents = JsonBackend.backend().loadFile(fileName)
+        except Exception as err:
+            errors.append(CheckError(fileName, None, type(err).__name__, str(err)))
+            return (errors, softwareNames, addonReferences)
+
+        if not isinstance(contents, dict):
+            errors.append(
+                CheckError(
+                    fileName,
+                    None,
+                    'UnexpectedRootContentError',
+                    'Expecting object as root!'
+                )
+            )
+            return (errors, softwareNames, addonReferences)
+
+        baseDirectory = os.path.dirname(fileName)
+        for softwareName, softwareContents in contents.items():
+            loader = JsonLoader()
+            try:
+                # creating the software instance validates the name and version
+                loader.addFromContents(
+                    {softwareName: softwareContents},
+                    ignoreAddons=True,
+                    baseDirectory=baseDirectory
+                )
+                loader.softwares()
+
+                loader.addFromContents(
+                    {softwareName: softwareContents},
+                    baseDirectory=baseDirectory
+                )
+            except Exception as err:
+                errors.append(CheckError(fileName, softwareName, type(err).__name__, str(err)))
+                continue
+
+            softwareNames.append(softwareName)
+            for addonName in loader.addonNames(softwareName):
+                addonReferences.append((softwareName, addonName))
+
+            # checking the other versions (the addons of all versions are resolved)
+            for version in Checker.__inactiveVersions(softwareContents, baseDirectory):
+                versionEnv = {Versioned.toBverName(softwareName): version}
+                versionLoader = JsonLoader()
+                try:
+                    versionLoader.addFromContents(
+                        {softwareName: softwareContents},
+                        versionEnv,
+                        ignoreAddons=True,
+                        baseDirectory=baseDirectory
+                    )
+                    versionLoader.softwares()
+
+                    versionLoader.addFromContents(
+                        {softwareName: softwareContents},
+                        versionEnv,
+                        baseDirectory=baseDirectory
+                    )
+                except Exception as err:
+                    errors.append(CheckError(
+                        fileName,
+                        softwareName,
+                        type(err).__name__,
+                        'version "{0}": {1}'.format(version, err)
+                    ))
+                    continue
+
+                for addonName in versionLoader.addonNames(softwareName):
+                    if (softwareName, addonName) not in addonReferences:
+                        addonReferences.append((softwareName, addonName))
+
+        return (errors, softwareNames, addonReferences)
+
+    @staticmethod
+    def __inactiveVersions(softwareContents, baseDirectory):
+        """
+        Return a sorted list with the versions of a software other than the active one.
+
+        @private
+        """
+        versions = softwareContents.get('versions') if isinstance(softwareContents, dict) else None
+        if isinstance(versions, dict):
+            versionNames = list(versions.keys())
+        elif isinstance(versions, str) and os.path.isdir(os.path.join(baseDirectory, versions)):
+            versionNames = [
+                x[:-len('.json')] for x in os.listdir(os.path.join(baseDirectory, versions))
+                if x.endswith('.json') and not x.startswith('.')
+            ]
+        else:
+            return []
+
+        return sorted(x for x in versionNames if x != softwareContents.get('active'))
@@ -0,0 +1,247 @@
+import os
+import sys
+import threading
+from .Versioned import Versioned
+from .EnvSnapshot import EnvSnapshot
+from .Loader import JsonLoader
+
+class InvalidConfigRootError(Exception):
+    """Invalid config root error."""
+
+class InvalidModeError(Exception):
+    """Invalid mode error."""
+
+class EnvBuilder(object):
+    """
+    Builds the environment of child processes in-process.
+
+    It reproduces the environment produced by sourcing the init script
+    (running bvervars) on top of a base environment: the bver variables are
+    resolved from the config paths ($BVER_CONFIG_PATH in reverse order
+    followed by $BVER_CONFIG_ROOT), where the "dont_override" mode
+    ($BVER_INIT_MODE=DONT_OVERRIDE) keeps the variables already defined by
+    the base environment. The compact mode ($BVER_INIT_COMPACT), the base
+    layer cache ($BVER_INIT_BASE_CACHE, @see JsonLoader.addFromCachedJsonPaths)
+    and the sync of the node-local mirrors ($BVER_INIT_SYNC along with
+    $BVER_MIRROR_ROOT, @see Mirror.sync) are supported as well. The
+    locations of the caches and of the mirror being read follow the
+    environment of the current process (as the loader does).
+
+    The latency budget ($BVER_INIT_LATENCY_BUDGET) is not supported: the
+    catalogs are cached in memory, therefore the config is read once
+    (without a budget) and a warning is written when it's defined.
+
+    The resolved catalog of each list of paths is cached (until it gets
+    refreshed), therefore building an environment is a loop over the
+    cached variables merged into a copy of the base environment. The last
+    path ($BVER_CONFIG_ROOT) is loaded once as the base layer shared by
+    the catalogs (@see Loader.overlay), so catalogs of different config
+    paths only load their own paths.
+    """
+
+    modes = ('override', 'dont_override')
+    __enabledDefault = '1'
+
+    def __init__(self):
+        """
+        Create an env builder object.
+        """
+        self.__catalogs = {}
+        self.__baseLayers = {}
+        self.__lock = threading.Lock()
+
+    def build(self, baseEnv, paths=None, mode=None, refresh=False):
+        """
+        Return a new dict with the base environment updated by the bver variables.
+
+        The paths default to the ones used by the init script (@see configPaths)
+        and the mode defaults to the one defined by $BVER_INIT_MODE. When
+        refresh is specified the config paths are loaded again.
+        """
+        if paths is None:
+            paths = self.configPaths(baseEnv)
+
+        if mode is None:
+            mode = 'dont_override' if baseEnv.get('BVER_INIT_MODE') == 'DONT_OVERRIDE' else 'override'
+
+        if mode not in self.modes:
+            raise InvalidModeError(
+                'Invalid mode "{0}" (expected: {1})'.format(mode, ', '.join(self.modes))
+            )
+
+        items, enabledNames = self.__catalog(paths, baseEnv, refresh)
+        if baseEnv.get('BVER_INIT_COMPACT'):
+            items, enabledNames = self.__compactItems(baseEnv, items, enabledNames)
+
+        # addons enabled by default are only defined when the base
+        # environment disagrees with them (@see ResolvedTable.iterEnvItems)
+        items = items + [
+            (x, self.__enabledDefault) for x in enabledNames.intersection(baseEnv) if baseEnv[x] != self.__enabledDefault
+        ]
+
+        if baseEnv.get('BVER_STALE', '0') != '0':
+            items.append(('BVER_STALE', '0'))
+
+        dontOverride = mode == 'dont_override'
+        result = dict(baseEnv)
+        for name, value in self.__initItems(result):
+            result[name] = value
+
+        for name, value in items:
+            currentValue = result.get(name)
+            if dontOverride and currentValue or currentValue == value:
+                continue
+
+            result[name] = value
+
+        return result
+
+    def refresh(self, paths=None):
+        """
+        Drop the cached catalog of the paths (all catalogs when paths are not specified).
+
+        The base layer of the paths is dropped as well.
+        """
+        with self.__lock:
+            if paths is None:
+                self.__catalogs.clear()
+                self.__baseLayers.clear()
+            else:
+                self.__catalogs.pop(tuple(paths), None)
+                self.__baseLayers.pop(tuple(paths[-1:]), None)
+
+    @staticmethod
+    def configPaths(env):
+        """
+        Return the list of config paths used by the init script.
+
+        It's $BVER_CONFIG_PATH in reverse order followed by $BVER_CONFIG_ROOT
+        (paths loaded later take precedence).
+        """
+        configRoot = env.get('BVER_CONFIG_ROOT', '')
+        if not os.path.isdir(configRoot):
+            raise InvalidConfigRootError(
+                'Could not find directory defined by $BVER_CONFIG_ROOT'
+            )
+
+        paths = [x for x in env.get('BVER_CONFIG_PATH', '').split(os.pathsep) if x]
+        return list(reversed(paths)) + [configRoot]
+
+    def __catalog(self, paths, baseEnv, refresh):
+        """
+        Return a tuple (env items, names of the addons enabled by default) for the paths.
+
+        @private
+        """
+        key = tuple(paths)
+        with self.__lock:
+            if not refresh and key in self.__catalogs:
+                return self.__catalogs[key]
+
+            if baseEnv.get('BVER_INIT_LATENCY_BUDGET'):
+                sys.stderr.write(
+                    'bver warning: $BVER_INIT_LATENCY_BUDGET is not supported when building the env in-process, ignoring it\n'
+                )
+
+            # refreshing the node-local mirrors is a best effort (as the init
+            # script does), directories without a manifest are read from the server
+            if baseEnv.get('BVER_INIT_SYNC') and baseEnv.get('BVER_MIRROR_ROOT'):
+                # imported on demand (expensive import)
+                from .Mirror import Mirror
+
+                mirror = Mirror(baseEnv['BVER_MIRROR_ROOT'])
+                for path in paths:
+                    try:
+                        mirror.sync(path)
+                    except Exception:
+                        pass
+
+            # the last path takes precedence over the others (@see configPaths)
+            baseKey = tuple(paths[-1:])
+            if refresh or baseKey not in self.__baseLayers:
+                baseLoader = JsonLoader()
+                if baseEnv.get('BVER_INIT_BASE_CACHE'):
+                    baseLoader.addFromCachedJsonPaths(baseKey)
+                else:
+                    baseLoader.addFromJsonPaths(baseKey)
+                self.__baseLayers[baseKey] = baseLoader
+
+            loader = self.__baseLayers[baseKey].overlay(basePrecedence=True)
+            loader.addFromJsonPaths(paths[:-1])
+            table = loader.resolvedTable()
+
+            enabledNames = set()
+            for softwareName in table.names():
+                for addonName, addonVersion, addonEnabled in table.addonEdges(softwareName):
+                    if addonEnabled:
+                        enabledNames.add(
+                            'BVER_{}_{}_ENABLED'.format(softwareName.upper(), addonName.upper())
+                        )
+
+            self.__catalogs[key] = (list(table.iterEnvItems()), frozenset(enabledNames))
+
+            return self.__catalogs[key]
+
+    @staticmethod
+    def __compactItems(baseEnv, items, enabledNames):
+        """
+        Return the items and enabled names used by the compact mode (@see EnvSnapshot).
+
+        @private
+        """
+        exportNames = [x for x in baseEnv.get('BVER_SNAPSHOT_EXPORT', '').split(',') if x]
+        exportNames = set(exportNames).union(map(Versioned.toBverName, exportNames))
+
+        handle = EnvSnapshot.write(
+            items,
+            directory=baseEnv.get('BVER_SNAPSHOT_DIR'),
+            inline=bool(baseEnv.get('BVER_SNAPSHOT_INLINE'))
+        )
+
+        return (
+            [(EnvSnapshot.envName, handle)] + [x for x in items if x[0] in exportNames],
+            enabledNames.intersection(exportNames)
+        )
+
+    @staticmethod
+    def __initItems(env):
+        """
+        Return the variables defined by the init script to expose the bver commands and library.
+
+        @private
+        """
+        libDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        # imported from the single-file archive of the library (lib/bver.zip)
+        if os.path.isfile(libDirectory):
+            libDirectory = os.path.dirname(libDirectory)
+
+        binDirectory = os.path.join(os.path.dirname(libDirectory), 'bin')
+        if not os.path.isdir(binDirectory) or env.get('BVER_BIN_PATH') == binDirectory:
+            return []
+
+        # imported on demand (expensive import)
+        from .LibArchive import LibArchive
+
+        # preferring the archive (as the init script does)
+        pythonPath = libDirectory
+        if os.path.isfile(os.path.join(libDirectory, LibArchive.fileName)):
+            pythonPath = os.path.join(libDirectory, LibArchive.fileName)
+
+        return [
+            ('BVER_BIN_PATH', binDirectory),
+            ('PATH', os.pathsep.join(filter(None, [binDirectory, env.get('PATH')]))),
+            ('PYTHONPATH', os.pathsep.join(filter(None, [pythonPath, env.get('PYTHONPATH')])))
+        ]
+
+
+_defaultBuilder = EnvBuilder()
+
+def buildEnv(baseEnv, paths=None, mode=None, refresh=False):
+    """
+    Return a new dict with the base environment updated by the bver variables.
+
+    It uses a process wide builder, therefore the resolved catalogs are
+    shared among the calls (@see EnvBuilder.build).
+    """
+    return _defaultBuilder.build(baseEnv, paths, mode, refresh)
@@ -0,0 +1,149 @@
+import os
+import json
+import zlib
+import base64
+import hashlib
+import tempfile
+from .Versioned import Versioned
+
+class InvalidSnapshotError(Exception):
+    """Invalid snapshot error."""
+
+class EnvSnapshot(object):
+    """
+    Stores the bver environment variables behind a single handle.
+
+    The handle is exported as BVER_SNAPSHOT instead of one environment
+    variable per software/addon. It's either a content hash
+    ("sha256:<hash>") pointing to a snapshot file stored in the snapshot
+    directory or the snapshot itself compressed inline ("inline:<data>").
+
+    The snapshot directory needs to be shared among the hosts reading the
+    handles, therefore it has no default: when it's not configured the
+    snapshots are stored inline.
+    """
+
+    envName = 'BVER_SNAPSHOT'
+    __cache = {}
+
+    @classmethod
+    def write(cls, items, directory=None, inline=False):
+        """
+        Store the environment items (name, value) returning the snapshot handle.
+
+        The snapshot is stored inline when no snapshot directory is configured.
+        """
+        data = json.dumps(list(map(list, items)), separators=(',', ':')).encode('utf-8')
+        directory = directory or cls.directory()
+
+        if inline or not directory:
+            return 'inline:{0}'.format(
+                base64.urlsafe_b64encode(zlib.compress(data, 9)).decode('ascii')
+            )
+
+        digest = hashlib.sha256(data).hexdigest()
+        snapshotFile = os.path.join(directory, '{0}.json'.format(digest))
+
+        # snapshots are immutable, only writing it when it does not exist
+        if not os.path.exists(snapshotFile):
+            os.makedirs(directory, exist_ok=True)
+
+            fd, temporaryFile = tempfile.mkstemp(dir=directory)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.chmod(temporaryFile, 0o644)
+                os.replace(temporaryFile, snapshotFile)
+            except Exception:
+                os.remove(temporaryFile)
+                raise
+
+        return 'sha256:{0}'.format(digest)
+
+    @classmethod
+    def read(cls, handle, directory=None):
+        """
+        Return a dict with the environment variables stored by a snapshot handle.
+
+        Snapshots are cached by handle.
+        """
+        if handle in cls.__cache:
+            return cls.__cache[handle]
+
+        kind, _, value = handle.partition(':')
+        try:
+            if kind == 'inline':
+                data = zlib.decompress(base64.urlsafe_b64decode(value.encode('ascii')))
+            elif kind == 'sha256':
+                directory = directory or cls.directory()
+                if not directory:
+                    raise InvalidSnapshotError(
+                        'Could not read snapshot "{0}": $BVER_SNAPSHOT_DIR is not defined'.format(handle)
+                    )
+
+                snapshotFile = os.path.join(
+                    directory,
+                    '{0}.json'.format(os.path.basename(value))
+                )
+                with open(snapshotFile, 'rb') as f:
+                    data = f.read()
+
+                if hashlib.sha256(data).hexdigest() != value:
+                    raise InvalidSnapshotError(
+                        'Snapshot "{0}" does not match its content'.format(handle)
+                    )
+            else:
+                raise InvalidSnapshotError(
+                    'Invalid snapshot handle "{0}"'.format(handle)
+                )
+
+            result = dict(json.loads(data.decode('utf-8')))
+        except InvalidSnapshotError:
+            raise
+        except Exception as err:
+            raise InvalidSnapshotError(
+                'Could not read snapshot "{0}": {1}'.format(handle, err)
+            )
+
+        cls.__cache[handle] = result
+
+        return result
+
+    @staticmethod
+    def directory():
+        """
+        Return the directory where the snapshot files are stored (None when not configured).
+
+        It's defined through $BVER_SNAPSHOT_DIR (it needs to be shared among
+        the hosts reading the snapshots).
+        """
+        return os.environ.get('BVER_SNAPSHOT_DIR') or None
+
+def lookup(name, default=None, env=None):
+    """
+    Return the value of a bver environment variable.
+
+    The name can be either a bver name (for instance BVER_MAYA_VERSION) or
+    a software name (for instance maya). The variables exported directly
+    to the environment come first (so they can override the snapshot),
+    falling back to the snapshot defined by $BVER_SNAPSHOT.
+    """
+    env = os.environ if env is None else env
+    names = [name]
+    if not name.startswith('BVER_'):
+        names.append(Versioned.toBverName(name))
+
+    for bverName in names:
+        if bverName in env:
+            return env[bverName]
+
+    if env.get(EnvSnapshot.envName):
+        snapshot = EnvSnapshot.read(
+            env[EnvSnapshot.envName],
+            env.get('BVER_SNAPSHOT_DIR')
+        )
+        for bverName in names:
+            if bverName in snapshot:
+                return snapshot[bverName]
+
+    return default
@@ -0,0 +1,120 @@
+import os
+import json
+import mmap
+import importlib
+import importlib.util
+
+# optional faster parser (imported on demand, expensive import)
+_orjsonInstalled = importlib.util.find_spec('orjson') is not None
+
+class InvalidJsonBackendError(Exception):
+    """Invalid json backend error."""
+
+class JsonBackend(object):
+    """
+    Json decoder/encoder based on the standard library.
+
+    Decoding accepts str and binary contents (bytes, bytearray, memoryview
+    and mmap), therefore files can be decoded without an intermediate str
+    (@see loadFile). Encoding always goes through the standard library, so
+    the written files are byte-identical regardless of the backend.
+
+    Faster decoders are provided by subclasses, the backend used by default
+    is the fastest one installed (@see backend).
+    """
+
+    name = 'json'
+    __mmapThreshold = 64 * 1024
+
+    def loads(self, data):
+        """
+        Return the value decoded from str or binary contents.
+        """
+        if isinstance(data, (mmap.mmap, memoryview)):
+            data = bytes(data)
+
+        return json.loads(data)
+
+    def loadFile(self, filePath):
+        """
+        Return the value decoded from a file (large files are decoded from a mmap).
+        """
+        with open(filePath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < self.__mmapThreshold:
+                return self.loads(f.read())
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.loads(data)
+
+    def dumps(self, value, indent=None, sortKeys=False):
+        """
+        Return a str with the encoded value.
+        """
+        return json.dumps(value, indent=indent, sort_keys=sortKeys)
+
+    def dump(self, value, fileObject, indent=None, sortKeys=False):
+        """
+        Write the encoded value to a file object (opened in text mode).
+        """
+        json.dump(value, fileObject, indent=indent, sort_keys=sortKeys)
+
+class OrjsonBackend(JsonBackend):
+    """
+    Json backend decoding through orjson.
+
+    Contents orjson cannot decode (for instance NaN or integers beyond 64
+    bits) are decoded by the standard library instead, therefore the
+    result is the same one as the standard library backend.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        """
+        Create an orjson backend object.
+        """
+        self.__orjson = importlib.import_module('orjson')
+
+    def loads(self, data):
+        """
+        Return the value decoded from str or binary contents.
+        """
+        try:
+            return self.__orjson.loads(memoryview(data) if isinstance(data, mmap.mmap) else data)
+        except self.__orjson.JSONDecodeError:
+            return super(OrjsonBackend, self).loads(data)
+
+
+_backends = {}
+
+def availableBackends():
+    """
+    Return a list with the names of the installed backends (from the fastest).
+    """
+    result = []
+    if _orjsonInstalled:
+        result.append(OrjsonBackend.name)
+
+    result.append(JsonBackend.name)
+    return result
+
+def backend(name=None):
+    """
+    Return the json backend object shared among the calls.
+
+    The backend can be selected by name (or through $BVER_JSON_BACKEND),
+    otherwise the fastest one installed is used.
+    """
+    name = name or os.environ.get('BVER_JSON_BACKEND') or availableBackends()[0]
+    if name not in _backends:
+        if name not in availableBackends():
+            raise InvalidJsonBackendError(
+                'Json backend "{0}" is not available (available: {1})'.format(
+                    name,
+                    ', '.join(availableBackends())
+                )
+            )
+
+        _backends[name] = OrjsonBackend() if name == OrjsonBackend.name else JsonBackend()
+
+    return _backends[name]
@@ -0,0 +1,108 @@
+import os
+import shutil
+import zipfile
+import tempfile
+import py_compile
+
+class LibArchive(object):
+    """
+    Builds a single-file archive of the bver library (zip with bytecode).
+
+    The archive is used in the python path instead of the library directory
+    (@see src/init), therefore importing the library reads a single file
+    (rather than stat/open calls for every module and __pycache__ entry
+    which are expensive on network shares).
+
+    Modules are stored with their sources and unchecked hash based bytecode
+    (valid regardless of the timestamps, which the archive does not change).
+    When the bytecode does not match the running python version the sources
+    are used instead.
+
+    The archive is deterministic (same sources produce the same archive).
+    """
+
+    fileName = 'bver.zip'
+    __packageName = 'bver'
+    __dateTime = (1980, 1, 1, 0, 0, 0)
+
+    def __init__(self, libDirectory):
+        """
+        Create a lib archive object.
+
+        The lib directory is the one holding the bver package.
+        """
+        self.__libDirectory = libDirectory
+
+    def libDirectory(self):
+        """
+        Return the directory holding the bver package.
+        """
+        return self.__libDirectory
+
+    def sourceFiles(self):
+        """
+        Return a sorted list of the source files (relative to the lib directory) of the package.
+        """
+        result = []
+        packageDirectory = os.path.join(self.__libDirectory, self.__packageName)
+        for directory, directoryNames, fileNames in os.walk(packageDirectory):
+            directoryNames[:] = [x for x in directoryNames if x != '__pycache__']
+
+            for fileName in fileNames:
+                if fileName.endswith('.py'):
+                    result.append(
+                        os.path.relpath(os.path.join(directory, fileName), self.__libDirectory).replace(os.sep, '/')
+                    )
+
+        return sorted(result)
+
+    def build(self, archiveFilePath):
+        """
+        Write the archive to the file path.
+
+        The archive is written to a temporary file first and then renamed,
+        therefore readers never see a partial archive.
+        """
+        archiveDirectory = os.path.dirname(os.path.abspath(archiveFilePath))
+        if not os.path.isdir(archiveDirectory):
+            os.makedirs(archiveDirectory)
+
+        temporaryDirectory = tempfile.mkdtemp()
+        try:
+            temporaryArchiveFilePath = os.path.join(temporaryDirectory, self.fileName)
+            with zipfile.ZipFile(temporaryArchiveFilePath, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for sourceFile in self.sourceFiles():
+                    sourceFilePath = os.path.join(self.__libDirectory, sourceFile)
+                    with open(sourceFilePath, 'rb') as f:
+                        self.__write(archive, sourceFile, f.read())
+
+                    # bytecode next to its source (as expected by zipimport)
+                    bytecodeFilePath = os.path.join(temporaryDirectory, 'module.pyc')
+                    py_compile.compile(
+                        sourceFilePath,
+                        cfile=bytecodeFilePath,
+                        dfile=os.path.join(os.path.abspath(archiveFilePath), sourceFile),
+                        doraise=True,
+                        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH
+                    )
+                    with open(bytecodeFilePath, 'rb') as f:
+                        self.__write(archive, sourceFile + 'c', f.read())
+
+            # moving to the same file system before the atomic rename
+            temporaryTargetFilePath = '{0}.{1}.tmp'.format(archiveFilePath, os.getpid())
+            shutil.copyfile(temporaryArchiveFilePath, temporaryTargetFilePath)
+            os.replace(temporaryTargetFilePath, archiveFilePath)
+        finally:
+            shutil.rmtree(temporaryDirectory, ignore_errors=True)
+
+    @classmethod
+    def __write(cls, archive, name, data):
+        """
+        Write a file to the archive (with a fixed timestamp).
+
+        @private
+        """
+        info = zipfile.ZipInfo(name, cls.__dateTime)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        archive.writestr(info, data)
@@ -0,0 +1,361 @@
+import os
+import sys
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import http.client as httpClient
+from urllib.parse import urljoin, urlsplit
+from .JsonLoader import JsonLoader, UnexpectedVersionFormatError
+
+class InvalidUrlError(Exception):
+    """Invalid url error."""
+
+class RemoteFetchError(Exception):
+    """Remote fetch error."""
+
+class HttpLoader(JsonLoader):
+    """
+    Loads a list of softwares from json documents served through http.
+
+    Connections are kept alive and pooled per host, documents are requested
+    conditionally (ETag/Last-Modified) and, when a cache directory is
+    provided, the last fetched copy of each document is kept on disk and
+    used as fallback when the server cannot be reached.
+    """
+
+    def __init__(self, cacheDirectory=None, timeout=10, maxConnections=4, *args, **kwargs):
+        """
+        Create a http loader object.
+        """
+        super(HttpLoader, self).__init__(*args, **kwargs)
+
+        self.__cacheDirectory = cacheDirectory
+        self.__timeout = timeout
+        self.__maxConnections = maxConnections
+        self.__connections = {}
+        self.__documents = {}
+        self.__lock = threading.Lock()
+
+    def addFromUrl(self, url, activeVersionFromEnv=None, ignoreAddons=False):
+        """
+        Add json from an url.
+
+        The json document need to follow the format expected
+        by {@link addFromJson} (except for the versions split per file).
+        """
+        self.__addFromDocument(
+            url,
+            self.fetch(url),
+            activeVersionFromEnv,
+            ignoreAddons
+        )
+
+    def addFromUrls(self, urls, activeVersionFromEnv=None):
+        """
+        Add json from a list of urls (fetched concurrently).
+
+        The documents are merged in the order of the urls following the same
+        rules used by {@link addFromJsonPaths} (including the conflicts).
+        """
+        documents = dict(zip(urls, self.fetchAll(urls)))
+
+        self._addFromDocuments(
+            urls,
+            lambda url: (self.__decodeDocument(url, documents[url]), None),
+            activeVersionFromEnv,
+            sourceType='url'
+        )
+
+    def addFromUrlIndex(self, url, activeVersionFromEnv=None):
+        """
+        Add json from the urls listed by an index document.
+
+        The index is a json list of urls (relative to the index url).
+        """
+        urls = self.jsonBackend().loads(self.fetch(url))
+        if not isinstance(urls, list):
+            raise RemoteFetchError(
+                'Expecting list as index "{0}"!'.format(url)
+            )
+
+        self.addFromUrls(
+            list(map(lambda x: urljoin(url, x), urls)),
+            activeVersionFromEnv
+        )
+
+    def fetchAll(self, urls):
+        """
+        Return a list with the contents of the urls (fetched concurrently).
+        """
+        if len(urls) < 2:
+            return list(map(self.fetch, urls))
+
+        with ThreadPoolExecutor(max_workers=min(self.__maxConnections, len(urls))) as executor:
+            return list(executor.map(self.fetch, urls))
+
+    def fetch(self, url):
+        """
+        Return the contents of an url.
+
+        The request is conditional when the document was fetched before, in
+        case the server cannot be reached the cached copy is used instead.
+        """
+        scheme, host, path = self.__parseUrl(url)
+        cached = self.__cachedDocument(url)
+
+        headers = {}
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['lastModified']:
+                headers['If-Modified-Since'] = cached['lastModified']
+
+        try:
+            status, responseHeaders, body = self.__request(scheme, host, path, headers)
+        except (OSError, httpClient.HTTPException) as err:
+            if cached is not None:
+                return cached['contents']
+
+            raise RemoteFetchError(
+                'Could not fetch "{0}": {1}'.format(url, err)
+            )
+
+        if status == 304:
+            if cached is None:
+                raise RemoteFetchError(
+                    'Could not fetch "{0}" (not modified response without a cached copy)'.format(url)
+                )
+
+            return cached['contents']
+
+        if status != 200:
+            if status >= 500 and cached is not None:
+                return cached['contents']
+
+            raise RemoteFetchError(
+                'Could not fetch "{0}" (status {1})'.format(url, status)
+            )
+
+        document = {
+            'url': url,
+            'etag': responseHeaders.get('ETag'),
+            'lastModified': responseHeaders.get('Last-Modified'),
+            'contents': body.decode('utf-8')
+        }
+        self.__storeDocument(document)
+
+        return document['contents']
+
+    def _newOverlay(self):
+        """
+        Return a new empty loader (using the same settings) used as overlay.
+
+        @see Loader.overlay
+        """
+        return type(self)(
+            self.__cacheDirectory,
+            self.__timeout,
+            self.__maxConnections,
+            jsonBackend=self.jsonBackend()
+        )
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        with self.__lock:
+            connections = self.__connections
+            self.__connections = {}
+
+        for hostConnections in connections.values():
+            for connection in hostConnections:
+                connection.close()
+
+    def clear(self):
+        """
+        Clear the cache.
+        """
+        super(HttpLoader, self).clear()
+
+        with self.__lock:
+            self.__documents.clear()
+
+    def __addFromDocument(self, url, contents, activeVersionFromEnv, ignoreAddons=False):
+        """
+        Add the contents of a fetched document.
+
+        @private
+        """
+        try:
+            self.addFromContents(
+                self.__decodeDocument(url, contents),
+                activeVersionFromEnv,
+                ignoreAddons
+            )
+        except Exception as e:
+            sys.stderr.write('Error on loading version url: {}\n'.format(url))
+            raise e
+
+    def __decodeDocument(self, url, contents):
+        """
+        Return the decoded contents of a fetched document.
+
+        Versions split per file are not supported (the version
+        directories cannot be listed through http).
+
+        @private
+        """
+        contents = self.jsonBackend().loads(contents)
+        if isinstance(contents, dict):
+            for softwareName, softwareContents in contents.items():
+                if isinstance(softwareContents, dict) and isinstance(softwareContents.get('versions'), str):
+                    raise UnexpectedVersionFormatError(
+                        'Versions split per file are not supported over http (versions of "{0}" in "{1}")'.format(
+                            softwareName,
+                            url
+                        )
+                    )
+
+        return contents
+
+    def __request(self, scheme, host, path, headers):
+        """
+        Perform a GET request using a pooled connection.
+
+        A request sent through a reused connection is retried once using a
+        new connection (the server may have closed the idle connection).
+
+        @private
+        """
+        for attempt in range(2):
+            connection, reused = self.__acquireConnection(scheme, host, forceNew=attempt > 0)
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, httpClient.HTTPException):
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self.__releaseConnection(scheme, host, connection)
+
+            return (response.status, response.msg, body)
+
+    def __acquireConnection(self, scheme, host, forceNew=False):
+        """
+        Return a tuple containing a connection for the host and whether it was reused.
+
+        @private
+        """
+        if not forceNew:
+            with self.__lock:
+                hostConnections = self.__connections.get((scheme, host))
+                if hostConnections:
+                    return (hostConnections.pop(), True)
+
+        connectionClass = httpClient.HTTPSConnection if scheme == 'https' else httpClient.HTTPConnection
+
+        return (connectionClass(host, timeout=self.__timeout), False)
+
+    def __releaseConnection(self, scheme, host, connection):
+        """
+        Return a connection to the pool.
+
+        @private
+        """
+        with self.__lock:
+            hostConnections = self.__connections.setdefault((scheme, host), [])
+            if len(hostConnections) < self.__maxConnections:
+                hostConnections.append(connection)
+                return
+
+        connection.close()
+
+    def __cachedDocument(self, url):
+        """
+        Return the cached document of an url (None when not available).
+
+        @private
+        """
+        with self.__lock:
+            if url in self.__documents:
+                return self.__documents[url]
+
+        if self.__cacheDirectory is None:
+            return None
+
+        try:
+            document = self.jsonBackend().loadFile(self.__cacheFilePath(url))
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(document, dict) or document.get('url') != url:
+            return None
+
+        with self.__lock:
+            self.__documents[url] = document
+
+        return document
+
+    def __storeDocument(self, document):
+        """
+        Store a fetched document in the cache.
+
+        @private
+        """
+        with self.__lock:
+            self.__documents[document['url']] = document
+
+        if self.__cacheDirectory is None:
+            return
+
+        # writing to a temporary file first, so the cached copy
+        # is always complete
+        if not os.path.isdir(self.__cacheDirectory):
+            os.makedirs(self.__cacheDirectory)
+
+        cacheFilePath = self.__cacheFilePath(document['url'])
+        fd, temporaryFilePath = tempfile.mkstemp(dir=self.__cacheDirectory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                self.jsonBackend().dump(document, f)
+            os.replace(temporaryFilePath, cacheFilePath)
+        except Exception:
+            os.remove(temporaryFilePath)
+            raise
+
+    def __cacheFilePath(self, url):
+        """
+        Return the path of the cached copy of an url.
+
+        @private
+        """
+        return os.path.join(
+            self.__cacheDirectory,
+            '{0}.json'.format(hashlib.sha1(url.encode('utf-8')).hexdigest())
+        )
+
+    @staticmethod
+    def __parseUrl(url):
+        """
+        Return a tuple containing the scheme, host (including the port) and path of an url.
+
+        @private
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            raise InvalidUrlError(
+                'Invalid url "{0}"!'.format(url)
+            )
+
+        path = parts.path or '/'
+        if parts.query:
+            path = '{0}?{1}'.format(path, parts.query)
+
+        return (parts.scheme, parts.netloc, path)
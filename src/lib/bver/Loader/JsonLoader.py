@@ -1,9 +1,15 @@
 import os
 import sys
-import glob
+import stat
 import json
+import getpass
+import hashlib
+import tempfile
+import threading
+from collections import namedtuple
 from .Loader import Loader
 from ..Versioned import Versioned
+from .. import JsonBackend
 
 # compatibility with python 2/3
 try:
@@ -20,6 +26,9 @@ class UnexpectedAddonsDataError(Exception):
 class UnexpectedAddonContentError(Exception):
     """Unexpected addon content error."""
 
+class UnexpectedOptionsDataError(Exception):
+    """Unexpected options data error."""
+
 class UnexpectedVersionFormatError(Exception):
     """Unexpected version format error."""
 
@@ -29,22 +38,150 @@ class InvalidDirectoryError(Exception):
 class InvalidFileError(Exception):
     """Invalid file Error."""
 
+class MergeConflict(namedtuple('MergeConflict', ['softwareName', 'addonName', 'fileName', 'shadowedFileNames'])):
+    """
+    Definition shadowed by another file when merging json files.
+
+    The addonName is None when the conflict is about the software itself.
+    The fileName is the file (or url, @see HttpLoader) of the winning definition and the
+    shadowedFileNames are the files of the definitions it shadows (from
+    the highest precedence).
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        """
+        Return the conflict formatted as "<software>[/<addon>]: <file> shadows <file>[, <file>...]".
+        """
+        location = self.softwareName
+        if self.addonName is not None:
+            location = '{0}/{1}'.format(location, self.addonName)
+
+        return '{0}: {1} shadows {2}'.format(location, self.fileName, ', '.join(self.shadowedFileNames))
+
 class JsonLoader(Loader):
     """
     Loads a list of softwares from a json.
+
+    Multiple json files are merged by key in a single pass with a fixed
+    precedence: files come in the order returned by {@link jsonFiles}
+    (paths in the order they are passed, the files of a directory sorted
+    by name) and later files take precedence. Each software is resolved
+    from its definition with the highest precedence (definitions without
+    configuration for the version defined by the env are skipped) and each
+    addon of a software from the definition with the highest precedence
+    declaring it. The definitions shadowed by the merge are reported
+    by {@link conflicts}.
+
+    When $BVER_MIRROR_ROOT is defined the directories are read from their
+    node-local mirror (@see Mirror) as long as it matches the published one.
+
+    Each directory can have an index (@see writeIndex) listing the softwares
+    defined by its json files (and the softwares used by them as addons),
+    used to load only the files required by a set of softwares
+    (@see addFromJsonPathsOnly).
     """
 
-    def __init__(self, *args, **kwargs):
+    indexName = '.bverindex'
+    __versionsDirectorySuffix = '.versions'
+
+    def __init__(self, jsonBackend=None, *args, **kwargs):
         """
         Create a json loader object.
+
+        The json backend decodes the files (@see JsonBackend.backend), by
+        default the fastest one installed.
         """
         super(JsonLoader, self).__init__(*args, **kwargs)
 
+        self.__jsonBackend = jsonBackend or JsonBackend.backend()
         self.__cache = {}
+        self.__revalidation = None
+        self.__conflicts = []
+
+    def jsonBackend(self):
+        """
+        Return the json backend used to decode the files.
+        """
+        return self.__jsonBackend
+
+    def _newOverlay(self):
+        """
+        Return a new empty loader (using the same json backend) used as overlay.
+
+        @see Loader.overlay
+        """
+        return type(self)(jsonBackend=self.__jsonBackend)
 
-    def addFromJson(self, jsonContents, activeVersionFromEnv=None, ignoreAddons=False):
+    def _addFromDocuments(self, sources, decode, activeVersionFromEnv, sourceType='file'):
         """
-        Add softwares and addons from json contents.
+        Add a list of json documents (in precedence order) to the loader through a keyed merge.
+
+        Each source (for instance a file path) is decoded by the decode
+        function, returning a tuple with the decoded contents and the base
+        directory of the split versions (@see addFromJson). Every
+        definition is parsed once and grouped by its key (the software
+        name, or the software and addon names), only the winner of each key
+        gets added to the loader and the shadowed definitions are
+        recorded (@see conflicts).
+        """
+        softwares = {}
+        addons = {}
+        for source in sources:
+            try:
+                contents, baseDirectory = decode(source)
+
+                # root checking
+                if not isinstance(contents, dict):
+                    raise UnexpectedRootContentError('Expecting object as root!')
+
+                for softwareName, softwareContents in contents.items():
+                    definition = self.__softwareDefinition(
+                        softwareName,
+                        softwareContents,
+                        activeVersionFromEnv,
+                        baseDirectory=baseDirectory
+                    )
+
+                    # no configuration for the particular version
+                    if definition is None:
+                        continue
+
+                    self.__mergeDefinition(softwares, softwareName, source, definition[:3])
+
+                    softwareAddons = addons.setdefault(softwareName, {})
+                    for addonName, addonOptions in definition[3].items():
+                        self.__mergeDefinition(softwareAddons, addonName, source, addonOptions)
+            except Exception as e:
+                sys.stderr.write('Error on loading version {}: {}\n'.format(sourceType, source))
+                raise e
+
+        conflicts = []
+        for softwareName, (fileName, shadowedFileNames, definition) in softwares.items():
+            if shadowedFileNames:
+                conflicts.append(MergeConflict(softwareName, None, fileName, tuple(shadowedFileNames)))
+
+        for softwareName, softwareAddons in addons.items():
+            for addonName, (fileName, shadowedFileNames, addonOptions) in softwareAddons.items():
+                if shadowedFileNames:
+                    conflicts.append(MergeConflict(softwareName, addonName, fileName, tuple(shadowedFileNames)))
+
+        # publishing the files all at once, softwares first (therefore a
+        # software can be referred as addon in others json files)
+        with self.batch():
+            for softwareName, (fileName, shadowedFileNames, definition) in softwares.items():
+                self.addSoftwareInfo(softwareName, *definition)
+
+            for softwareName, softwareAddons in addons.items():
+                for addonName, (fileName, shadowedFileNames, addonOptions) in softwareAddons.items():
+                    self.addAddonInfo(softwareName, addonName, addonOptions)
+
+        self.__conflicts.extend(sorted(conflicts, key=lambda x: (x.softwareName, x.addonName or '')))
+
+    def addFromJson(self, jsonContents, activeVersionFromEnv=None, ignoreAddons=False, baseDirectory=None):
+        """
+        Add softwares and addons from json contents (str or bytes).
 
         Supported formats:
         {
@@ -90,20 +227,49 @@ class JsonLoader(Loader):
                 }
             }
         }
+
+        or (versions split per file, only the selected version is parsed)
+
+        {
+            "c": {
+                "active": "1.2.5",
+                "versions": "c.versions"
+            }
+        }
+
+        Where "c.versions" is a directory (directly under the baseDirectory)
+        containing one json file per version (for instance "1.2.5.json"), each
+        one holding the contents of that version. Version directories need
+        to use the ".versions" suffix, so they are not collected as regular
+        json files by {@link jsonFiles}.
+        """
+        self.addFromContents(
+            self.__jsonBackend.loads(jsonContents),
+            activeVersionFromEnv,
+            ignoreAddons,
+            baseDirectory
+        )
+
+    def addFromContents(self, contents, activeVersionFromEnv=None, ignoreAddons=False, baseDirectory=None):
         """
-        contents = json.loads(jsonContents)
+        Add softwares and addons from decoded json contents.
 
+        The contents need to follow the format expected
+        by {@link addFromJson}.
+        """
         # root checking
         if not isinstance(contents, dict):
             raise UnexpectedRootContentError('Expecting object as root!')
 
-        for softwareName, softwareContents in contents.items():
-            self.__addParsedSoftware(
-                softwareName,
-                softwareContents,
-                activeVersionFromEnv,
-                ignoreAddons
-            )
+        with self.batch():
+            for softwareName, softwareContents in contents.items():
+                self.__addParsedSoftware(
+                    softwareName,
+                    softwareContents,
+                    activeVersionFromEnv,
+                    ignoreAddons,
+                    baseDirectory
+                )
 
     def addFromJsonFile(self, fileName, activeVersionFromEnv=None, ignoreAddons=False):
         """
@@ -113,76 +279,342 @@ class JsonLoader(Loader):
         by {@link addFromJson}.
         """
         # making sure it's a valid file
-        if not os.path.exists(fileName) or not os.path.isfile(fileName):
+        if not os.path.isfile(fileName):
             raise InvalidFileError(
                 'Invalid file "{0}"!'.format(fileName)
             )
 
-        if fileName not in self.__cache:
-            with open(fileName, 'r') as f:
-                self.__cache[fileName] = f.read()
-
         try:
             self.addFromJson(
-                self.__cache[fileName],
+                self.__readFile(fileName),
                 activeVersionFromEnv,
-                ignoreAddons
+                ignoreAddons,
+                os.path.dirname(fileName)
             )
         except Exception as e:
             sys.stderr.write('Error on loading version file: {}\n'.format(fileName))
             raise e
 
-    def addFromJsonDirectory(self, directory, activeVersionFromEnv=None):
+    def addFromJsonDirectory(self, directory, activeVersionFromEnv=None, recursive=False):
         """
         Add json from inside of a directory with json files.
 
         The json file need to follow the format expected
-        by {@link addFromJson}.
+        by {@link addFromJson}. The files are collected
+        by {@link jsonFiles}.
         """
         # making sure it's a valid directory
-        if not (os.path.exists(directory) and os.path.isdir(directory)):
+        if not os.path.isdir(directory):
             raise InvalidDirectoryError(
                 'Invalid directory "{0}"!'.format(directory)
             )
 
-        # collecting the json files and loading them to the loader.
-        allJsonFiles = glob.glob(os.path.join(directory, '*.json'))
+        self.__addFromJsonFiles(
+            self.jsonFiles(self.__mirroredPaths([directory]), recursive),
+            activeVersionFromEnv
+        )
+
+    def addFromJsonPaths(self, paths, activeVersionFromEnv=None, recursive=False):
+        """
+        Load the json configuration from paths pointing to json files or/and directories containing json files.
 
-        # finally loading files
-        # first without the addons, so it can load all softwares
-        for jsonFile in allJsonFiles:
-            self.addFromJsonFile(jsonFile, activeVersionFromEnv, ignoreAddons=True)
+        The files are collected by {@link jsonFiles}.
+        """
+        self.__addFromJsonFiles(
+            self.jsonFiles(self.__mirroredPaths(paths), recursive),
+            activeVersionFromEnv
+        )
 
-        # now we load with addons (therefore a software can be referred as addon
-        # in others json files
-        for jsonFile in allJsonFiles:
-            self.addFromJsonFile(jsonFile, activeVersionFromEnv)
+    def addFromJsonPathsOnly(self, paths, softwareNames, activeVersionFromEnv=None, recursive=False):
+        """
+        Load only the json files defining the softwares (and the softwares used by them as addons).
 
-    def addFromJsonPaths(self, paths, activeVersionFromEnv=None):
+        The files are selected through the index of their directories (the
+        index is validated against the file stats and the outdated entries
+        are rebuilt in memory), so the resolution of the softwares is the
+        same one as loading all the files from the paths.
         """
-        Load the json configuration from paths pointing to json files or/and directories containing json files.
+        jsonFiles = self.jsonFiles(self.__mirroredPaths(paths), recursive)
+
+        # files defining each software and the softwares used by it as addons
+        softwareFiles = {}
+        softwareAddonNames = {}
+        for jsonFile, entry in zip(jsonFiles, self.__indexEntries(jsonFiles)):
+            for softwareName, addonNames in entry['softwares'].items():
+                softwareFiles.setdefault(softwareName, set()).add(jsonFile)
+                softwareAddonNames.setdefault(softwareName, []).extend(addonNames)
+
+        # collecting the files required by the softwares
+        requiredNames = set()
+        requiredFiles = set()
+        pendingNames = list(softwareNames)
+        while pendingNames:
+            softwareName = pendingNames.pop()
+            if softwareName in requiredNames:
+                continue
+
+            requiredNames.add(softwareName)
+            requiredFiles.update(softwareFiles.get(softwareName, ()))
+            pendingNames.extend(softwareAddonNames.get(softwareName, ()))
+
+        self.__addFromJsonFiles(
+            list(filter(lambda x: x in requiredFiles, jsonFiles)),
+            activeVersionFromEnv
+        )
+
+    def writeIndex(self, paths, recursive=False):
+        """
+        Write the index of the directories containing the json files found in the paths.
+
+        It's written when publishing (@see binstall), loads never write
+        the index (outdated or missing entries are rebuilt in memory,
+        @see addFromJsonPathsOnly).
+        """
+        self.__indexEntries(self.jsonFiles(paths, recursive), write=True)
+
+    def indexEntries(self, jsonFiles):
+        """
+        Return a list with the index entry of each json file.
+
+        An entry is a dict containing the addon names of each software
+        defined by the file ("softwares") and the stats of the files it
+        depends on ("stats", the json file and its version files, relative
+        to the directory of the json file).
+        """
+        return self.__indexEntries(jsonFiles)
+
+    def addFromJsonPathsWithinBudget(self, paths, latencyBudget, activeVersionFromEnv=None, recursive=False):
+        """
+        Load the json configuration from paths within a latency budget (in seconds) returning whether the result is stale.
+
+        The paths are loaded by a background thread (@see addFromJsonPaths),
+        where each successful load is stored on local disk as the last
+        known-good snapshot of the paths (@see lastGoodDirectory). When the
+        load does not finish within the budget the last known-good snapshot
+        is used instead (stale result) while the load keeps revalidating it
+        in the background (@see waitRevalidation). In case there is no
+        snapshot yet it waits for the load to finish.
+
+        When the load fails (for instance, a file being published is read
+        half-written) the last known-good snapshot is used as well, where
+        the error is raised by {@link waitRevalidation}. Without a snapshot
+        the error is raised right away.
+
+        Snapshots are stored per paths and versions defined by the env
+        (BVER_<NAME>_VERSION).
+        """
+        snapshotFile = self.__privateFilePath(self.lastGoodDirectory(), paths, activeVersionFromEnv, recursive)
+
+        result = {}
+
+        def load():
+            try:
+                loader = type(self)(jsonBackend=self.jsonBackend())
+                loader.addFromJsonPaths(paths, activeVersionFromEnv, recursive)
+                result['infoData'] = loader.infoData()
+            except Exception as err:
+                result['error'] = err
+                return
+
+            # the snapshot is just a fallback, not being able to store it
+            # should not fail the load
+            try:
+                self.__writePrivateFile(snapshotFile, result['infoData'])
+            except OSError as err:
+                sys.stderr.write('Could not store last known-good snapshot: {}\n'.format(err))
+
+        thread = threading.Thread(target=load)
+        thread.daemon = True
+        thread.start()
+        thread.join(latencyBudget)
+
+        infoData = None
+        if thread.is_alive():
+            infoData = self.__readPrivateFile(snapshotFile)
+            if infoData is None:
+                thread.join()
+
+        # the load may have finished in the meantime
+        stale = 'infoData' not in result
+        if stale and infoData is None and 'error' in result:
+            infoData = self.__readPrivateFile(snapshotFile)
+            if infoData is None:
+                raise result['error']
+
+        if stale:
+            self.__revalidation = (thread, result)
+        else:
+            infoData = result['infoData']
+
+        self.addFromInfoData(infoData)
+
+        return stale
+
+    def addFromCachedJsonPaths(self, paths, activeVersionFromEnv=None, recursive=False):
+        """
+        Load the json configuration from paths through a resolution cached on local disk returning whether the cache was used.
+
+        The information loaded from the paths (@see infoData) is stored per
+        user (@see layerCacheDirectory) along with the digest of the
+        manifest published for each path (@see Mirror.writeManifest), and
+        it's reused while the published manifests are unchanged (without
+        visiting the files). Therefore a large layer shared by many loads
+        (for instance the config root used as base by {@link overlay}) is
+        only parsed and merged once per publish.
+
+        Paths without a published manifest (json files or directories that
+        were never published) are loaded without the cache.
+
+        The cache is stored per paths and versions defined by the env
+        (BVER_<NAME>_VERSION).
         """
-        allJsonFiles = []
+        # the digests are read before loading the files, so a publish done
+        # in the meantime invalidates the cache
+        digests = self.__publishedDigests(self.__mirroredPaths(paths))
+        if digests is None:
+            self.addFromJsonPaths(paths, activeVersionFromEnv, recursive)
+            return False
+
+        cacheFile = self.__privateFilePath(self.layerCacheDirectory(), paths, activeVersionFromEnv, recursive)
+        cached = self.__readPrivateFile(cacheFile)
+        if isinstance(cached, dict) and cached.get('digests') == digests and isinstance(cached.get('infoData'), dict):
+            self.addFromInfoData(cached['infoData'])
+            return True
+
+        loader = self._newOverlay()
+        loader.addFromJsonPaths(paths, activeVersionFromEnv, recursive)
+        infoData = loader.infoData()
+
+        # the cache is just an optimization, not being able to store it
+        # should not fail the load
+        try:
+            self.__writePrivateFile(
+                cacheFile,
+                {
+                    'digests': digests,
+                    'infoData': infoData
+                }
+            )
+        except OSError as err:
+            sys.stderr.write('Could not store cached resolution: {}\n'.format(err))
+
+        self.__conflicts.extend(loader.conflicts())
+        self.addFromInfoData(infoData)
+
+        return False
+
+    def waitRevalidation(self, timeout=None):
+        """
+        Wait for the revalidation started by a stale load returning whether it's done.
+
+        Errors raised by the revalidation are raised again.
+        """
+        if self.__revalidation is None:
+            return True
+
+        thread, result = self.__revalidation
+        thread.join(timeout)
+        if thread.is_alive():
+            return False
+
+        self.__revalidation = None
+        if 'error' in result:
+            raise result['error']
+
+        return True
+
+    @staticmethod
+    def lastGoodDirectory():
+        """
+        Return the local directory where the last known-good snapshots are stored.
+
+        It can be defined through $BVER_LAST_GOOD_DIR, otherwise a directory
+        of the user under the temporary directory is used. Snapshots are
+        only used when the directory is owned by the user and not writable
+        by others.
+        """
+        directory = os.environ.get('BVER_LAST_GOOD_DIR')
+        if directory:
+            return directory
+
+        return os.path.join(
+            tempfile.gettempdir(),
+            'bver-last-good-{0}'.format(os.getuid() if hasattr(os, 'getuid') else getpass.getuser())
+        )
+
+    @staticmethod
+    def layerCacheDirectory():
+        """
+        Return the local directory where the cached resolutions of layers are stored (@see addFromCachedJsonPaths).
+
+        It can be defined through $BVER_LAYER_CACHE_DIR, otherwise a directory
+        of the user under the temporary directory is used. Cached
+        resolutions are only used when the directory is owned by the user
+        and not writable by others.
+        """
+        directory = os.environ.get('BVER_LAYER_CACHE_DIR')
+        if directory:
+            return directory
+
+        return os.path.join(
+            tempfile.gettempdir(),
+            'bver-layer-cache-{0}'.format(os.getuid() if hasattr(os, 'getuid') else getpass.getuser())
+        )
+
+    @staticmethod
+    def jsonFiles(paths, recursive=False):
+        """
+        Return the list of json files found in the input paths.
+
+        The order of the result is deterministic: paths are visited in the
+        order they were passed, a file path is used as it is and a directory
+        contributes its "*.json" files sorted by name (hidden files are
+        ignored). In recursive mode, the sub directories of a directory are
+        visited (sorted by name, depth-first) after its own files.
+
+        Invalid paths are skipped and files reachable more than
+        once (for instance, through symlinks or through an explicit path and its
+        directory) are only returned at their first occurrence.
+        """
+        result = []
+        visitedFiles = set()
+        visitedDirectories = set()
+
         for path in paths:
             # skipping invalid paths
-            if not path or not os.path.exists(path):
+            if not path:
                 continue
 
-            if os.path.isfile(path):
-                allJsonFiles.append(path)
+            try:
+                pathMode = os.stat(path).st_mode
+            except OSError:
+                continue
+
+            if stat.S_ISDIR(pathMode):
+                JsonLoader.__collectJsonFiles(
+                    path,
+                    recursive,
+                    result,
+                    visitedFiles,
+                    visitedDirectories
+                )
             else:
-                for fileName in glob.glob(os.path.join(path, '*.json')):
-                    allJsonFiles.append(fileName)
+                realPath = os.path.realpath(path)
+                if realPath not in visitedFiles:
+                    visitedFiles.add(realPath)
+                    result.append(path)
+
+        return result
 
-        # finally loading files
-        # first without the addons, so it can load all softwares
-        for jsonFile in allJsonFiles:
-            self.addFromJsonFile(jsonFile, activeVersionFromEnv, ignoreAddons=True)
+    def conflicts(self):
+        """
+        Return a list of the definitions shadowed (@see MergeConflict) by the files loaded so far.
 
-        # now we load with addons (therefore a software can be referred as addon
-        # in others json files
-        for jsonFile in allJsonFiles:
-            self.addFromJsonFile(jsonFile, activeVersionFromEnv)
+        Only the loads of multiple files are merged (addFromJsonDirectory,
+        addFromJsonPaths, addFromJsonPathsOnly and HttpLoader.addFromUrls),
+        the conflicts of each load are sorted by software and addon.
+        """
+        return list(self.__conflicts)
 
     def clear(self):
         """
@@ -190,27 +622,534 @@ class JsonLoader(Loader):
         """
         self.__cache.clear()
 
-    def __addParsedSoftware(self, softwareName, softwareContents, activeVersionFromEnv, ignoreAddons=False):
+    @staticmethod
+    def __mirroredPaths(paths):
+        """
+        Return the paths replacing the directories by their local mirror (when available).
+
+        @private
+        """
+        # imported on demand (expensive import)
+        from ..Mirror import Mirror
+
+        mirrorRoot = os.environ.get(Mirror.envName)
+        if not mirrorRoot:
+            return paths
+
+        mirror = Mirror(mirrorRoot)
+        result = []
+        for path in paths:
+            mirrorDirectory = mirror.resolve(path) if os.path.isdir(path) else None
+            result.append(mirrorDirectory or path)
+
+        return result
+
+    def __indexEntries(self, jsonFiles, write=False):
+        """
+        Return a list with the index entry of each json file.
+
+        The entries are read from the index of the directory of each file,
+        entries that are outdated (or missing) are rebuilt in memory. The
+        index of the directories is only written when requested
+        (@see writeIndex), keeping only the entries of the json files
+        (entries of removed files are pruned).
+
+        @private
+        """
+        indexes = {}
+        currentIndexes = {}
+        result = []
+        for jsonFile in jsonFiles:
+            directory = os.path.dirname(jsonFile)
+            if directory not in indexes:
+                indexes[directory] = self.__readIndex(directory)
+                currentIndexes[directory] = {}
+
+            fileName = os.path.basename(jsonFile)
+            entry = indexes[directory].get(fileName)
+            if entry is None or not self.__validIndexEntry(directory, entry):
+                entry = self.__buildIndexEntry(directory, fileName)
+
+            currentIndexes[directory][fileName] = entry
+            result.append(entry)
+
+        if write:
+            for directory, entries in currentIndexes.items():
+                if entries != indexes[directory]:
+                    self.__writeIndex(directory, entries)
+
+        return result
+
+    def __buildIndexEntry(self, directory, fileName):
+        """
+        Return the index entry of a json file.
+
+        The entry contains the stats of the files it depends on (the json
+        file and the version files used by it) and the addon names of each
+        software (among all versions).
+
+        @private
+        """
+        dependencies = [fileName]
+        softwares = {}
+
+        try:
+            contents = self.__jsonBackend.loads(self.__readFile(os.path.join(directory, fileName)))
+        except ValueError:
+            contents = None
+
+        # invalid contents are reported once the file gets loaded
+        if not isinstance(contents, dict):
+            contents = {}
+
+        for softwareName, softwareContents in contents.items():
+            versionContents = [softwareContents]
+            versions = softwareContents.get('versions') if isinstance(softwareContents, dict) else None
+
+            if isinstance(versions, dict):
+                versionContents.extend(versions.values())
+            elif self.__validFileName(versions) and os.path.isdir(os.path.join(directory, versions)):
+                for entry in sorted(os.scandir(os.path.join(directory, versions)), key=lambda x: x.name):
+                    if not entry.name.endswith('.json') or not entry.is_file():
+                        continue
+
+                    dependencies.append('{0}/{1}'.format(versions, entry.name))
+                    try:
+                        versionContents.append(self.__jsonBackend.loads(self.__readFile(entry.path)))
+                    except ValueError:
+                        pass
+
+            addonNames = set()
+            for data in versionContents:
+                if isinstance(data, dict) and isinstance(data.get('addons'), dict):
+                    addonNames.update(data['addons'].keys())
+
+            softwares[softwareName] = sorted(addonNames)
+
+        return {
+            'stats': [[x] + self.__fileStat(os.path.join(directory, x)) for x in dependencies],
+            'softwares': softwares
+        }
+
+    def __validIndexEntry(self, directory, entry):
+        """
+        Return a boolean telling if the files used by an index entry did not change.
+
+        @private
+        """
+        try:
+            for dependency in entry['stats']:
+                if self.__fileStat(os.path.join(directory, dependency[0])) != dependency[1:]:
+                    return False
+        except (KeyError, TypeError, IndexError):
+            return False
+
+        return True
+
+    @staticmethod
+    def __publishedDigests(paths):
+        """
+        Return a list with the digest of the manifest published for each path (None when a path does not have one).
+
+        @private
+        """
+        # imported on demand (expensive import)
+        from ..Mirror import Mirror
+
+        result = []
+        for path in paths:
+            manifest = Mirror.readManifest(path) if os.path.isdir(path) else None
+            if manifest is None:
+                return None
+
+            result.append(manifest['digest'])
+
+        return result
+
+    @staticmethod
+    def __fileStat(filePath):
+        """
+        Return a list with the modification time (in nanoseconds) and size of a file ([0, -1] when it does not exist).
+
+        @private
+        """
+        try:
+            fileStat = os.stat(filePath)
+        except OSError:
+            return [0, -1]
+
+        return [fileStat.st_mtime_ns, fileStat.st_size]
+
+    def __readIndex(self, directory):
+        """
+        Return a dict with the index entries of a directory (empty when it does not exist or it's invalid).
+
+        @private
+        """
+        try:
+            with open(os.path.join(directory, self.indexName), 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(index, dict) or not isinstance(index.get('files'), dict):
+            return {}
+
+        return index['files']
+
+    def __writeIndex(self, directory, entries):
+        """
+        Write the index entries of a directory.
+
+        @private
+        """
+        fd, temporaryFile = tempfile.mkstemp(dir=directory, prefix='.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'files': entries}, f, indent=4, sort_keys=True)
+            os.chmod(temporaryFile, 0o644)
+            os.replace(temporaryFile, os.path.join(directory, self.indexName))
+        except Exception:
+            os.remove(temporaryFile)
+            raise
+
+    def __privateFilePath(self, directory, paths, activeVersionFromEnv, recursive):
+        """
+        Return the path of a file stored per paths and env versions under a local directory of the user.
+
+        @private
+        """
+        envVersions = sorted(
+            (name, value) for name, value in (activeVersionFromEnv or {}).items()
+            if name.startswith('BVER_') and name.endswith('_VERSION')
+        )
+
+        return os.path.join(
+            directory,
+            '{0}.json'.format(
+                hashlib.sha1(
+                    json.dumps([list(map(os.path.realpath, paths)), recursive, envVersions]).encode('utf-8')
+                ).hexdigest()
+            )
+        )
+
+    def __readPrivateFile(self, filePath):
+        """
+        Return the contents of a file stored under the local directory of the user (None when not available).
+
+        @private
+        """
+        try:
+            if not (self.__privatePath(os.path.dirname(filePath)) and self.__privatePath(filePath)):
+                return None
+
+            with open(filePath, 'rb') as f:
+                return self.__jsonBackend.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def __writePrivateFile(self, filePath, data):
+        """
+        Store the contents of a file under the local directory of the user.
+
+        @private
+        """
+        directory = os.path.dirname(filePath)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not self.__privatePath(directory):
+            raise OSError(
+                'Directory "{0}" is not private to the user'.format(directory)
+            )
+
+        fd, temporaryFile = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                self.__jsonBackend.dump(data, f)
+            os.replace(temporaryFile, filePath)
+        except Exception:
+            os.remove(temporaryFile)
+            raise
+
+    @staticmethod
+    def __privatePath(path):
+        """
+        Return a boolean telling if the path is owned by the user and not writable by others.
+
+        @private
+        """
+        # ownership is not available (windows)
+        if not hasattr(os, 'getuid'):
+            return True
+
+        pathStat = os.stat(path)
+        return pathStat.st_uid == os.getuid() and not pathStat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    def __addFromJsonFiles(self, jsonFiles, activeVersionFromEnv):
+        """
+        Add a list of json files (in precedence order, @see jsonFiles) to the loader through a keyed merge.
+
+        @private
+        """
+        self._addFromDocuments(jsonFiles, self.__decodeJsonFile, activeVersionFromEnv)
+
+    def __decodeJsonFile(self, jsonFile):
+        """
+        Return a tuple with the decoded contents of a json file and its directory.
+
+        @private
+        """
+        # making sure it's a valid file
+        if not os.path.isfile(jsonFile):
+            raise InvalidFileError(
+                'Invalid file "{0}"!'.format(jsonFile)
+            )
+
+        return (self.__jsonBackend.loads(self.__readFile(jsonFile)), os.path.dirname(jsonFile))
+
+    @staticmethod
+    def __mergeDefinition(definitions, key, fileName, value):
+        """
+        Merge a definition into a dict of [file name, shadowed file names, value] by key.
+
+        The definitions are merged in precedence order, therefore the
+        current winner (if any) gets shadowed.
+
+        @private
+        """
+        entry = definitions.get(key)
+        if entry is None:
+            definitions[key] = [fileName, [], value]
+            return
+
+        entry[1].insert(0, entry[0])
+        entry[0] = fileName
+        entry[2] = value
+
+    @staticmethod
+    def __collectJsonFiles(directory, recursive, result, visitedFiles, visitedDirectories):
+        """
+        Collect the json files of a directory (@see jsonFiles).
+
+        The stat information cached by the directory entries is used whenever
+        possible, so symlinks are the only entries that need to be resolved.
+
+        @private
+        """
+        realDirectory = os.path.realpath(directory)
+        if realDirectory in visitedDirectories:
+            return
+        visitedDirectories.add(realDirectory)
+
+        try:
+            entries = sorted(os.scandir(directory), key=lambda x: x.name)
+        except OSError:
+            return
+
+        versionsDirectorySuffix = JsonLoader.__versionsDirectorySuffix
+        subDirectories = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+
+            try:
+                if entry.name.endswith('.json') and entry.is_file():
+                    if entry.is_symlink():
+                        realPath = os.path.realpath(entry.path)
+                    else:
+                        realPath = os.path.join(realDirectory, entry.name)
+
+                    if realPath not in visitedFiles:
+                        visitedFiles.add(realPath)
+                        result.append(entry.path)
+
+                elif recursive and not entry.name.endswith(versionsDirectorySuffix) and entry.is_dir():
+                    subDirectories.append(entry.path)
+            except OSError:
+                continue
+
+        for subDirectory in subDirectories:
+            JsonLoader.__collectJsonFiles(
+                subDirectory,
+                recursive,
+                result,
+                visitedFiles,
+                visitedDirectories
+            )
+
+    def __readFile(self, fileName):
+        """
+        Return the binary contents of a file (cached).
+
+        @private
+        """
+        if fileName not in self.__cache:
+            with open(fileName, 'rb') as f:
+                self.__cache[fileName] = f.read()
+
+        return self.__cache[fileName]
+
+    def __versionContents(self, softwareName, versions, version, baseDirectory, required):
+        """
+        Return the parsed contents of a version stored in a version directory.
+
+        It returns None when the version is not available and it's not required.
+
+        @private
+        """
+        # the version directory needs to be a direct child of the base directory
+        if not self.validVersionsDirectoryName(versions):
+            raise UnexpectedVersionFormatError(
+                'Expecting a "{0}" directory for the versions of "{1}"'.format(
+                    self.__versionsDirectorySuffix,
+                    softwareName
+                )
+            )
+
+        # the version may come from the env, making sure it can only
+        # refer to a file inside of the version directory
+        if not self.__validFileName(version):
+            raise UnexpectedVersionFormatError(
+                'Invalid version "{0}" of "{1}"'.format(
+                    version,
+                    softwareName
+                )
+            )
+
+        versionFile = os.path.join(
+            baseDirectory or '',
+            versions,
+            '{0}.json'.format(version)
+        )
+
+        if not os.path.isfile(versionFile):
+            if not required:
+                return None
+
+            raise InvalidFileError(
+                'Invalid file "{0}"!'.format(versionFile)
+            )
+
+        contents = self.__jsonBackend.loads(self.__readFile(versionFile))
+        if not isinstance(contents, dict):
+            raise UnexpectedVersionFormatError(
+                'Expecting object as content for version "{0}" of "{1}"'.format(
+                    version,
+                    softwareName
+                )
+            )
+
+        return contents
+
+    @classmethod
+    def validVersionsDirectoryName(cls, name):
+        """
+        Return a boolean telling if a name is valid for a directory of versions split per file.
+
+        The directory needs to be inside of the directory of the json file referring to it.
+        """
+        return cls.__validFileName(name) and name.endswith(cls.__versionsDirectorySuffix)
+
+    @staticmethod
+    def __validFileName(name):
+        """
+        Return a boolean telling if a name can only refer to an entry inside of a directory.
+
+        @private
+        """
+        return isinstance(name, basestring) and bool(name) and '..' not in name and \
+            not any(x and x in name for x in ('/', os.sep, os.altsep))
+
+    @classmethod
+    def __versionFileNames(cls, versions, baseDirectory):
+        """
+        Return a list with the versions available in a version directory.
+
+        @private
+        """
+        versionsDirectory = os.path.join(baseDirectory or '', versions)
+        if not cls.validVersionsDirectoryName(versions) or not os.path.isdir(versionsDirectory):
+            return []
+
+        return [
+            x.name[:-len('.json')] for x in os.scandir(versionsDirectory)
+            if x.name.endswith('.json') and not x.name.startswith('.')
+        ]
+
+    def __addParsedSoftware(self, softwareName, softwareContents, activeVersionFromEnv, ignoreAddons=False, baseDirectory=None):
         """
         Add a software based on the parsed software contents.
 
+        @private
+        """
+        definition = self.__softwareDefinition(
+            softwareName,
+            softwareContents,
+            activeVersionFromEnv,
+            ignoreAddons,
+            baseDirectory
+        )
+
+        # no configuration for the particular version
+        if definition is None:
+            return
+
+        version, options, availableVersions, addons = definition
+
+        # adding software
+        self.addSoftwareInfo(softwareName, version, options, availableVersions)
+
+        # adding addons
+        for addonName, addonOptions in addons.items():
+            self.addAddonInfo(softwareName, addonName, addonOptions)
+
+    def __softwareDefinition(self, softwareName, softwareContents, activeVersionFromEnv, ignoreAddons=False, baseDirectory=None):
+        """
+        Return a tuple (version, options, available versions, addon options) parsed from the software contents.
+
+        It returns None when the contents do not have configuration for the
+        version defined by the env.
+
         @private
         """
         options = {}
         addons = {}
+        availableVersions = ()
         softwareBverName = Versioned.toBverName(softwareName)
         version = activeVersionFromEnv[softwareBverName] if activeVersionFromEnv and softwareBverName in activeVersionFromEnv else None
 
         # if case the contents contain multiple versions
         # loading the information from the specific version
         if 'versions' in softwareContents:
-            # skipping the parsing in case the contents does not have configuration
-            # for the particular version
-            if version and version not in softwareContents['versions']:
-                return
-            version = version or softwareContents['active']
-            softwareContents = dict(softwareContents['versions'][version])
-            softwareContents['version'] = version
+            versions = softwareContents['versions']
+
+            # versions split per file, only parsing the one that is going to be used
+            if isinstance(versions, basestring):
+                availableVersions = self.__versionFileNames(versions, baseDirectory)
+                versionContents = self.__versionContents(
+                    softwareName,
+                    versions,
+                    version or softwareContents['active'],
+                    baseDirectory,
+                    required=version is None
+                )
+
+                # skipping the parsing in case there is no configuration
+                # for the particular version
+                if versionContents is None:
+                    return None
+                version = version or softwareContents['active']
+                softwareContents = dict(versionContents)
+                softwareContents['version'] = version
+
+            else:
+                # skipping the parsing in case the contents does not have configuration
+                # for the particular version
+                if version and version not in versions:
+                    return None
+                availableVersions = versions.keys()
+                version = version or softwareContents['active']
+                softwareContents = dict(versions[version])
+                softwareContents['version'] = version
 
         if isinstance(softwareContents, dict):
             if version is None and 'version' in softwareContents:
@@ -219,6 +1158,9 @@ class JsonLoader(Loader):
             if 'options' in softwareContents:
                 options = softwareContents['options']
 
+                if not isinstance(options, dict):
+                    raise UnexpectedOptionsDataError('Expecting object for options!')
+
             if 'addons' in softwareContents:
                 addons = softwareContents['addons']
 
@@ -232,16 +1174,17 @@ class JsonLoader(Loader):
                 'Could not decode version for "{0}"'.format(softwareName)
             )
 
-        # adding software
-        self.addSoftwareInfo(softwareName, version, options)
-
-        # adding addons
-        if not ignoreAddons:
-            self.__addParsedAddons(softwareName, addons)
+        return (
+            version,
+            options,
+            availableVersions,
+            {} if ignoreAddons else self.__parsedAddons(addons)
+        )
 
-    def __addParsedAddons(self, softwareName, addons):
+    @staticmethod
+    def __parsedAddons(addons):
         """
-        Add an addon based on the parsed addon contents.
+        Return a dict with the options of each addon based on the parsed addon contents.
 
         @private
         """
@@ -249,6 +1192,7 @@ class JsonLoader(Loader):
         if not isinstance(addons, dict):
             raise UnexpectedAddonsDataError('Expecting object for addons!')
 
+        result = {}
         for addonName, addonData in addons.items():
             addonOptions = {}
 
@@ -258,4 +1202,9 @@ class JsonLoader(Loader):
             if 'options' in addonData:
                 addonOptions = addonData['options']
 
-            self.addAddonInfo(softwareName, addonName, addonOptions)
+                if not isinstance(addonOptions, dict):
+                    raise UnexpectedOptionsDataError('Expecting object for addon options!')
+
+            result[addonName] = addonOptions
+
+        return result
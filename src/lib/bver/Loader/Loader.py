@@ -1,6 +1,8 @@
-from ..Versioned import Versioned
-from ..Versioned import Software
-from ..Versioned import Addon
+import threading
+from contextlib import contextmanager
+from collections import ChainMap, deque
+from ..Versioned import Versioned, Version
+from ..ResolvedTable import ResolvedTable
 
 class AddonNotFoundError(Exception):
     """Addon not found in the softwares error."""
@@ -11,26 +13,57 @@ class Loader(object):
 
     Returns a list of software instances based on the addon and software
     information (@see softwares)
+
+    The information is published as immutable states: changes are applied
+    to a draft that replaces the published state through a single
+    reference swap (at the end of a batch, @see batch). Therefore readers
+    never take a lock and always see a consistent state, even when
+    another thread is loading information.
+
+    Loaders can be layered (@see overlay): the information added to an
+    overlay is kept as a delta on top of an immutable snapshot of the base
+    loader, so the base is only loaded once for any number of overlays.
+
+    The fingerprint of the loader (@see fingerprint) is kept incrementally
+    through the names changed by each publication.
     """
 
+    __changesLimit = 64
+
     def __init__(self):
         """
         Create a software.
         """
-        self.__softwares = {}
-        self.__addons = {}
-
-    def addSoftwareInfo(self, softwareName, version, options={}):
+        self.__state = ({}, {})
+        self.__draft = None
+        self.__batchDepth = 0
+        self.__writeLock = threading.RLock()
+        self.__base = None
+        self.__basePrecedence = False
+        self.__layerSnapshot = None
+        self.__changes = deque(maxlen=self.__changesLimit)
+        self.__fingerprintLock = threading.Lock()
+        self.__fingerprintCache = None
+
+    def addSoftwareInfo(self, softwareName, version, options={}, availableVersions=()):
         """
         Add an addon to a specific software.
+
+        The available versions are the versions the software could be
+        resolved to (for instance, all the versions found in the config),
+        they are kept sorted (@see Version).
         """
         assert isinstance(options, dict), \
             'options need to be a dictionary'
 
-        self.__softwares[softwareName] = {
-            'version': version,
-            'options': dict(options)
-        }
+        with self.__writeLock:
+            softwares, addons, ownedAddons, changedNames = self.__writableDraft()
+            changedNames.add(softwareName)
+            softwares[softwareName] = {
+                'version': version,
+                'options': dict(options),
+                'availableVersions': sorted(set(availableVersions), key=lambda x: Version.parse(x).key())
+            }
 
     def addAddonInfo(self, softwareName, addonName, options={}):
         """
@@ -39,13 +72,151 @@ class Loader(object):
         assert isinstance(options, dict), \
             'options need to be a dictionary'
 
-        if softwareName not in self.__addons:
-            self.__addons[softwareName] = {}
+        with self.__writeLock:
+            softwares, addons, ownedAddons, changedNames = self.__writableDraft()
+
+            # the addons of the software may be shared with the published state
+            if softwareName not in ownedAddons:
+                addons[softwareName] = dict(addons.get(softwareName, {}))
+                ownedAddons.add(softwareName)
+
+            addons[softwareName][addonName] = {
+                'options': dict(options)
+            }
+
+    @contextmanager
+    def batch(self):
+        """
+        Return a context manager grouping changes into a single publication.
+
+        The changes done inside of the batch are only visible to the readers
+        once the (outermost) batch exits. In case of errors the changes done
+        inside of the batch are discarded. Batches can be nested.
+        """
+        with self.__writeLock:
+            if self.__batchDepth == 0:
+                self.__publish()
+            self.__batchDepth += 1
+            try:
+                yield self
+            except Exception:
+                if self.__batchDepth == 1:
+                    self.__draft = None
+                raise
+            finally:
+                self.__batchDepth -= 1
+
+            if self.__batchDepth == 0:
+                self.__publish()
+
+    def softwareNames(self):
+        """
+        Return a list with the names of the added softwares.
+        """
+        return list(self.__softwareInfos(self.__publishedState()).keys())
+
+    def addonNames(self, softwareName):
+        """
+        Return a list with the names of the addons added to a software.
+        """
+        return list(self.__addonInfos(self.__publishedState(), softwareName).keys())
+
+    def serialize(self, env={}, names=None):
+        """
+        Return bytes with the serialized resolution of the softwares (@see ResolvedTable.serialize).
+        """
+        return self.resolvedTable(env).serialize(names)
+
+    def addFromSerialized(self, data):
+        """
+        Add the software/addon information from a serialized resolution (@see serialize).
+
+        The addon versions are kept as resolved (the softwares used as
+        addons still need to be part of the loader).
+        """
+        table = ResolvedTable.deserialize(data)
+        versions = table.versions()
+        with self.batch():
+            for softwareName in table.names():
+                row = table.row(softwareName)
+                self.addSoftwareInfo(
+                    softwareName,
+                    row['version'],
+                    row['options'],
+                    table.availableVersions(softwareName)
+                )
 
-        self.__addons[softwareName][addonName] = {
-            'options': dict(options)
+                # pinning the addon versions that would not be resolved the same way
+                for addonName, addonRow in row['addons'].items():
+                    addonOptions = dict(addonRow['options'])
+                    addonIndex = table.index(addonName)
+                    if addonIndex is None or versions[addonIndex] != addonRow['version']:
+                        addonOptions['version'] = addonRow['version']
+
+                    self.addAddonInfo(softwareName, addonName, addonOptions)
+
+    def infoData(self):
+        """
+        Return a dict with the software/addon information (including the base).
+
+        The result can be serialized as json and added back through {@link addFromInfoData}.
+        """
+        softwares, addons = self.__snapshot()
+
+        return {
+            'softwares': dict(softwares),
+            'addons': dict((x, y) for x, y in addons.items() if y)
         }
 
+    def addFromInfoData(self, infoData):
+        """
+        Add the software/addon information returned by {@link infoData}.
+        """
+        with self.batch():
+            for softwareName, softwareInfo in infoData['softwares'].items():
+                self.addSoftwareInfo(
+                    softwareName,
+                    softwareInfo['version'],
+                    softwareInfo['options'],
+                    softwareInfo.get('availableVersions', ())
+                )
+
+            for softwareName, addons in infoData['addons'].items():
+                for addonName, addonInfo in addons.items():
+                    self.addAddonInfo(
+                        softwareName,
+                        addonName,
+                        addonInfo['options']
+                    )
+
+    def overlay(self, basePrecedence=False):
+        """
+        Return a new loader layered on top of this loader.
+
+        The overlay uses an immutable snapshot of the current information of
+        this loader as base (changes done to this loader afterwards are not
+        visible by the overlay). The information added to the overlay takes
+        precedence over the base, where addons are merged per addon name.
+
+        When basePrecedence is specified the base takes precedence instead
+        (the overlay only adds the softwares and addons not defined by the
+        base), for instance the config root loaded after the config paths.
+        """
+        result = self._newOverlay()
+        result.__base = self.__snapshot()
+        result.__basePrecedence = basePrecedence
+
+        return result
+
+    def _newOverlay(self):
+        """
+        Return a new empty loader used as overlay (@see overlay).
+
+        Loaders created with arguments override it, so the overlay keeps
+        the same configuration.
+        """
+        return type(self)()
+
     def softwares(self, env={}):
         """
         Return a list of softwares based on the added software/addon info.
@@ -54,61 +225,156 @@ class Loader(object):
         going to use that instead of the parsed version. The version
         in the input env needs to be defined following {@link versioned.bverName}.
         """
-        # now creating softwares
-        result = []
-        for softwareName in self.__softwares.keys():
-            softwareVersion = self.__softwareVersion(softwareName, env)
-            softwareOptions = self.__softwares[softwareName]['options']
+        return self.resolvedTable(env).softwares()
 
-            # creating a software instance
-            software = Software(
-                softwareName,
-                softwareVersion
-            )
-
-            # setting software options
-            self.__setVersionedOptions(software, softwareOptions)
+    def resolvedTable(self, env={}):
+        """
+        Return a resolved table (@see ResolvedTable) based on the added software/addon info.
 
-            # adding addons to the software
-            self.__addAddonsToSoftware(software, env)
+        The versions are resolved following the same rules used by {@link softwares}.
+        """
+        state = self.__publishedState()
+        softwareInfos = self.__softwareInfos(state)
+
+        names = []
+        versions = []
+        options = []
+        edgeOffsets = [0]
+        edgeNames = []
+        edgeVersions = []
+        edgeOptions = []
+        availableVersions = []
+        for softwareName in softwareInfos.keys():
+            names.append(softwareName)
+            versions.append(self.__softwareVersion(softwareInfos, softwareName, env))
+            options.append(softwareInfos[softwareName]['options'])
+            availableVersions.append(softwareInfos[softwareName].get('availableVersions', ()))
+
+            # resolving the addons of the software
+            for addonName, addonContent in self.__addonInfos(state, softwareName).items():
+                if addonName not in softwareInfos:
+                    raise AddonNotFoundError(
+                        'Could not find a version for the addon "{0}" for the software: "{1}"'.format(
+                            addonName,
+                            softwareName
+                        )
+                    )
 
-            # adding software to result
-            result.append(software)
+                addonOptions = addonContent['options']
+                edgeNames.append(addonName)
+                edgeVersions.append(
+                    addonOptions['version'] if 'version' in addonOptions else self.__softwareVersion(softwareInfos, addonName, env)
+                )
+                edgeOptions.append(addonOptions)
+
+            edgeOffsets.append(len(edgeNames))
+
+        return ResolvedTable(
+            names,
+            versions,
+            options,
+            edgeOffsets,
+            edgeNames,
+            edgeVersions,
+            edgeOptions,
+            availableVersions
+        )
+
+    def fingerprint(self, env={}):
+        """
+        Return a stable content hash of the resolved softwares (versions, options and addons).
+
+        The fingerprint is the same for identical resolutions regardless of
+        the order the information was added. It's the sum of a hash per
+        software (@see ResolvedTable.rowHash), kept across calls where only
+        the softwares changed since the last call (and the softwares using
+        them as addons) get rehashed. Likewise, the versions overridden by
+        the env only rehash the overridden softwares and their dependents.
+        """
+        with self.__fingerprintLock:
+            state = self.__publishedState()
+            softwareInfos = self.__softwareInfos(state)
 
-        return result
+            try:
+                entries, dependents, bverNames, total = self.__fingerprintEntries(state, softwareInfos)
+            except Exception:
+                self.__fingerprintCache = None
+                raise
 
-    def __softwareVersion(self, name, env):
-        """
-        Return the version for the input software.
+            # softwares affected by the version overrides
+            overriddenNames = set()
+            for bverName, version in env.items():
+                softwareName = bverNames.get(bverName)
+                if softwareName is not None and softwareInfos[softwareName]['version'] != version:
+                    overriddenNames.add(softwareName)
 
-        @private
-        """
-        version = self.__softwares[name]['version']
+            affectedNames = set(overriddenNames)
+            for softwareName in overriddenNames:
+                affectedNames.update(dependents.get(softwareName, ()))
 
-        # in case there is a version override under the env
-        bverName = Versioned.toBverName(name)
-        if bverName in env:
-            version = env[bverName]
+            for softwareName in affectedNames:
+                total += self.__fingerprintEntry(state, softwareInfos, softwareName, env)[0] - entries[softwareName][0]
 
-        return version
+        return '{0:064x}'.format(total % (1 << 256))
 
-    def __addAddonsToSoftware(self, software, env):
+    def __fingerprintEntries(self, state, softwareInfos):
         """
-        Add addons to a software.
+        Return a tuple (entries, dependents, bver names, total) with the fingerprint information of a state.
+
+        The information is updated from the previous call by only rehashing
+        the softwares changed since (and their dependents). Needs to be
+        called holding the fingerprint lock.
 
         @private
         """
-        assert isinstance(software, Software), \
-            "Invalid software type!"
-
-        softwareName = software.name()
-
-        if softwareName not in self.__addons:
-            return
+        cache = self.__fingerprintCache
+        if cache is not None and cache[0] is state:
+            return cache[1:]
+
+        changedNames = None
+        if cache is not None:
+            changedNames = self.__changedNamesSince(cache[0])
+
+        if changedNames is None:
+            entries, dependents, bverNames, total = {}, {}, {}, 0
+            changedNames = set(softwareInfos.keys())
+        else:
+            entries, dependents, bverNames, total = cache[1:]
+
+        dirtyNames = set(changedNames)
+        for softwareName in changedNames:
+            dirtyNames.update(dependents.get(softwareName, ()))
+
+        for softwareName in dirtyNames:
+            if softwareName in entries:
+                entryHash, addonNames = entries.pop(softwareName)
+                total -= entryHash
+                for addonName in addonNames:
+                    dependents[addonName].discard(softwareName)
+
+            # addons can be added before the software itself
+            if softwareName not in softwareInfos:
+                continue
+
+            entries[softwareName] = self.__fingerprintEntry(state, softwareInfos, softwareName, {})
+            total += entries[softwareName][0]
+            bverNames[Versioned.toBverName(softwareName)] = softwareName
+            for addonName in entries[softwareName][1]:
+                dependents.setdefault(addonName, set()).add(softwareName)
+
+        self.__fingerprintCache = (state, entries, dependents, bverNames, total)
+
+        return (entries, dependents, bverNames, total)
+
+    def __fingerprintEntry(self, state, softwareInfos, softwareName, env):
+        """
+        Return a tuple (hash, addon names) with the fingerprint entry of a software.
 
-        # creating addons for the software
-        for addonName, addonContent in self.__addons[softwareName].items():
-            if addonName not in self.__softwares:
+        @private
+        """
+        addons = []
+        for addonName, addonContent in self.__addonInfos(state, softwareName).items():
+            if addonName not in softwareInfos:
                 raise AddonNotFoundError(
                     'Could not find a version for the addon "{0}" for the software: "{1}"'.format(
                         addonName,
@@ -116,29 +382,159 @@ class Loader(object):
                     )
                 )
 
-            addonVersion = self.__softwareVersion(addonName, env)
             addonOptions = addonContent['options']
-
-            # creating addon
-            addon = Addon(
+            addons.append([
                 addonName,
-                addonVersion if 'version' not in addonOptions else addonOptions['version']
+                addonOptions['version'] if 'version' in addonOptions else self.__softwareVersion(softwareInfos, addonName, env),
+                addonOptions
+            ])
+
+        rowHash = ResolvedTable.rowDigest(
+            softwareName,
+            self.__softwareVersion(softwareInfos, softwareName, env),
+            softwareInfos[softwareName]['options'],
+            addons
+        )
+
+        return (int(rowHash, 16), tuple(x[0] for x in addons))
+
+    def __changedNamesSince(self, state):
+        """
+        Return a set with the names changed by the publications done after a state (None when not tracked anymore).
+
+        @private
+        """
+        result = None
+        for previousState, publishedState, changedNames in list(self.__changes):
+            if result is None:
+                if previousState is not state:
+                    continue
+                result = set()
+
+            result.update(changedNames)
+
+        return result
+
+    def __writableDraft(self):
+        """
+        Return the draft (softwares, addons, owned addons, changed software names) receiving the changes.
+
+        The draft is created from the published state (the addons of a
+        software are only copied once they get modified, @see addAddonInfo).
+        Needs to be called holding the write lock.
+
+        @private
+        """
+        if self.__draft is None:
+            softwares, addons = self.__state
+            self.__draft = (dict(softwares), dict(addons), set(), set())
+
+        return self.__draft
+
+    def __publish(self):
+        """
+        Publish the draft replacing the current state.
+
+        Needs to be called holding the write lock.
+
+        @private
+        """
+        if self.__draft is not None:
+            softwares, addons, ownedAddons, changedNames = self.__draft
+            self.__draft = None
+
+            # keeping track of the names changed by the publication (the
+            # addons of a software are only owned by the draft when changed)
+            previousState = self.__state
+            self.__state = (softwares, addons)
+            self.__changes.append((previousState, self.__state, changedNames.union(ownedAddons)))
+
+    def __publishedState(self):
+        """
+        Return the published state (softwares, addons).
+
+        Changes done outside of a batch are published by the first
+        reader (unless the loader is busy with a batch).
+
+        @private
+        """
+        if self.__draft is not None and self.__batchDepth == 0 and self.__writeLock.acquire(False):
+            try:
+                if self.__batchDepth == 0:
+                    self.__publish()
+            finally:
+                self.__writeLock.release()
+
+        return self.__state
+
+    def __snapshot(self):
+        """
+        Return an immutable snapshot (softwares, addons) of the loader information.
+
+        The snapshot is flattened (including the base) and cached until the
+        loader gets modified.
+
+        @private
+        """
+        state = self.__publishedState()
+        if self.__layerSnapshot is None or self.__layerSnapshot[0] is not state:
+            addonSoftwareNames = set(state[1].keys())
+            if self.__base is not None:
+                addonSoftwareNames.update(self.__base[1].keys())
+
+            self.__layerSnapshot = (
+                state,
+                (
+                    dict(self.__softwareInfos(state)),
+                    dict((x, self.__addonInfos(state, x)) for x in addonSoftwareNames)
+                )
             )
 
-            # setting addon options
-            self.__setVersionedOptions(addon, addonOptions)
+        return self.__layerSnapshot[1]
 
-            # adding addon to software
-            software.addAddon(addon)
+    def __softwareInfos(self, state):
+        """
+        Return a mapping with the software information of a state (including the base).
 
-    def __setVersionedOptions(self, versioned, options):
+        @private
         """
-        Set options to a versioned instance.
+        if self.__base is None:
+            return state[0]
+
+        if self.__basePrecedence:
+            return ChainMap(self.__base[0], state[0])
+
+        return ChainMap(state[0], self.__base[0])
+
+    def __addonInfos(self, state, softwareName):
+        """
+        Return a dict with the addon information of a software in a state (including the base).
+
+        @private
+        """
+        if self.__base is None or softwareName not in self.__base[1]:
+            return dict(state[1].get(softwareName, {}))
+
+        if self.__basePrecedence:
+            result = dict(state[1].get(softwareName, {}))
+            result.update(self.__base[1][softwareName])
+        else:
+            result = dict(self.__base[1][softwareName])
+            result.update(state[1].get(softwareName, {}))
+
+        return result
+
+    def __softwareVersion(self, softwareInfos, name, env):
+        """
+        Return the version for the input software.
 
         @private
         """
-        assert isinstance(versioned, Versioned), \
-            "Invalid versioned type"
+        version = softwareInfos[name]['version']
+
+        # in case there is a version override under the env
+        bverName = Versioned.toBverName(name)
+        if bverName in env:
+            version = env[bverName]
 
-        for optionName, optionValue in options.items():
-            versioned.setOption(optionName, optionValue)
+        return version
@@ -0,0 +1,581 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from .Loader import Loader
+from .. import JsonBackend
+from .JsonLoader import \
+    JsonLoader, \
+    UnexpectedRootContentError, \
+    UnexpectedVersionFormatError
+
+# compatibility with python 2/3
+try:
+    basestring
+except NameError:
+    basestring = str
+
+class SoftwareNotFoundError(Exception):
+    """Software not found in the database error."""
+
+class SqliteLoader(Loader):
+    """
+    Loads a list of softwares from a sqlite database.
+
+    The database stores every version of the softwares (the active one
+    is used when resolving the softwares) along with their options and
+    addons in indexed tables. The database runs in WAL mode, therefore
+    readers are never blocked by a writer and never see partial changes.
+
+    Each thread uses its own connection (transactions of different threads
+    never share a connection).
+    """
+
+    __schema = (
+        'CREATE TABLE IF NOT EXISTS softwares ('
+        '  name TEXT PRIMARY KEY,'
+        '  active TEXT NOT NULL'
+        ')',
+        'CREATE TABLE IF NOT EXISTS versions ('
+        '  software TEXT NOT NULL,'
+        '  version TEXT NOT NULL,'
+        '  options TEXT NOT NULL,'
+        '  PRIMARY KEY (software, version)'
+        ')',
+        'CREATE TABLE IF NOT EXISTS addons ('
+        '  software TEXT NOT NULL,'
+        '  version TEXT NOT NULL,'
+        '  addon TEXT NOT NULL,'
+        '  options TEXT NOT NULL,'
+        '  PRIMARY KEY (software, version, addon)'
+        ')',
+        'CREATE INDEX IF NOT EXISTS addonsByAddon ON addons (addon)'
+    )
+
+    def __init__(self, databasePath, jsonBackend=None, *args, **kwargs):
+        """
+        Create a sqlite loader object.
+
+        The json backend decodes/encodes the json files and the options
+        stored in the database (@see JsonBackend.backend), by default the
+        fastest one installed.
+        """
+        super(SqliteLoader, self).__init__(*args, **kwargs)
+
+        self.__databasePath = databasePath
+        self.__jsonBackend = jsonBackend or JsonBackend.backend()
+        self.__local = threading.local()
+        self.__connections = []
+        self.__connectionsLock = threading.Lock()
+
+        with self.__transaction() as cursor:
+            for statement in self.__schema:
+                cursor.execute(statement)
+
+    def databasePath(self):
+        """
+        Return the path of the database.
+        """
+        return self.__databasePath
+
+    def jsonBackend(self):
+        """
+        Return the json backend used to decode/encode the json contents.
+        """
+        return self.__jsonBackend
+
+    def close(self):
+        """
+        Close the connections with the database (of all threads).
+        """
+        with self.__connectionsLock:
+            connections = self.__connections
+            self.__connections = []
+            self.__local = threading.local()
+
+        for connection in connections:
+            connection.close()
+
+    def addSoftwareInfo(self, softwareName, version, options={}, availableVersions=()):
+        """
+        Add a software setting the version as the active one.
+
+        The available versions that are not in the database yet are added without options.
+        """
+        assert isinstance(options, dict), \
+            'options need to be a dictionary'
+
+        with self.__transaction() as cursor:
+            self.__addVersion(cursor, softwareName, version, options, activate=True)
+            cursor.executemany(
+                'INSERT OR IGNORE INTO versions (software, version, options) VALUES (?, ?, ?)',
+                [(softwareName, x, '{}') for x in availableVersions]
+            )
+
+    def addAddonInfo(self, softwareName, addonName, options={}):
+        """
+        Add an addon to the active version of a specific software.
+        """
+        assert isinstance(options, dict), \
+            'options need to be a dictionary'
+
+        with self.__transaction() as cursor:
+            version = self.__activeVersion(cursor, softwareName)
+            if version is None:
+                raise SoftwareNotFoundError(
+                    'Software "{0}" needs to be added before its addons'.format(softwareName)
+                )
+
+            self.__addAddon(cursor, softwareName, version, addonName, options)
+
+    @contextmanager
+    def batch(self):
+        """
+        Return a context manager running the changes inside of a single transaction.
+
+        The changes are only visible to the readers once the (outermost) batch
+        exits. In case of errors the changes done inside of the batch are
+        rolled back. Batches can be nested.
+        """
+        with self.__transaction():
+            yield self
+
+    def infoData(self):
+        """
+        Return a dict with the software/addon information of the active versions.
+        """
+        return self.__activeLoader().infoData()
+
+    def softwareNames(self):
+        """
+        Return a list with the names of the added softwares.
+        """
+        return [x[0] for x in self.__threadConnection().execute(
+            'SELECT name FROM softwares ORDER BY rowid'
+        )]
+
+    def addonNames(self, softwareName):
+        """
+        Return a list with the names of the addons of the active version of a software.
+        """
+        return [x[0] for x in self.__threadConnection().execute(
+            'SELECT a.addon FROM addons a JOIN softwares s '
+            'ON a.software = s.name AND a.version = s.active '
+            'WHERE s.name = ? ORDER BY a.rowid',
+            (softwareName,)
+        )]
+
+    def versions(self, softwareName):
+        """
+        Return a list with all versions available for a software.
+        """
+        return [x[0] for x in self.__threadConnection().execute(
+            'SELECT version FROM versions WHERE software = ? ORDER BY rowid',
+            (softwareName,)
+        )]
+
+    def resolvedTable(self, env={}):
+        """
+        Return a resolved table based on the active versions in the database.
+
+        @see Loader.resolvedTable
+        """
+        return self.__activeLoader().resolvedTable(env)
+
+    def fingerprint(self, env={}):
+        """
+        Return a stable content hash based on the active versions in the database.
+
+        @see Loader.fingerprint
+        """
+        return self.__activeLoader().fingerprint(env)
+
+    def overlay(self, basePrecedence=False):
+        """
+        Return a new loader layered on top of the active versions in the database.
+
+        The overlay is kept in memory (@see Loader.overlay).
+        """
+        return self.__activeLoader().overlay(basePrecedence)
+
+    def software(self, softwareName, env={}):
+        """
+        Return a software instance based on software's name.
+
+        Only the software and the softwares used as its addons are queried.
+        """
+        with self.__transaction(write=False) as cursor:
+            addonRows = cursor.execute(
+                'SELECT a.software, a.addon, a.options FROM addons a JOIN softwares s '
+                'ON a.software = s.name AND a.version = s.active '
+                'WHERE s.name = ? ORDER BY a.rowid',
+                (softwareName,)
+            ).fetchall()
+
+            names = [softwareName] + [x[1] for x in addonRows]
+            softwareRows = cursor.execute(
+                'SELECT s.name, s.active, v.options FROM softwares s JOIN versions v '
+                'ON v.software = s.name AND v.version = s.active '
+                'WHERE s.name IN ({0}) ORDER BY s.rowid'.format(', '.join('?' * len(names))),
+                names
+            ).fetchall()
+
+            availableVersions = {
+                softwareName: [x[0] for x in cursor.execute(
+                    'SELECT version FROM versions WHERE software = ?',
+                    (softwareName,)
+                )]
+            }
+
+        for software in self.__loader(softwareRows, addonRows, availableVersions).softwares(env):
+            if software.name() == softwareName:
+                return software
+
+        raise SoftwareNotFoundError(
+            'Could not find software "{0}"'.format(softwareName)
+        )
+
+    def importFromJsonPaths(self, paths, recursive=False):
+        """
+        Import the softwares (including all their versions) from json files.
+
+        The files are collected by {@link JsonLoader.jsonFiles} and need to
+        follow the format expected by {@link JsonLoader.addFromJson}. Files
+        are imported in a single transaction, where later files take
+        precedence over earlier ones.
+        """
+        with self.__transaction() as cursor:
+            for jsonFile in JsonLoader.jsonFiles(paths, recursive):
+                contents = self.__jsonBackend.loadFile(jsonFile)
+
+                if not isinstance(contents, dict):
+                    raise UnexpectedRootContentError('Expecting object as root!')
+
+                for softwareName, softwareContents in contents.items():
+                    self.__importSoftware(
+                        cursor,
+                        softwareName,
+                        softwareContents,
+                        os.path.dirname(jsonFile)
+                    )
+
+    def exportToJson(self):
+        """
+        Return the contents of the database following the json format.
+
+        @see JsonLoader.addFromJson
+        """
+        result = {}
+        with self.__transaction(write=False) as cursor:
+            versionRows = cursor.execute(
+                'SELECT v.software, v.version, v.options, s.active FROM versions v '
+                'JOIN softwares s ON v.software = s.name ORDER BY s.rowid, v.rowid'
+            ).fetchall()
+
+            addonRows = cursor.execute(
+                'SELECT software, version, addon, options FROM addons ORDER BY rowid'
+            ).fetchall()
+
+        versionsData = {}
+        for softwareName, version, options, active in versionRows:
+            softwareVersions = versionsData.setdefault(softwareName, (active, {}))[1]
+            softwareVersions[version] = {}
+
+            options = self.__jsonBackend.loads(options)
+            if options:
+                softwareVersions[version]['options'] = options
+
+        for softwareName, version, addonName, options in addonRows:
+            versionData = versionsData[softwareName][1][version]
+            versionData.setdefault('addons', {})[addonName] = {
+                'options': self.__jsonBackend.loads(options)
+            }
+
+        for softwareName, (active, softwareVersions) in versionsData.items():
+            if len(softwareVersions) > 1:
+                result[softwareName] = {
+                    'active': active,
+                    'versions': softwareVersions
+                }
+            elif softwareVersions[active]:
+                result[softwareName] = dict(softwareVersions[active])
+                result[softwareName]['version'] = active
+            else:
+                result[softwareName] = active
+
+        return result
+
+    def exportToJsonFile(self, fileName):
+        """
+        Write the contents of the database to a json file.
+        """
+        with open(fileName, 'w') as f:
+            self.__jsonBackend.dump(self.exportToJson(), f, indent=4, sortKeys=True)
+
+    def bump(self, versionsData, activateVersion=True):
+        """
+        Assign versions to softwares in a single transaction.
+
+        It expects a dict containing the software name as key and the
+        version as value. When the version does not exist yet it's created
+        as a copy of the active version (including its addons). Unknown
+        softwares are added. Return a boolean telling if anything has changed.
+        """
+        changed = False
+        with self.__transaction() as cursor:
+            for softwareName, version in versionsData.items():
+                activeVersion = self.__activeVersion(cursor, softwareName)
+
+                if activeVersion is None:
+                    self.__addVersion(cursor, softwareName, version, {}, activate=True)
+                    changed = True
+                    continue
+
+                if activeVersion == version:
+                    continue
+
+                if cursor.execute('SELECT 1 FROM versions WHERE software = ? AND version = ?', (softwareName, version)).fetchone() is None:
+                    cursor.execute(
+                        'INSERT INTO versions (software, version, options) '
+                        'SELECT software, ?, options FROM versions WHERE software = ? AND version = ?',
+                        (version, softwareName, activeVersion)
+                    )
+                    cursor.execute(
+                        'INSERT INTO addons (software, version, addon, options) '
+                        'SELECT software, ?, addon, options FROM addons WHERE software = ? AND version = ? ORDER BY rowid',
+                        (version, softwareName, activeVersion)
+                    )
+                    changed = True
+
+                if activateVersion:
+                    cursor.execute('UPDATE softwares SET active = ? WHERE name = ?', (version, softwareName))
+                    changed = True
+
+        return changed
+
+    def __activeLoader(self):
+        """
+        Return a loader containing the active versions in the database.
+
+        @private
+        """
+        with self.__transaction(write=False) as cursor:
+            softwareRows = cursor.execute(
+                'SELECT s.name, s.active, v.options FROM softwares s JOIN versions v '
+                'ON v.software = s.name AND v.version = s.active ORDER BY s.rowid'
+            ).fetchall()
+
+            addonRows = cursor.execute(
+                'SELECT a.software, a.addon, a.options FROM addons a JOIN softwares s '
+                'ON a.software = s.name AND a.version = s.active ORDER BY a.rowid'
+            ).fetchall()
+
+            availableVersions = {}
+            for softwareName, version in cursor.execute('SELECT software, version FROM versions'):
+                availableVersions.setdefault(softwareName, []).append(version)
+
+        return self.__loader(softwareRows, addonRows, availableVersions)
+
+    def __loader(self, softwareRows, addonRows, availableVersions={}):
+        """
+        Return a loader containing the information of the rows (resolved following the loader rules).
+
+        @private
+        """
+        loader = Loader()
+        with loader.batch():
+            for softwareName, version, options in softwareRows:
+                loader.addSoftwareInfo(
+                    softwareName,
+                    version,
+                    self.__jsonBackend.loads(options),
+                    availableVersions.get(softwareName, ())
+                )
+
+            for softwareName, addonName, options in addonRows:
+                loader.addAddonInfo(softwareName, addonName, self.__jsonBackend.loads(options))
+
+        return loader
+
+    def __importSoftware(self, cursor, softwareName, softwareContents, baseDirectory):
+        """
+        Import a software parsed from json.
+
+        @private
+        """
+        if isinstance(softwareContents, basestring):
+            self.__addVersion(cursor, softwareName, softwareContents, {}, activate=True)
+            return
+
+        if not isinstance(softwareContents, dict):
+            raise UnexpectedVersionFormatError(
+                'Could not decode version for "{0}"'.format(softwareName)
+            )
+
+        if 'versions' not in softwareContents:
+            versions = {softwareContents.get('version'): softwareContents}
+            active = softwareContents.get('version')
+
+        # versions split per file (@see JsonLoader.addFromJson)
+        elif isinstance(softwareContents['versions'], basestring):
+            if not JsonLoader.validVersionsDirectoryName(softwareContents['versions']):
+                raise UnexpectedVersionFormatError(
+                    'Invalid directory for the versions of "{0}"'.format(softwareName)
+                )
+
+            versionsDirectory = os.path.join(baseDirectory, softwareContents['versions'])
+            versions = {}
+            for versionFile in JsonLoader.jsonFiles([versionsDirectory]):
+                versions[os.path.basename(versionFile)[:-len('.json')]] = self.__jsonBackend.loadFile(versionFile)
+            active = softwareContents['active']
+
+        else:
+            versions = softwareContents['versions']
+            active = softwareContents['active']
+
+        if not (isinstance(active, basestring) and active in versions):
+            raise UnexpectedVersionFormatError(
+                'Could not decode version for "{0}"'.format(softwareName)
+            )
+
+        for version, versionContents in versions.items():
+            if not isinstance(versionContents, dict) or not isinstance(versionContents.get('addons', {}), dict):
+                raise UnexpectedVersionFormatError(
+                    'Could not decode version "{0}" for "{1}"'.format(version, softwareName)
+                )
+
+            self.__addVersion(
+                cursor,
+                softwareName,
+                version,
+                versionContents.get('options', {}),
+                activate=version == active
+            )
+
+            for addonName, addonContents in versionContents.get('addons', {}).items():
+                self.__addAddon(
+                    cursor,
+                    softwareName,
+                    version,
+                    addonName,
+                    addonContents.get('options', {})
+                )
+
+    def __addVersion(self, cursor, softwareName, version, options, activate):
+        """
+        Add (or replace) a software version.
+
+        @private
+        """
+        cursor.execute(
+            'INSERT OR REPLACE INTO versions (software, version, options) VALUES (?, ?, ?)',
+            (softwareName, version, self.__jsonBackend.dumps(options, sortKeys=True))
+        )
+
+        if activate:
+            cursor.execute(
+                'INSERT INTO softwares (name, active) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET active = excluded.active',
+                (softwareName, version)
+            )
+        else:
+            cursor.execute(
+                'INSERT OR IGNORE INTO softwares (name, active) VALUES (?, ?)',
+                (softwareName, version)
+            )
+
+    def __addAddon(self, cursor, softwareName, version, addonName, options):
+        """
+        Add (or replace) an addon of a software version.
+
+        @private
+        """
+        cursor.execute(
+            'INSERT OR REPLACE INTO addons (software, version, addon, options) VALUES (?, ?, ?, ?)',
+            (softwareName, version, addonName, self.__jsonBackend.dumps(options, sortKeys=True))
+        )
+
+    def __activeVersion(self, cursor, softwareName):
+        """
+        Return the active version of a software (None when it does not exist).
+
+        @private
+        """
+        row = cursor.execute(
+            'SELECT active FROM softwares WHERE name = ?',
+            (softwareName,)
+        ).fetchone()
+
+        return row[0] if row else None
+
+    def __transaction(self, write=True):
+        """
+        Return a context manager running a transaction (@see _SqliteTransaction).
+
+        @private
+        """
+        return _SqliteTransaction(self.__threadConnection(), write)
+
+    def __threadConnection(self):
+        """
+        Return the connection of the current thread (created on demand).
+
+        @private
+        """
+        local = self.__local
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            # closed by the thread calling close (@see close)
+            connection = sqlite3.connect(
+                self.__databasePath,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            local.connection = connection
+
+            with self.__connectionsLock:
+                self.__connections.append(connection)
+
+        return connection
+
+class _SqliteTransaction(object):
+    """
+    Context manager running a transaction, providing a cursor.
+
+    The transaction is committed when the context exits without errors,
+    otherwise it's rolled back. Write transactions acquire the write lock
+    up-front, while read transactions only read from a consistent snapshot
+    of the database. When the connection is already running a transaction
+    (@see SqliteLoader.batch) the context runs inside of it.
+    """
+
+    def __init__(self, connection, write=True):
+        """
+        Create a transaction object.
+        """
+        self.__connection = connection
+        self.__write = write
+        self.__cursor = None
+        self.__nested = False
+
+    def __enter__(self):
+        """
+        Begin the transaction.
+        """
+        self.__cursor = self.__connection.cursor()
+
+        # running inside of the transaction of a batch (@see SqliteLoader.batch)
+        self.__nested = self.__connection.in_transaction
+        if not self.__nested:
+            self.__cursor.execute('BEGIN IMMEDIATE' if self.__write else 'BEGIN')
+
+        return self.__cursor
+
+    def __exit__(self, errorType, errorValue, errorTraceback):
+        """
+        Commit (or rollback in case of errors) the transaction.
+        """
+        if not self.__nested:
+            self.__cursor.execute('ROLLBACK' if errorType else 'COMMIT')
+        self.__cursor.close()
@@ -1,9 +1,47 @@
+import importlib
 from .Loader import Loader, AddonNotFoundError
 from .JsonLoader import\
     JsonLoader, \
+    MergeConflict, \
     UnexpectedRootContentError, \
     UnexpectedAddonsDataError, \
     UnexpectedAddonContentError, \
+    UnexpectedOptionsDataError, \
     UnexpectedVersionFormatError, \
     InvalidFileError, \
     InvalidDirectoryError
+
+# loaders depending on expensive modules (http.client, ssl, sqlite3)
+# are imported on demand (@see __getattr__)
+_lazyNames = {
+    'HttpLoader': 'HttpLoader',
+    'InvalidUrlError': 'HttpLoader',
+    'RemoteFetchError': 'HttpLoader',
+    'SqliteLoader': 'SqliteLoader',
+    'SoftwareNotFoundError': 'SqliteLoader'
+}
+
+def __getattr__(name):
+    """
+    Return a name provided by a loader imported on demand.
+    """
+    if name not in _lazyNames:
+        raise AttributeError(
+            'module "{0}" has no attribute "{1}"'.format(__name__, name)
+        )
+
+    moduleName = _lazyNames[name]
+    module = importlib.import_module('.{0}'.format(moduleName), __name__)
+
+    # replacing the submodule set by the import with its names
+    for lazyName, lazyModuleName in _lazyNames.items():
+        if lazyModuleName == moduleName:
+            globals()[lazyName] = getattr(module, lazyName)
+
+    return globals()[name]
+
+def __dir__():
+    """
+    Return the names of the package (including the ones imported on demand).
+    """
+    return sorted(set(globals()).union(_lazyNames))
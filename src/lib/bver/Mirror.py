@@ -0,0 +1,294 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+class InvalidManifestError(Exception):
+    """Invalid manifest error."""
+
+class Mirror(object):
+    """
+    Keeps a node-local copy of published config directories.
+
+    The publish writes a manifest (@see writeManifest) listing the checksum
+    of every file under the config directory. A sync only copies the files
+    whose checksum changed since the previous sync (unchanged files are
+    hard linked from it), verifies the copied files against the manifest and
+    then switches the "current" symlink of the mirror atomically, therefore
+    readers always see a complete copy.
+
+    The mirror of a directory is only used while its manifest matches the
+    published one (@see resolve).
+    """
+
+    manifestName = '.bvermanifest'
+    envName = 'BVER_MIRROR_ROOT'
+    __currentName = 'current'
+    __snapshotsName = 'snapshots'
+    __keepSnapshots = 2
+
+    def __init__(self, root):
+        """
+        Create a mirror object.
+
+        The root is the local directory holding the mirrored directories.
+        """
+        self.__root = root
+
+    def root(self):
+        """
+        Return the root directory of the mirror.
+        """
+        return self.__root
+
+    def sync(self, directory):
+        """
+        Sync the mirror of a published directory returning the local mirror directory.
+
+        The published directory needs to contain a manifest.
+        """
+        manifest = self.readManifest(directory)
+        if manifest is None:
+            raise InvalidManifestError(
+                'Could not find manifest under "{0}"'.format(directory)
+            )
+
+        mirrorDirectory = self.__mirrorDirectory(directory)
+        currentDirectory = os.path.join(mirrorDirectory, self.__currentName)
+        currentManifest = self.readManifest(currentDirectory)
+        if currentManifest is not None and currentManifest['digest'] == manifest['digest']:
+            return currentDirectory
+
+        snapshotsDirectory = os.path.join(mirrorDirectory, self.__snapshotsName)
+        snapshotDirectory = os.path.join(snapshotsDirectory, manifest['digest'])
+        if not os.path.isdir(snapshotDirectory):
+            os.makedirs(snapshotsDirectory, exist_ok=True)
+            temporaryDirectory = tempfile.mkdtemp(dir=snapshotsDirectory, prefix='.')
+            try:
+                self.__populate(directory, temporaryDirectory, manifest, currentDirectory, currentManifest)
+                os.rename(temporaryDirectory, snapshotDirectory)
+            except Exception:
+                shutil.rmtree(temporaryDirectory, ignore_errors=True)
+                raise
+
+        # switching the current symlink atomically
+        temporaryLink = os.path.join(mirrorDirectory, '.{0}.{1}'.format(self.__currentName, os.getpid()))
+        if os.path.lexists(temporaryLink):
+            os.remove(temporaryLink)
+        os.symlink(os.path.join(self.__snapshotsName, manifest['digest']), temporaryLink)
+        os.replace(temporaryLink, currentDirectory)
+
+        self.__removeOldSnapshots(snapshotsDirectory, manifest['digest'])
+
+        return currentDirectory
+
+    def resolve(self, directory):
+        """
+        Return the local mirror of a directory when it matches the published manifest (otherwise None).
+        """
+        manifest = self.readManifest(directory)
+        if manifest is None:
+            return None
+
+        currentDirectory = os.path.join(self.__mirrorDirectory(directory), self.__currentName)
+        currentManifest = self.readManifest(currentDirectory)
+        if currentManifest is None or currentManifest['digest'] != manifest['digest']:
+            return None
+
+        return currentDirectory
+
+    @classmethod
+    def manifest(cls, directory):
+        """
+        Return the manifest of a directory (computed from its files).
+
+        The manifest lists the sha256, size and modification time (in
+        nanoseconds) of every (non hidden) file found recursively under the
+        directory plus a digest of the whole list (computed from the sha256
+        and size of the files).
+        """
+        files = {}
+        for fileName in cls.__walk(directory):
+            filePath = os.path.join(directory, fileName)
+            fileStat = os.stat(filePath)
+            files[fileName] = {
+                'sha256': cls.checksum(filePath),
+                'size': fileStat.st_size,
+                'mtime': fileStat.st_mtime_ns
+            }
+
+        return {
+            'digest': cls.__digest(files),
+            'files': files
+        }
+
+    @classmethod
+    def verifiedManifest(cls, directory):
+        """
+        Return the manifest of a directory reusing the published one for the files that did not change.
+
+        The entries of the published manifest are verified against the size
+        and modification time of the files, the checksum of the files that
+        cannot be verified (changed, added or without modification time in
+        the manifest) is computed.
+        """
+        publishedManifest = cls.readManifest(directory)
+        publishedFiles = publishedManifest['files'] if publishedManifest is not None else {}
+
+        files = {}
+        for fileName in cls.__walk(directory):
+            filePath = os.path.join(directory, fileName)
+            fileStat = os.stat(filePath)
+            fileInfo = publishedFiles.get(fileName)
+
+            if not (isinstance(fileInfo, dict) and 'sha256' in fileInfo and fileInfo.get('size') == fileStat.st_size and fileInfo.get('mtime') == fileStat.st_mtime_ns):
+                fileInfo = {
+                    'sha256': cls.checksum(filePath),
+                    'size': fileStat.st_size,
+                    'mtime': fileStat.st_mtime_ns
+                }
+
+            files[fileName] = fileInfo
+
+        return {
+            'digest': cls.__digest(files),
+            'files': files
+        }
+
+    @classmethod
+    def writeManifest(cls, directory):
+        """
+        Write the manifest of a directory returning its contents (@see manifest).
+        """
+        manifest = cls.manifest(directory)
+
+        fd, temporaryFile = tempfile.mkstemp(dir=directory, prefix='.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f, indent=4, sort_keys=True)
+            os.chmod(temporaryFile, 0o644)
+            os.replace(temporaryFile, os.path.join(directory, cls.manifestName))
+        except Exception:
+            os.remove(temporaryFile)
+            raise
+
+        return manifest
+
+    @classmethod
+    def readManifest(cls, directory):
+        """
+        Return the manifest of a directory (None when it does not exist or it's invalid).
+        """
+        try:
+            with open(os.path.join(directory, cls.manifestName), 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(manifest, dict) or 'digest' not in manifest or 'files' not in manifest:
+            return None
+
+        return manifest
+
+    @staticmethod
+    def checksum(filePath):
+        """
+        Return the sha256 of a file.
+        """
+        result = hashlib.sha256()
+        with open(filePath, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                result.update(chunk)
+
+        return result.hexdigest()
+
+    def __populate(self, directory, targetDirectory, manifest, currentDirectory, currentManifest):
+        """
+        Populate a new snapshot with the files of the manifest.
+
+        @private
+        """
+        currentFiles = currentManifest['files'] if currentManifest is not None else {}
+        for fileName, fileInfo in manifest['files'].items():
+            targetFilePath = os.path.join(targetDirectory, fileName)
+            os.makedirs(os.path.dirname(targetFilePath), exist_ok=True)
+
+            # unchanged files are shared with the current snapshot
+            if currentFiles.get(fileName, {}).get('sha256') == fileInfo['sha256']:
+                try:
+                    os.link(os.path.join(currentDirectory, fileName), targetFilePath)
+                    continue
+                except OSError:
+                    pass
+
+            shutil.copyfile(os.path.join(directory, fileName), targetFilePath)
+            if self.checksum(targetFilePath) != fileInfo['sha256']:
+                raise InvalidManifestError(
+                    'Checksum mismatch for "{0}" under "{1}" (the directory may be in the middle of a publish)'.format(
+                        fileName,
+                        directory
+                    )
+                )
+
+        with open(os.path.join(targetDirectory, self.manifestName), 'w') as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+
+    def __removeOldSnapshots(self, snapshotsDirectory, currentDigest):
+        """
+        Remove the old snapshots (keeping the most recent ones for readers still using them).
+
+        @private
+        """
+        snapshots = sorted(
+            (x for x in os.scandir(snapshotsDirectory) if not x.name.startswith('.') and x.name != currentDigest),
+            key=lambda x: x.stat().st_mtime,
+            reverse=True
+        )
+
+        for entry in snapshots[self.__keepSnapshots - 1:]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def __mirrorDirectory(self, directory):
+        """
+        Return the directory used to mirror a published directory.
+
+        @private
+        """
+        return os.path.join(
+            self.__root,
+            hashlib.sha1(os.path.realpath(directory).encode('utf-8')).hexdigest()
+        )
+
+    @staticmethod
+    def __digest(files):
+        """
+        Return the digest of the files of a manifest (based on their sha256 and size).
+
+        @private
+        """
+        return hashlib.sha256(
+            json.dumps(
+                dict((x, {'sha256': y['sha256'], 'size': y['size']}) for x, y in files.items()),
+                sort_keys=True,
+                separators=(',', ':')
+            ).encode('utf-8')
+        ).hexdigest()
+
+    @staticmethod
+    def __walk(directory):
+        """
+        Return a sorted list with the (non hidden) files found recursively under a directory.
+
+        @private
+        """
+        result = []
+        for root, directories, files in os.walk(directory):
+            directories[:] = [x for x in directories if not x.startswith('.')]
+            for fileName in files:
+                if fileName.startswith('.'):
+                    continue
+
+                result.append(os.path.relpath(os.path.join(root, fileName), directory).replace(os.sep, '/'))
+
+        return sorted(result)
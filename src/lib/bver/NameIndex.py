@@ -0,0 +1,121 @@
+import bisect
+import fnmatch
+
+class NameIndex(object):
+    """
+    Sorted index of names supporting prefix, glob and range lookups.
+
+    The names are kept in a sorted list, therefore prefix and range lookups
+    are resolved by binary search in O(log n + k) (where k is the number of
+    results). Glob lookups are narrowed to the names sharing the literal
+    prefix of the pattern (the part before its first wildcard).
+
+    When a separator is specified (for instance "/" for compound names as
+    "<software>/<addon>") the glob wildcards do not match across it.
+    """
+
+    __wildcards = '*?['
+
+    def __init__(self, items, separator=None):
+        """
+        Create a name index object from a list of (name, value).
+        """
+        items = sorted(items, key=lambda x: x[0])
+
+        self.__names = [x[0] for x in items]
+        self.__values = [x[1] for x in items]
+        self.__separator = separator
+
+    def __len__(self):
+        """
+        Return the number of names.
+        """
+        return len(self.__names)
+
+    def __contains__(self, name):
+        """
+        Return a boolean telling if the name is indexed.
+        """
+        index = bisect.bisect_left(self.__names, name)
+        return index < len(self.__names) and self.__names[index] == name
+
+    def names(self):
+        """
+        Return a sorted list of names.
+        """
+        return list(self.__names)
+
+    def get(self, name, default=None):
+        """
+        Return the value of a name (default when the name is not indexed).
+        """
+        index = bisect.bisect_left(self.__names, name)
+        if index < len(self.__names) and self.__names[index] == name:
+            return self.__values[index]
+
+        return default
+
+    def prefix(self, prefix):
+        """
+        Return a sorted list of (name, value) for the names starting with the prefix.
+        """
+        return self.__items(*self.__prefixBounds(prefix))
+
+    def range(self, start=None, end=None):
+        """
+        Return a sorted list of (name, value) for the names from start (inclusive) to end (exclusive).
+
+        Unbounded when start/end are not specified.
+        """
+        startIndex = 0 if start is None else bisect.bisect_left(self.__names, start)
+        endIndex = len(self.__names) if end is None else bisect.bisect_left(self.__names, end)
+
+        return self.__items(startIndex, max(startIndex, endIndex))
+
+    def glob(self, pattern):
+        """
+        Return a sorted list of (name, value) for the names matching the pattern (@see fnmatch).
+        """
+        literalPrefix = pattern
+        for index, character in enumerate(pattern):
+            if character in self.__wildcards:
+                literalPrefix = pattern[:index]
+                break
+
+        # a pattern without wildcards is a plain lookup
+        if literalPrefix == pattern:
+            return self.range(pattern, pattern + '\0')
+
+        separatorCount = None
+        if self.__separator is not None:
+            separatorCount = pattern.count(self.__separator)
+
+        return [
+            (name, value) for name, value in self.prefix(literalPrefix)
+            if fnmatch.fnmatchcase(name, pattern) and (separatorCount is None or name.count(self.__separator) == separatorCount)
+        ]
+
+    def __prefixBounds(self, prefix):
+        """
+        Return a tuple (start, end) with the positions of the names starting with the prefix.
+
+        @private
+        """
+        if not prefix:
+            return (0, len(self.__names))
+
+        # the smallest name greater than all the names starting with the prefix
+        upperBound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+        return (
+            bisect.bisect_left(self.__names, prefix),
+            bisect.bisect_left(self.__names, upperBound)
+        )
+
+    def __items(self, start, end):
+        """
+        Return a list of (name, value) for the positions from start to end.
+
+        @private
+        """
+        return list(zip(self.__names[start:end], self.__values[start:end]))
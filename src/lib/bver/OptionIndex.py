@@ -0,0 +1,117 @@
+import json
+
+class OptionIndex(object):
+    """
+    Inverted index of the options of softwares and addons.
+
+    Each software and addon is an entry identified by the key
+    (software name, addon name) where the addon name is None for the
+    software itself. The index maps (option name, value) and option names
+    to the keys of the entries setting them, therefore filtering by option
+    (@see QueryFilter) costs O(matches) rather than a scan of the catalog.
+
+    Unhashable values (lists and dicts) are indexed by their json encoding.
+    """
+
+    def __init__(self, softwares):
+        """
+        Create an option index object from a list of softwares.
+        """
+        self.__entries = {}
+        self.__softwareKeys = set()
+        self.__addonKeys = {}
+        self.__allAddonKeys = set()
+        self.__optionKeys = {}
+        self.__optionValueKeys = {}
+
+        for software in softwares:
+            key = (software.name(), None)
+            if key in self.__entries:
+                continue
+
+            self.__softwareKeys.add(key)
+            self.__addEntry(key, software, None)
+
+            for addonName in software.addonNames():
+                addonKey = (software.name(), addonName)
+                self.__addonKeys.setdefault(addonName, set()).add(addonKey)
+                self.__allAddonKeys.add(addonKey)
+                self.__addEntry(addonKey, software, software.addon(addonName))
+
+    def keys(self):
+        """
+        Return a set with the keys of all entries.
+        """
+        return set(self.__entries.keys())
+
+    def entry(self, key):
+        """
+        Return a tuple (software, addon) for the key of an entry, where addon is None for software entries.
+        """
+        return self.__entries[key]
+
+    def softwareKeys(self, softwareName=None):
+        """
+        Return a set with the keys of the software entries (all of them when the name is not specified).
+        """
+        if softwareName is None:
+            return set(self.__softwareKeys)
+
+        key = (softwareName, None)
+        return set([key]) if key in self.__softwareKeys else set()
+
+    def addonKeys(self, addonName=None):
+        """
+        Return a set with the keys of the addon entries (all of them when the name is not specified).
+        """
+        if addonName is None:
+            return set(self.__allAddonKeys)
+
+        return set(self.__addonKeys.get(addonName, ()))
+
+    def optionKeys(self, optionName, values=None):
+        """
+        Return a set with the keys of the entries setting an option.
+
+        When values are specified only the entries setting the option to
+        one of them are returned.
+        """
+        if values is None:
+            return set(self.__optionKeys.get(optionName, ()))
+
+        result = set()
+        for value in values:
+            result.update(self.__optionValueKeys.get((optionName, self.valueKey(value)), ()))
+
+        return result
+
+    @staticmethod
+    def valueKey(value):
+        """
+        Return the key used to index an option value.
+
+        Booleans are kept apart from numbers (True is not 1) and unhashable
+        values are replaced by their json encoding.
+        """
+        try:
+            hash(value)
+        except TypeError:
+            return ('json', json.dumps(value, sort_keys=True, default=str))
+
+        return (isinstance(value, bool), value)
+
+    def __addEntry(self, key, software, addon):
+        """
+        Add an entry indexing its options.
+
+        @private
+        """
+        versioned = software if addon is None else addon
+        self.__entries[key] = (software, addon)
+
+        for optionName in versioned.optionNames():
+            self.__optionKeys.setdefault(optionName, set()).add(key)
+            self.__optionValueKeys.setdefault(
+                (optionName, self.valueKey(versioned.option(optionName))),
+                set()
+            ).add(key)
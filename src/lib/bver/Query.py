@@ -1,3 +1,9 @@
+import bisect
+from .Versioned import Version
+from .NameIndex import NameIndex
+from .OptionIndex import OptionIndex
+from .ResolvedTable import ResolvedTable
+
 class SoftwareNotFoundError(Exception):
     """Software not found error."""
 
@@ -12,6 +18,13 @@ class Query(object):
     def __init__(self, softwares):
         """Create a query object."""
         self.__setSoftwares(softwares)
+        self.__softwaresByName = None
+        self.__envEntries = None
+        self.__nameIndex = None
+        self.__bverNameIndex = None
+        self.__versionIndexes = {}
+        self.__softwareVersionIndex = None
+        self.__optionIndex = None
 
     def softwares(self):
         """Return a list of softwares used for queries."""
@@ -57,14 +70,30 @@ class Query(object):
         """
         Return a software instance based on software's name.
         """
-        for software in self.softwares():
-            if name == software.name():
-                return software
+        softwaresByName = self.__softwareNameMapping()
+        if name in softwaresByName:
+            return softwaresByName[name]
 
         raise SoftwareNotFoundError(
             'Could not find software "{0}"'.format(name)
         )
 
+    def softwaresByNames(self, names):
+        """
+        Return a list of software instances based on a list of software names.
+
+        The result follows the order of the input names.
+        """
+        softwaresByName = self.__softwareNameMapping()
+
+        missingNames = [name for name in names if name not in softwaresByName]
+        if missingNames:
+            raise SoftwareNotFoundError(
+                'Could not find softwares "{0}"'.format(', '.join(missingNames))
+            )
+
+        return [softwaresByName[name] for name in names]
+
     def softwareByBverName(self, bverName):
         """
         Return a software instance based on software's bver name.
@@ -110,6 +139,231 @@ class Query(object):
 
         return result
 
+    def nameIndex(self):
+        """
+        Return an index (@see NameIndex) of the software names and the compound addon names.
+
+        The compound addon names are "<software name>/<addon name>" (for
+        instance prefix "maya/" returns all the addons of maya). The
+        values are (software, addon) where addon is None for the software
+        names. The index is built on the first call.
+        """
+        if self.__nameIndex is None:
+            items = []
+            for software in self.softwares():
+                items.append((software.name(), (software, None)))
+                for addon in map(lambda x: software.addon(x), software.addonNames()):
+                    items.append(('{0}/{1}'.format(software.name(), addon.name()), (software, addon)))
+
+            self.__nameIndex = NameIndex(items, separator='/')
+
+        return self.__nameIndex
+
+    def bverNameIndex(self):
+        """
+        Return an index (@see NameIndex) of the bver names of the softwares and their addons.
+
+        The addon bver names are the ones exported to the environment (for
+        instance prefix "BVER_MAYA_" returns the variables of maya and its
+        addons). The values are (software, addon) where addon is None for
+        the software bver names. The index is built on the first call.
+        """
+        if self.__bverNameIndex is None:
+            items = []
+            for software in self.softwares():
+                items.append((software.bverName(), (software, None)))
+                for addon in map(lambda x: software.addon(x), software.addonNames()):
+                    items.append((software.bverName(addon), (software, addon)))
+
+            self.__bverNameIndex = NameIndex(items)
+
+        return self.__bverNameIndex
+
+    def latestVersion(self, name):
+        """
+        Return the latest version available for a software (@see Version).
+        """
+        return self.__versionIndex(name)[1][-1]
+
+    def availableVersions(self, name, minimum=None, maximum=None):
+        """
+        Return a sorted list with the versions available for a software from minimum (inclusive) to maximum (exclusive).
+
+        Unbounded when minimum/maximum are not specified (@see Version).
+        """
+        keys, versions = self.__versionIndex(name)
+        start, end = self.__versionBounds(keys, minimum, maximum)
+
+        return versions[start:end]
+
+    def softwaresByVersionRange(self, minimum=None, maximum=None):
+        """
+        Return a list of software instances with versions from minimum (inclusive) to maximum (exclusive).
+
+        Unbounded when minimum/maximum are not specified. The result is
+        sorted by version (@see Version).
+        """
+        if self.__softwareVersionIndex is None:
+            softwares = sorted(self.softwares(), key=lambda x: x.parsedVersion().key())
+            self.__softwareVersionIndex = (
+                [x.parsedVersion().key() for x in softwares],
+                softwares
+            )
+
+        keys, softwares = self.__softwareVersionIndex
+        start, end = self.__versionBounds(keys, minimum, maximum)
+
+        return softwares[start:end]
+
+    def optionIndex(self):
+        """
+        Return an inverted index (@see OptionIndex) of the options of the softwares and addons.
+
+        The index is built on the first call.
+        """
+        if self.__optionIndex is None:
+            self.__optionIndex = OptionIndex(self.softwares())
+
+        return self.__optionIndex
+
+    def select(self, queryFilter):
+        """
+        Return a list of (software, addon) matching a filter (@see QueryFilter).
+
+        The addon is None for the software entries. The result is sorted
+        by software name, where the software comes before its addons.
+        """
+        optionIndex = self.optionIndex()
+        keys = sorted(
+            queryFilter.keys(optionIndex),
+            key=lambda x: (x[0], x[1] is not None, x[1] or '')
+        )
+
+        return [optionIndex.entry(x) for x in keys]
+
+    def softwaresByFilter(self, queryFilter):
+        """
+        Return a list of software instances with entries (either the software or its addons) matching a filter.
+
+        The result is sorted by software name (@see select).
+        """
+        result = []
+        for software, addon in self.select(queryFilter):
+            if not result or result[-1] is not software:
+                result.append(software)
+
+        return result
+
+    def iterEnvItems(self, env={}):
+        """
+        Yield the bver environment variables (name, value) of the softwares.
+
+        For each software it yields the software version followed by the
+        version of each of its addons. The addon enabled variable
+        (@see Addon.bverEnabledName) is only yielded when its value differs
+        from the one found in the input env (where "1" is assumed by default).
+        """
+        for bverName, version, addonEntries in self.__envEntryList():
+            yield (bverName, version)
+
+            for enabledName, enabledValue, addonBverName, addonVersion in addonEntries:
+                if enabledValue != env.get(enabledName, '1'):
+                    yield (enabledName, enabledValue)
+
+                yield (addonBverName, addonVersion)
+
+    def toEnv(self, env={}):
+        """
+        Return a dict with the bver environment variables of the softwares.
+
+        @see iterEnvItems
+        """
+        return dict(self.iterEnvItems(env))
+
+    def serialize(self, names=None):
+        """
+        Return bytes with the serialized softwares (@see ResolvedTable.serialize).
+        """
+        return ResolvedTable.fromSoftwares(self.softwares()).serialize(names)
+
+    @classmethod
+    def fromSerialized(cls, data, names=None):
+        """
+        Return a query for the serialized softwares (@see serialize).
+
+        The softwares are created without validating their names and versions again.
+        """
+        return cls(ResolvedTable.deserialize(data, names).softwares(validate=False))
+
+    def __versionIndex(self, name):
+        """
+        Return a tuple (sorted version keys, sorted versions) with the versions available for a software.
+
+        @private
+        """
+        if name not in self.__versionIndexes:
+            versions = self.softwareByName(name).availableVersions()
+            self.__versionIndexes[name] = (
+                [Version.parse(x).key() for x in versions],
+                versions
+            )
+
+        return self.__versionIndexes[name]
+
+    @staticmethod
+    def __versionBounds(keys, minimum, maximum):
+        """
+        Return a tuple (start, end) with the positions of the sorted keys from minimum to maximum.
+
+        @private
+        """
+        start = 0 if minimum is None else bisect.bisect_left(keys, Version.parse(str(minimum)).key())
+        end = len(keys) if maximum is None else bisect.bisect_left(keys, Version.parse(str(maximum)).key())
+
+        return (start, max(start, end))
+
+    def __softwareNameMapping(self):
+        """
+        Return a dict mapping the software names to their instances.
+
+        @private
+        """
+        if self.__softwaresByName is None:
+            softwaresByName = {}
+            for software in self.softwares():
+                softwaresByName.setdefault(software.name(), software)
+            self.__softwaresByName = softwaresByName
+
+        return self.__softwaresByName
+
+    def __envEntryList(self):
+        """
+        Return the environment entries with the names computed up-front.
+
+        @private
+        """
+        if self.__envEntries is None:
+            entries = []
+            for software in self.softwares():
+                addonEntries = []
+                for addonName in software.addonNames():
+                    addon = software.addon(addonName)
+                    addonEntries.append((
+                        addon.bverEnabledName(software),
+                        str(int(addon.option('enabled'))),
+                        software.bverName(addon),
+                        addon.version()
+                    ))
+
+                entries.append((
+                    software.bverName(),
+                    software.version(),
+                    addonEntries
+                ))
+            self.__envEntries = entries
+
+        return self.__envEntries
+
     def __setSoftwares(self, softwares):
         """Set a list of softwares that should be used by the query."""
         assert isinstance(softwares, list), "Unexcepted type!"
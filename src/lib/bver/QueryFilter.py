@@ -0,0 +1,168 @@
+import abc
+
+class QueryFilter(abc.ABC):
+    """
+    Abstract filter of software and addon entries (@see OptionIndex).
+
+    Filters are composed through the operators & (and), | (or) and
+    ~ (not), for instance the softwares with the addon kombi disabled:
+
+        query.select(AddonFilter('kombi') & OptionFilter('enabled', False))
+
+    They are resolved through the option index of the query, therefore
+    their cost is proportional to the number of matches (except for ~
+    used on its own, which needs all the entries).
+    """
+
+    @abc.abstractmethod
+    def keys(self, optionIndex):
+        """
+        Return a set with the keys of the entries matching the filter.
+        """
+
+    def __and__(self, other):
+        """
+        Return a filter matching the entries matched by both filters.
+        """
+        return AndFilter(self, other)
+
+    def __or__(self, other):
+        """
+        Return a filter matching the entries matched by any of the filters.
+        """
+        return OrFilter(self, other)
+
+    def __invert__(self):
+        """
+        Return a filter matching the entries that are not matched by the filter.
+        """
+        return NotFilter(self)
+
+class OptionFilter(QueryFilter):
+    """
+    Matches the entries setting an option (to one of the values, when specified).
+    """
+
+    def __init__(self, optionName, *values):
+        """
+        Create an option filter object.
+        """
+        self.__optionName = optionName
+        self.__values = values or None
+
+    def keys(self, optionIndex):
+        """
+        Return a set with the keys of the entries matching the filter.
+        """
+        return optionIndex.optionKeys(self.__optionName, self.__values)
+
+class SoftwareFilter(QueryFilter):
+    """
+    Matches the software entries (only the one with the name, when specified).
+    """
+
+    def __init__(self, softwareName=None):
+        """
+        Create a software filter object.
+        """
+        self.__softwareName = softwareName
+
+    def keys(self, optionIndex):
+        """
+        Return a set with the keys of the entries matching the filter.
+        """
+        return optionIndex.softwareKeys(self.__softwareName)
+
+class AddonFilter(QueryFilter):
+    """
+    Matches the addon entries (only the ones with the name, when specified).
+    """
+
+    def __init__(self, addonName=None):
+        """
+        Create an addon filter object.
+        """
+        self.__addonName = addonName
+
+    def keys(self, optionIndex):
+        """
+        Return a set with the keys of the entries matching the filter.
+        """
+        return optionIndex.addonKeys(self.__addonName)
+
+class AndFilter(QueryFilter):
+    """
+    Matches the entries matched by all the filters.
+    """
+
+    def __init__(self, *filters):
+        """
+        Create an and filter object.
+        """
+        self.__filters = filters
+
+    def keys(self, optionIndex):
+        """
+        Return a set with the keys of the entries matching the filter.
+        """
+        # negated filters are subtracted from the other matches (avoiding
+        # to collect all the entries)
+        filters = sorted(self.__filters, key=lambda x: isinstance(x, NotFilter))
+
+        result = None
+        for queryFilter in filters:
+            if result is not None and isinstance(queryFilter, NotFilter):
+                result = result.difference(queryFilter.queryFilter().keys(optionIndex))
+            else:
+                keys = queryFilter.keys(optionIndex)
+                result = keys if result is None else result.intersection(keys)
+
+            # nothing else can match
+            if not result:
+                break
+
+        return result or set()
+
+class OrFilter(QueryFilter):
+    """
+    Matches the entries matched by any of the filters.
+    """
+
+    def __init__(self, *filters):
+        """
+        Create an or filter object.
+        """
+        self.__filters = filters
+
+    def keys(self, optionIndex):
+        """
+        Return a set with the keys of the entries matching the filter.
+        """
+        result = set()
+        for queryFilter in self.__filters:
+            result.update(queryFilter.keys(optionIndex))
+
+        return result
+
+class NotFilter(QueryFilter):
+    """
+    Matches the entries that are not matched by the filter.
+    """
+
+    def __init__(self, queryFilter):
+        """
+        Create a not filter object.
+        """
+        self.__queryFilter = queryFilter
+
+    def queryFilter(self):
+        """
+        Return the negated filter.
+        """
+        return self.__queryFilter
+
+    def keys(self, optionIndex):
+        """
+        Return a set with the keys of the entries matching the filter.
+        """
+        return optionIndex.keys().difference(self.__queryFilter.keys(optionIndex))
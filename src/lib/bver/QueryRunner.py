@@ -0,0 +1,134 @@
+import json
+from .Query import SoftwareNotFoundError, AddonNotFoundError
+from .Versioned import InvalidOptionError, InvalidAddonError
+
+# compatibility with python 2/3
+try:
+    basestring
+except NameError:
+    basestring = str
+
+class InvalidQueryError(Exception):
+    """Invalid query error."""
+
+class QueryRunner(object):
+    """
+    Runs textual queries against a query object (@see Query).
+
+    Each query is a line containing the query kind followed by its
+    arguments (separated by spaces):
+        - software <name or bver name>: version of the software
+        - addon <name or bver name>: names of the softwares using the addon
+        - addonversion <software name> <addon name>: version of the addon
+        - option <software name> [<addon name>] <option name>: option value
+
+    The result is returned as text: string options as they are, other
+    options json encoded and lists of names separated by spaces.
+    """
+
+    kinds = ('software', 'addon', 'addonversion', 'option')
+    lookupErrors = (
+        InvalidQueryError,
+        SoftwareNotFoundError,
+        AddonNotFoundError,
+        InvalidAddonError,
+        InvalidOptionError
+    )
+
+    def __init__(self, query):
+        """
+        Create a query runner object.
+        """
+        self.__query = query
+
+    def query(self):
+        """
+        Return the query object used to run the queries.
+        """
+        return self.__query
+
+    def run(self, queryLine):
+        """
+        Return the result (text) of a query line.
+        """
+        parts = queryLine.split()
+        if not parts or parts[0] not in self.kinds:
+            raise InvalidQueryError(
+                'Invalid query "{0}" (expected kinds: {1})'.format(queryLine.strip(), ', '.join(self.kinds))
+            )
+
+        kind = parts[0]
+        arguments = parts[1:]
+        expectedArguments = {
+            'software': (1, ),
+            'addon': (1, ),
+            'addonversion': (2, ),
+            'option': (2, 3)
+        }[kind]
+
+        if len(arguments) not in expectedArguments:
+            raise InvalidQueryError(
+                'Invalid number of arguments for "{0}" query: "{1}"'.format(kind, queryLine.strip())
+            )
+
+        if kind == 'software':
+            return self.__software(arguments[0]).version()
+
+        elif kind == 'addon':
+            if arguments[0].startswith('BVER_'):
+                softwares = self.__query.softwaresByAddonBverName(arguments[0])
+            else:
+                softwares = self.__query.softwaresByAddonName(arguments[0])
+
+            return ' '.join(sorted(x.name() for x in softwares))
+
+        elif kind == 'addonversion':
+            return self.__software(arguments[0]).addon(arguments[1]).version()
+
+        versioned = self.__software(arguments[0])
+        if len(arguments) == 3:
+            versioned = versioned.addon(arguments[1])
+
+        value = versioned.option(arguments[-1])
+        if isinstance(value, basestring):
+            return value
+
+        return json.dumps(value, sort_keys=True)
+
+    def runLines(self, lines, output, errorOutput=None, flush=False):
+        """
+        Write the result of each query line (one per line) to the output returning the number of failed queries.
+
+        Every line gets exactly one result line, where empty lines get an
+        empty result. A failed query writes an empty line to the
+        output (and the error to the error output when specified). When
+        flush is specified the output is flushed after each result (used
+        by co-processes waiting for each result).
+        """
+        failed = 0
+        for line in lines:
+            try:
+                result = self.run(line) if line.strip() else ''
+            except self.lookupErrors as err:
+                failed += 1
+                result = ''
+                if errorOutput is not None:
+                    errorOutput.write('bver error: {0}\n'.format(err))
+                    errorOutput.flush()
+
+            output.write('{0}\n'.format(result))
+            if flush:
+                output.flush()
+
+        return failed
+
+    def __software(self, name):
+        """
+        Return the software based on its name or bver name.
+
+        @private
+        """
+        if name.startswith('BVER_'):
+            return self.__query.softwareByBverName(name)
+
+        return self.__query.softwareByName(name)
@@ -0,0 +1,431 @@
+import sys
+import json
+import marshal
+import hashlib
+from array import array
+from .Versioned import Versioned, Software, Addon
+
+class InvalidSerializedDataError(Exception):
+    """Invalid serialized data error."""
+
+class ResolvedTable(object):
+    """
+    Columnar representation of resolved softwares.
+
+    The softwares are stored as parallel columns (interned names, bver
+    names, versions and options) and the addons as edges in a CSR layout:
+    the addons of the software at index i are the edges from
+    edgeOffsets[i] to edgeOffsets[i + 1], each one holding the addon name,
+    its resolved version, its enabled flag and its options. Bulk operations
+    (export, filtering, diff and hashing) loop over these columns, where the
+    software/addon objects are provided as a view on top of them
+    (@see softwares).
+
+    Tables are serialized as the marshal encoding of their columns prefixed
+    by a header containing the format version (@see serialize), which is
+    also used when they are pickled.
+
+    The versions available for each software (@see Loader.addSoftwareInfo)
+    are kept as an extra column, they are not part of the content hash.
+    """
+
+    formatVersion = 2
+    __serializedHeader = b'BVRT'
+    __marshalVersion = 4
+
+    def __init__(self, names, versions, options, edgeOffsets, edgeNames, edgeVersions, edgeOptions, availableVersions=None):
+        """
+        Create a resolved table object.
+        """
+        if availableVersions is None:
+            availableVersions = [()] * len(names)
+
+        assert len(names) == len(versions) == len(options) == len(availableVersions) == len(edgeOffsets) - 1, \
+            'Invalid software columns!'
+
+        assert len(edgeNames) == len(edgeVersions) == len(edgeOptions) == edgeOffsets[-1], \
+            'Invalid edge columns!'
+
+        self.__names = list(map(sys.intern, names))
+        self.__versions = list(versions)
+        self.__options = list(options)
+        self.__edgeOffsets = array('l', edgeOffsets)
+        self.__edgeNames = list(map(sys.intern, edgeNames))
+        self.__edgeVersions = list(edgeVersions)
+        self.__edgeOptions = list(edgeOptions)
+        self.__availableVersions = list(map(tuple, availableVersions))
+        self.__edgeEnabled = array('b', [int(x.get('enabled', True)) for x in self.__edgeOptions])
+        self.__bverNames = [Versioned.toBverName(x) for x in self.__names]
+        self.__indexes = dict((x, index) for index, x in enumerate(self.__names))
+        self.__rowHashes = [None] * len(self.__names)
+
+    def __len__(self):
+        """
+        Return the number of softwares.
+        """
+        return len(self.__names)
+
+    def names(self):
+        """
+        Return a list with the software names.
+        """
+        return list(self.__names)
+
+    def bverNames(self):
+        """
+        Return a list with the software bver names.
+        """
+        return list(self.__bverNames)
+
+    def versions(self):
+        """
+        Return a list with the software versions.
+        """
+        return list(self.__versions)
+
+    def availableVersions(self, name):
+        """
+        Return a list with the available versions of a software sorted from the oldest to the latest.
+
+        It defaults to the version of the software (empty when the software does not exist).
+        """
+        index = self.index(name)
+        if index is None:
+            return []
+
+        return list(self.__availableVersions[index] or (self.__versions[index], ))
+
+    def index(self, name):
+        """
+        Return the index of a software (None when the software does not exist).
+        """
+        return self.__indexes.get(name)
+
+    def addonEdges(self, name):
+        """
+        Return a list of (addon name, version, enabled) for the addons of a software.
+        """
+        index = self.index(name)
+        if index is None:
+            return []
+
+        return [
+            (
+                self.__edgeNames[edge],
+                self.__edgeVersions[edge],
+                bool(self.__edgeEnabled[edge])
+            )
+            for edge in range(self.__edgeOffsets[index], self.__edgeOffsets[index + 1])
+        ]
+
+    def row(self, name):
+        """
+        Return a dict with the version, options and addons (addon name: dict with version and options) of a software.
+
+        None when the software does not exist.
+        """
+        index = self.index(name)
+        if index is None:
+            return None
+
+        return {
+            'version': self.__versions[index],
+            'options': dict(self.__options[index]),
+            'addons': dict(
+                (
+                    self.__edgeNames[edge],
+                    {
+                        'version': self.__edgeVersions[edge],
+                        'options': dict(self.__edgeOptions[edge])
+                    }
+                )
+                for edge in range(self.__edgeOffsets[index], self.__edgeOffsets[index + 1])
+            )
+        }
+
+    def iterEnvItems(self, env={}):
+        """
+        Yield the bver environment variables (name, value) of the softwares.
+
+        @see Query.iterEnvItems
+        """
+        names = self.__names
+        versions = self.__versions
+        bverNames = self.__bverNames
+        edgeOffsets = self.__edgeOffsets
+        edgeNames = self.__edgeNames
+        edgeVersions = self.__edgeVersions
+        edgeEnabled = self.__edgeEnabled
+
+        for index in range(len(names)):
+            yield (bverNames[index], versions[index])
+
+            softwareName = names[index].upper()
+            for edge in range(edgeOffsets[index], edgeOffsets[index + 1]):
+                addonName = edgeNames[edge].upper()
+
+                enabledName = 'BVER_{}_{}_ENABLED'.format(softwareName, addonName)
+                enabledValue = str(edgeEnabled[edge])
+                if enabledValue != env.get(enabledName, '1'):
+                    yield (enabledName, enabledValue)
+
+                yield ('BVER_{}_{}_VERSION'.format(softwareName, addonName), edgeVersions[edge])
+
+    def toEnv(self, env={}):
+        """
+        Return a dict with the bver environment variables of the softwares.
+
+        @see iterEnvItems
+        """
+        return dict(self.iterEnvItems(env))
+
+    def filter(self, names):
+        """
+        Return a new table containing only the softwares with the input names.
+
+        Unknown names are ignored and the order of the table is kept (the
+        addon versions are already resolved, therefore the addon softwares
+        are not required to be part of the result). The rows are looked up
+        by name, therefore the cost depends on the number of selected
+        softwares rather than on the size of the table.
+        """
+        rows = sorted(self.__indexes[x] for x in set(names) if x in self.__indexes)
+
+        return ResolvedTable.__fromRows(self.__columns(), rows)
+
+    def rowHash(self, index):
+        """
+        Return the content hash of a software (including its addons).
+        """
+        if self.__rowHashes[index] is None:
+            self.__rowHashes[index] = self.rowDigest(
+                self.__names[index],
+                self.__versions[index],
+                self.__options[index],
+                [
+                    [
+                        self.__edgeNames[edge],
+                        self.__edgeVersions[edge],
+                        self.__edgeOptions[edge]
+                    ]
+                    for edge in range(self.__edgeOffsets[index], self.__edgeOffsets[index + 1])
+                ]
+            )
+
+        return self.__rowHashes[index]
+
+    @staticmethod
+    def rowDigest(name, version, options, addons):
+        """
+        Return the content hash of a software given its addons as a list of [name, version, options].
+
+        The order of the addons does not affect the result.
+        """
+        return hashlib.sha256(json.dumps(
+            [name, version, options, sorted(addons, key=lambda x: x[0])],
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        ).encode('utf-8')).hexdigest()
+
+    def hash(self):
+        """
+        Return a content hash of the table (independent of the software order).
+
+        It's the sum of the row hashes, therefore it matches the fingerprint
+        of the loader that resolved the table (@see Loader.fingerprint).
+        """
+        total = 0
+        for index in range(len(self.__names)):
+            total += int(self.rowHash(index), 16)
+
+        return '{0:064x}'.format(total % (1 << 256))
+
+    def diff(self, other):
+        """
+        Return a dict with the software names added, removed and changed in relation to another table.
+        """
+        assert isinstance(other, ResolvedTable), \
+            'Invalid table type!'
+
+        result = {
+            'added': [],
+            'removed': [],
+            'changed': []
+        }
+
+        for index, name in enumerate(other.__names):
+            otherIndex = self.index(name)
+            if otherIndex is None:
+                result['added'].append(name)
+            elif self.rowHash(otherIndex) != other.rowHash(index):
+                result['changed'].append(name)
+
+        for name in self.__names:
+            if other.index(name) is None:
+                result['removed'].append(name)
+
+        return result
+
+    def softwares(self, validate=True):
+        """
+        Return a list of software instances (including their addons).
+
+        The validation of the names and versions can be skipped when the
+        table is known to be valid (for instance, when deserialized).
+        """
+        result = []
+        for index, name in enumerate(self.__names):
+            software = Software(name, self.__versions[index], validate=validate)
+            if self.__availableVersions[index]:
+                software.setAvailableVersions(self.__availableVersions[index])
+
+            for optionName, optionValue in self.__options[index].items():
+                software.setOption(optionName, optionValue)
+
+            for edge in range(self.__edgeOffsets[index], self.__edgeOffsets[index + 1]):
+                addon = Addon(
+                    self.__edgeNames[edge],
+                    self.__edgeVersions[edge],
+                    validate=validate
+                )
+                for optionName, optionValue in self.__edgeOptions[edge].items():
+                    addon.setOption(optionName, optionValue)
+
+                software.addAddon(addon)
+
+            result.append(software)
+
+        return result
+
+    @classmethod
+    def fromSoftwares(cls, softwares):
+        """
+        Return a table from a list of software instances (@see softwares).
+        """
+        names = []
+        versions = []
+        options = []
+        edgeOffsets = [0]
+        edgeNames = []
+        edgeVersions = []
+        edgeOptions = []
+        availableVersions = []
+        for software in softwares:
+            names.append(software.name())
+            versions.append(software.version())
+            availableVersions.append(software.availableVersions())
+            options.append(dict((x, software.option(x)) for x in software.optionNames()))
+
+            for addonName in software.addonNames():
+                addon = software.addon(addonName)
+                edgeNames.append(addonName)
+                edgeVersions.append(addon.version())
+                edgeOptions.append(dict((x, addon.option(x)) for x in addon.optionNames()))
+
+            edgeOffsets.append(len(edgeNames))
+
+        return cls(names, versions, options, edgeOffsets, edgeNames, edgeVersions, edgeOptions, availableVersions)
+
+    def serialize(self, names=None):
+        """
+        Return bytes with the serialized table.
+
+        When names are specified only those softwares are serialized
+        (@see filter).
+        """
+        table = self if names is None else self.filter(names)
+        columns = (self.formatVersion, ) + tuple(map(tuple, table.__columns()))
+
+        return self.__serializedHeader + marshal.dumps(columns, self.__marshalVersion)
+
+    @classmethod
+    def deserialize(cls, data, names=None):
+        """
+        Return a table from serialized bytes (@see serialize).
+
+        When names are specified only those softwares are part of the table.
+        The whole payload is decoded by marshal, however only the selected
+        rows (and their edges, through the edge offsets) are copied into the
+        table.
+        """
+        if bytes(data[:len(cls.__serializedHeader)]) != cls.__serializedHeader:
+            raise InvalidSerializedDataError('Unexpected serialized data header!')
+
+        try:
+            columns = marshal.loads(memoryview(data)[len(cls.__serializedHeader):])
+        except (EOFError, ValueError, TypeError) as err:
+            raise InvalidSerializedDataError(
+                'Could not decode serialized data: {0}'.format(err)
+            )
+
+        if not isinstance(columns, tuple) or len(columns) != 9 or columns[0] != cls.formatVersion:
+            raise InvalidSerializedDataError(
+                'Unsupported serialized data format (expecting version {0})!'.format(cls.formatVersion)
+            )
+
+        if names is None:
+            return cls(*columns[1:])
+
+        names = set(names)
+        rows = [index for index, x in enumerate(columns[1]) if x in names]
+
+        return cls.__fromRows(columns[1:], rows)
+
+    def __columns(self):
+        """
+        Return a tuple with the columns of the table (in the order expected by the constructor).
+
+        @private
+        """
+        return (
+            self.__names,
+            self.__versions,
+            self.__options,
+            self.__edgeOffsets,
+            self.__edgeNames,
+            self.__edgeVersions,
+            self.__edgeOptions,
+            self.__availableVersions
+        )
+
+    @classmethod
+    def __fromRows(cls, columns, rows):
+        """
+        Return a table containing only the rows (sorted indexes) of the columns.
+
+        The edges of each row are sliced from the edge columns through the
+        edge offsets, therefore the other rows are never visited.
+
+        @private
+        """
+        names, versions, options, edgeOffsets, edgeNames, edgeVersions, edgeOptions, availableVersions = columns
+
+        rowEdgeOffsets = [0]
+        rowEdgeNames = []
+        rowEdgeVersions = []
+        rowEdgeOptions = []
+        for index in rows:
+            start = edgeOffsets[index]
+            end = edgeOffsets[index + 1]
+            rowEdgeNames.extend(edgeNames[start:end])
+            rowEdgeVersions.extend(edgeVersions[start:end])
+            rowEdgeOptions.extend(edgeOptions[start:end])
+            rowEdgeOffsets.append(len(rowEdgeNames))
+
+        return cls(
+            [names[x] for x in rows],
+            [versions[x] for x in rows],
+            [options[x] for x in rows],
+            rowEdgeOffsets,
+            rowEdgeNames,
+            rowEdgeVersions,
+            rowEdgeOptions,
+            [availableVersions[x] for x in rows]
+        )
+
+    def __reduce__(self):
+        """
+        Pickle the table through its serialized bytes.
+        """
+        return (ResolvedTable.deserialize, (self.serialize(),))
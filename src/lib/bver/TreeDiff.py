@@ -0,0 +1,286 @@
+import os
+import json
+import hashlib
+from collections import namedtuple
+from .Mirror import Mirror
+from .Loader import JsonLoader
+
+class DiffEntry(namedtuple('DiffEntry', ['softwareName', 'addonName', 'optionName', 'change', 'before', 'after'])):
+    """
+    Difference found between the resolution of two config trees.
+
+    The addonName is None when the difference is about the software itself
+    and the optionName is None when it's not about an option (in that case
+    before/after hold versions). The change is either "added", "removed"
+    or "changed".
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        """
+        Return the entry formatted as "<change>: <software>[/<addon>][ option <name>]: <before> -> <after>".
+        """
+        location = self.softwareName
+        if self.addonName is not None:
+            location = '{0}/{1}'.format(location, self.addonName)
+
+        if self.optionName is not None:
+            location = '{0} option {1}'.format(location, self.optionName)
+
+        return '{0}: {1}: {2} -> {3}'.format(
+            self.change,
+            location,
+            '' if self.before is None else json.dumps(self.before),
+            '' if self.after is None else json.dumps(self.after)
+        )
+
+class TreeDiff(object):
+    """
+    Compares the resolution of two config trees (lists of paths used by the JsonLoader).
+
+    The trees are compared as Merkle trees: each path is hashed from the
+    checksum of its files (read from the published manifest for the files
+    matching its size and modification time, @see Mirror.verifiedManifest)
+    so identical paths are skipped without being parsed. Only
+    the softwares defined by the files that changed (including their
+    version files) and the softwares using them as addons are resolved
+    (@see JsonLoader.addFromJsonPathsOnly) and compared per software entry.
+
+    The trees are only read (their index is rebuilt in memory when outdated).
+    """
+
+    def __init__(self, leftPaths, rightPaths, recursive=False):
+        """
+        Create a tree diff object.
+        """
+        self.__leftPaths = list(leftPaths)
+        self.__rightPaths = list(rightPaths)
+        self.__recursive = recursive
+        self.__result = None
+
+    def changedFiles(self):
+        """
+        Return a sorted list with the files (relative to their path, prefixed by the path index) that differ between the trees.
+        """
+        return sorted(self.__compare()[0])
+
+    def softwareNames(self):
+        """
+        Return a sorted list with the names of the softwares compared (the ones affected by the changed files).
+        """
+        return sorted(self.__compare()[1])
+
+    def diff(self):
+        """
+        Return a list of differences (@see DiffEntry) between the resolution of the trees.
+        """
+        changedKeys, names, leftTable, rightTable = self.__compare()
+
+        result = []
+        for softwareName in sorted(names):
+            leftIndex = leftTable.index(softwareName)
+            rightIndex = rightTable.index(softwareName)
+            if leftIndex is not None and rightIndex is not None and leftTable.rowHash(leftIndex) == rightTable.rowHash(rightIndex):
+                continue
+
+            self.__compareRows(
+                softwareName,
+                leftTable.row(softwareName),
+                rightTable.row(softwareName),
+                result
+            )
+
+        return result
+
+    def envDiff(self):
+        """
+        Return a sorted list of (bver name, before, after) for the bver variables that differ between the trees.
+
+        The value is None when the variable is not defined by the tree.
+        """
+        changedKeys, names, leftTable, rightTable = self.__compare()
+        leftEnv = leftTable.toEnv()
+        rightEnv = rightTable.toEnv()
+
+        result = []
+        for bverName in sorted(set(leftEnv.keys()).union(rightEnv.keys())):
+            if leftEnv.get(bverName) != rightEnv.get(bverName):
+                result.append((bverName, leftEnv.get(bverName), rightEnv.get(bverName)))
+
+        return result
+
+    def __compare(self):
+        """
+        Return a tuple (changed file keys, software names, left table, right table) with the comparison of the trees.
+
+        @private
+        """
+        if self.__result is not None:
+            return self.__result
+
+        leftDigests, leftFiles = self.__fileHashes(self.__leftPaths)
+        rightDigests, rightFiles = self.__fileHashes(self.__rightPaths)
+
+        # identical paths do not contribute any change
+        changedKeys = set()
+        for key in set(leftFiles.keys()).union(rightFiles.keys()):
+            pathIndex = int(key.split('/', 1)[0])
+            if pathIndex < min(len(leftDigests), len(rightDigests)) and leftDigests[pathIndex] == rightDigests[pathIndex]:
+                continue
+
+            if leftFiles.get(key) != rightFiles.get(key):
+                changedKeys.add(key)
+
+        names = set()
+        leftEntries = []
+        rightEntries = []
+        if changedKeys:
+            leftEntries = self.__indexEntries(self.__leftPaths)
+            rightEntries = self.__indexEntries(self.__rightPaths)
+
+            # softwares defined by the changed files
+            for key, entry in leftEntries + rightEntries:
+                directory = os.path.dirname(key)
+                if any('{0}/{1}'.format(directory, x[0]) in changedKeys for x in entry['stats']):
+                    names.update(entry['softwares'].keys())
+
+            # softwares using them as addons
+            for key, entry in leftEntries + rightEntries:
+                for softwareName, addonNames in entry['softwares'].items():
+                    if not names.isdisjoint(addonNames):
+                        names.add(softwareName)
+
+        self.__result = (
+            changedKeys,
+            names,
+            self.__resolvedTable(self.__leftPaths, names),
+            self.__resolvedTable(self.__rightPaths, names)
+        )
+
+        return self.__result
+
+    def __resolvedTable(self, paths, names):
+        """
+        Return the resolved table containing only the softwares from the paths.
+
+        @private
+        """
+        loader = JsonLoader()
+        if names:
+            loader.addFromJsonPathsOnly(paths, names, recursive=self.__recursive)
+
+        return loader.resolvedTable().filter(names)
+
+    def __indexEntries(self, paths):
+        """
+        Return a list of (file key, index entry) for the json files of the paths.
+
+        @private
+        """
+        loader = JsonLoader()
+        result = []
+        for pathIndex, path in enumerate(paths):
+            jsonFiles = JsonLoader.jsonFiles([path], self.__recursive)
+            for jsonFile, entry in zip(jsonFiles, loader.indexEntries(jsonFiles)):
+                result.append((self.__fileKey(pathIndex, path, jsonFile), entry))
+
+        return result
+
+    @classmethod
+    def __fileHashes(cls, paths):
+        """
+        Return a tuple (digest per path, dict of file key: checksum) for the paths.
+
+        @private
+        """
+        digests = []
+        files = {}
+        for pathIndex, path in enumerate(paths):
+            if os.path.isdir(path):
+                manifest = Mirror.verifiedManifest(path)
+                digests.append(manifest['digest'])
+                for fileName, fileInfo in manifest['files'].items():
+                    files['{0}/{1}'.format(pathIndex, fileName)] = fileInfo['sha256']
+
+            elif os.path.isfile(path):
+                checksum = Mirror.checksum(path)
+                digests.append(hashlib.sha256(checksum.encode('ascii')).hexdigest())
+                files[cls.__fileKey(pathIndex, path, path)] = checksum
+
+            else:
+                digests.append(None)
+
+        return (digests, files)
+
+    @staticmethod
+    def __fileKey(pathIndex, path, filePath):
+        """
+        Return the key used to identify a file among the paths ("<path index>/<relative file path>").
+
+        @private
+        """
+        if os.path.isdir(path):
+            relativePath = os.path.relpath(filePath, path).replace(os.sep, '/')
+        else:
+            relativePath = os.path.basename(filePath)
+
+        return '{0}/{1}'.format(pathIndex, relativePath)
+
+    @classmethod
+    def __compareRows(cls, softwareName, before, after, result):
+        """
+        Add the differences between two rows (@see ResolvedTable.row) of a software to the result.
+
+        @private
+        """
+        if before is None or after is None:
+            result.append(DiffEntry(
+                softwareName,
+                None,
+                None,
+                'added' if before is None else 'removed',
+                None if before is None else before['version'],
+                None if after is None else after['version']
+            ))
+            return
+
+        if before['version'] != after['version']:
+            result.append(DiffEntry(softwareName, None, None, 'changed', before['version'], after['version']))
+
+        cls.__compareOptions(softwareName, None, before['options'], after['options'], result)
+
+        for addonName in sorted(set(before['addons'].keys()).union(after['addons'].keys())):
+            beforeAddon = before['addons'].get(addonName)
+            afterAddon = after['addons'].get(addonName)
+
+            if beforeAddon is None or afterAddon is None:
+                result.append(DiffEntry(
+                    softwareName,
+                    addonName,
+                    None,
+                    'added' if beforeAddon is None else 'removed',
+                    None if beforeAddon is None else beforeAddon['version'],
+                    None if afterAddon is None else afterAddon['version']
+                ))
+                continue
+
+            if beforeAddon['version'] != afterAddon['version']:
+                result.append(DiffEntry(softwareName, addonName, None, 'changed', beforeAddon['version'], afterAddon['version']))
+
+            cls.__compareOptions(softwareName, addonName, beforeAddon['options'], afterAddon['options'], result)
+
+    @staticmethod
+    def __compareOptions(softwareName, addonName, before, after, result):
+        """
+        Add the differences between two option dicts to the result.
+
+        @private
+        """
+        for optionName in sorted(set(before.keys()).union(after.keys())):
+            if optionName not in before:
+                result.append(DiffEntry(softwareName, addonName, optionName, 'added', None, after[optionName]))
+            elif optionName not in after:
+                result.append(DiffEntry(softwareName, addonName, optionName, 'removed', before[optionName], None))
+            elif before[optionName] != after[optionName]:
+                result.append(DiffEntry(softwareName, addonName, optionName, 'changed', before[optionName], after[optionName]))
@@ -1,5 +1,6 @@
 from .Versioned import Versioned
 from .Addon import Addon
+from .Version import Version
 
 class InvalidAddonError(Exception):
     """Invalid addon error."""
@@ -16,6 +17,7 @@ class Software(Versioned):
         super(Software, self).__init__(*args, **kwargs)
 
         self.__addons = {}
+        self.__availableVersions = ()
 
     def addAddon(self, addon):
         """
@@ -40,6 +42,23 @@ class Software(Versioned):
         """
         return self.__addons.keys()
 
+    def setAvailableVersions(self, versions):
+        """
+        Set the versions available for the software (among the ones it could be resolved to).
+        """
+        self.__availableVersions = tuple(sorted(set(versions), key=lambda x: Version.parse(x).key()))
+
+    def availableVersions(self):
+        """
+        Return a list with the available versions sorted from the oldest to the latest (@see Version).
+
+        It defaults to the version of the software.
+        """
+        if not self.__availableVersions:
+            return [self.version()]
+
+        return list(self.__availableVersions)
+
     def bverName(self, addon=None):
         """
         Return the environment variable name of the versioned.
@@ -0,0 +1,170 @@
+import re
+from .Versioned import InvalidVersionError
+
+# compatibility with python 2/3
+try:
+    basestring
+except NameError:
+    basestring = str
+
+class Version(object):
+    """
+    Parsed version supporting natural ordering.
+
+    Any non empty string is accepted: versions are compared by their
+    numeric and alphabetic parts (numbers compared as numbers), where a
+    pre-release (a "-" followed by a letter, for instance "1.0.0-rc1")
+    comes before its release and build metadata ("+...") is ignored. For
+    instance: "2.9" < "2.10" < "17.0.0-beta" < "17.0.0" < "v17.1".
+
+    Parsed versions are immutable and cached by their string (@see parse).
+    """
+
+    __slots__ = ('__text', '__key')
+    __cache = {}
+    __tokenRegEx = re.compile(r'([0-9]+)|([^\W\d_]+)')
+    __prereleaseRegEx = re.compile(r'-(?=[^\W\d_])')
+    __semverRegEx = re.compile(r'^([0-9]+)\.([0-9]+)\.([0-9]+)$')
+
+    def __init__(self, text):
+        """
+        Create a version object.
+        """
+        if not (isinstance(text, basestring) and len(text)):
+            raise InvalidVersionError(
+                'version needs to be defined as valid string "{0}"'.format(
+                    text
+                )
+            )
+
+        self.__text = text
+
+        release = text.split('+', 1)[0]
+        parts = self.__prereleaseRegEx.split(release, 1)
+        release = parts[0]
+        prerelease = parts[1] if len(parts) > 1 else ''
+
+        # "v1.0" is the same as "1.0"
+        if release[:1] in ('v', 'V') and release[1:2].isdigit():
+            release = release[1:]
+
+        self.__key = (
+            self.__tokens(release),
+            0 if prerelease else 1,
+            self.__tokens(prerelease)
+        )
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Return the parsed version of a string (cached).
+        """
+        result = cls.__cache.get(text)
+        if result is None:
+            result = cls(text)
+            cls.__cache[text] = result
+
+        return result
+
+    def key(self):
+        """
+        Return the key used to sort the version.
+        """
+        return self.__key
+
+    def semver(self):
+        """
+        Return a tuple (major, minor, patch) when the version is a plain "<major>.<minor>.<patch>" (otherwise None).
+        """
+        match = self.__semverRegEx.match(self.__text)
+        if match is None:
+            return None
+
+        return tuple(map(int, match.groups()))
+
+    def __str__(self):
+        """
+        Return the version string.
+        """
+        return self.__text
+
+    def __repr__(self):
+        """
+        Return the representation of the version.
+        """
+        return 'Version({0!r})'.format(self.__text)
+
+    def __hash__(self):
+        """
+        Return the hash of the version (versions with the same key are equal).
+        """
+        return hash(self.__key)
+
+    def __eq__(self, other):
+        """
+        Return a boolean telling if the version is equal to another version (or version string).
+        """
+        otherKey = self.__otherKey(other)
+        return otherKey is not NotImplemented and self.__key == otherKey
+
+    def __ne__(self, other):
+        """
+        Return a boolean telling if the version is not equal to another version (or version string).
+        """
+        return not self == other
+
+    def __lt__(self, other):
+        """
+        Return a boolean telling if the version is lower than another version (or version string).
+        """
+        otherKey = self.__otherKey(other)
+        return otherKey if otherKey is NotImplemented else self.__key < otherKey
+
+    def __le__(self, other):
+        """
+        Return a boolean telling if the version is lower or equal to another version (or version string).
+        """
+        otherKey = self.__otherKey(other)
+        return otherKey if otherKey is NotImplemented else self.__key <= otherKey
+
+    def __gt__(self, other):
+        """
+        Return a boolean telling if the version is greater than another version (or version string).
+        """
+        otherKey = self.__otherKey(other)
+        return otherKey if otherKey is NotImplemented else self.__key > otherKey
+
+    def __ge__(self, other):
+        """
+        Return a boolean telling if the version is greater or equal to another version (or version string).
+        """
+        otherKey = self.__otherKey(other)
+        return otherKey if otherKey is NotImplemented else self.__key >= otherKey
+
+    @classmethod
+    def __otherKey(cls, other):
+        """
+        Return the key of a version or version string compared against.
+
+        @private
+        """
+        if isinstance(other, Version):
+            return other.key()
+
+        if isinstance(other, basestring):
+            return cls.parse(other).key()
+
+        return NotImplemented
+
+    @classmethod
+    def __tokens(cls, text):
+        """
+        Return a tuple with the numeric and alphabetic parts of a string.
+
+        Numbers come before words when compared against each other.
+
+        @private
+        """
+        return tuple(
+            (0, int(number), '') if number else (1, 0, word) for number, word in cls.__tokenRegEx.findall(text)
+        )
@@ -22,13 +22,20 @@ class Versioned(object):
 
     __nameRegEx = re.compile('^[^\W]+$')
 
-    def __init__(self, name, version):
+    def __init__(self, name, version, validate=True):
         """
         Create a versioned object.
+
+        The validation of the name and version can be skipped when they
+        are known to be valid (for instance, when deserialized).
         """
         self.__options = {}
-        self.__setName(name)
-        self.__setVersion(version)
+        if validate:
+            self.__setName(name)
+            self.__setVersion(version)
+        else:
+            self.__name = name
+            self.__version = version
 
     def version(self):
         """
@@ -36,6 +43,14 @@ class Versioned(object):
         """
         return self.__version
 
+    def parsedVersion(self):
+        """
+        Return the parsed version (@see Version).
+        """
+        from .Version import Version
+
+        return Version.parse(self.__version)
+
     def bverName(self):
         """
         Return the environment variable name of the versioned.
@@ -1,3 +1,4 @@
 from .Versioned import Versioned, InvalidNameError, InvalidOptionError, InvalidVersionError
 from .Software import Software, InvalidAddonError
 from .Addon import Addon
+from .Version import Version
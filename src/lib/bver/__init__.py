@@ -1,3 +1,47 @@
+import importlib
 from . import Versioned
+from . import JsonBackend
 from . import Loader
+from .NameIndex import NameIndex
+from .ResolvedTable import ResolvedTable, InvalidSerializedDataError
 from .Query import Query, SoftwareNotFoundError, AddonNotFoundError
+from .OptionIndex import OptionIndex
+from .QueryFilter import QueryFilter, OptionFilter, SoftwareFilter, AddonFilter
+from .QueryRunner import QueryRunner, InvalidQueryError
+from .EnvSnapshot import EnvSnapshot, InvalidSnapshotError, lookup
+from .EnvBuilder import EnvBuilder, InvalidConfigRootError, InvalidModeError, buildEnv
+
+# modules depending on expensive imports (zipfile, py_compile, shutil)
+# are imported on demand (@see __getattr__)
+_lazyNames = {
+    'Mirror': 'Mirror',
+    'InvalidManifestError': 'Mirror',
+    'TreeDiff': 'TreeDiff',
+    'DiffEntry': 'TreeDiff',
+    'LibArchive': 'LibArchive'
+}
+
+def __getattr__(name):
+    """
+    Return a name provided by a module imported on demand.
+    """
+    if name not in _lazyNames:
+        raise AttributeError(
+            'module "{0}" has no attribute "{1}"'.format(__name__, name)
+        )
+
+    moduleName = _lazyNames[name]
+    module = importlib.import_module('.{0}'.format(moduleName), __name__)
+
+    # replacing the submodule set by the import with its names
+    for lazyName, lazyModuleName in _lazyNames.items():
+        if lazyModuleName == moduleName:
+            globals()[lazyName] = getattr(module, lazyName)
+
+    return globals()[name]
+
+def __dir__():
+    """
+    Return the names of the package (including the ones imported on demand).
+    """
+    return sorted(set(globals()).union(_lazyNames))
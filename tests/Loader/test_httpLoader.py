@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import functools
+import subprocess
+from unittest import mock
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from bver import Query
+from bver.Loader import \
+    JsonLoader, \
+    HttpLoader, \
+    InvalidUrlError, \
+    RemoteFetchError, \
+    UnexpectedVersionFormatError
+from .CommonLoader import CommonLoader
+
+class _RequestHandler(SimpleHTTPRequestHandler):
+    """Serves files through keep-alive connections recording the requests."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """Answer "not modified" regardless of the request for the notModified path."""
+        if self.path == '/notModified.json':
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        SimpleHTTPRequestHandler.do_GET(self)
+
+    def handle_one_request(self):
+        """Record the request before handling it."""
+        self.server.connections.add(id(self.connection))
+        SimpleHTTPRequestHandler.handle_one_request(self)
+
+    def send_response(self, code, message=None):
+        """Record the response status."""
+        self.server.statuses.append(code)
+        SimpleHTTPRequestHandler.send_response(self, code, message)
+
+    def log_message(self, *args):
+        """Avoid logging the requests."""
+
+class TestHttpLoader(CommonLoader):
+    """Test http loader object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+    __fileNames = ['activeVersion.json', 'complex.json', 'externalAddons.json', 'simple.json']
+
+    def setUp(self):
+        """Start a http server serving the json files."""
+        self.server = ThreadingHTTPServer(
+            ('127.0.0.1', 0),
+            functools.partial(_RequestHandler, directory=self.__jsonDirectory)
+        )
+        self.server.connections = set()
+        self.server.statuses = []
+
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        self.cacheDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cacheDirectory)
+        self.loaders = []
+
+    def tearDown(self):
+        """Close the loaders and stop the http server."""
+        for loader in self.loaders:
+            loader.close()
+
+        self.stopServer()
+
+    def createLoader(self, *args, **kwargs):
+        """Return a http loader closed by the tear down."""
+        loader = HttpLoader(*args, **kwargs)
+        self.loaders.append(loader)
+
+        return loader
+
+    def stopServer(self):
+        """Stop the http server."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def test_addingUrls(self):
+        """Should load the documents the same way as the json loader."""
+        loader = self.createLoader()
+        loader.addFromUrls(list(map(self.__url, self.__fileNames)))
+
+        jsonLoader = JsonLoader()
+        jsonLoader.addFromJsonPaths(
+            list(map(lambda x: os.path.join(self.__jsonDirectory, x), self.__fileNames))
+        )
+
+        self.assertDictEqual(
+            Query(loader.softwares()).toEnv(),
+            Query(jsonLoader.softwares()).toEnv()
+        )
+
+    def test_conflicts(self):
+        """Should merge the documents by key reporting the shadowed definitions."""
+        urls = [self.__url('first.json'), self.__url('second.json')]
+        documents = [
+            json.dumps({'a': '1.0.0', 'b': {'version': '1.0.0', 'addons': {'a': {'options': {'enabled': True}}}}}),
+            json.dumps({'a': '2.0.0', 'b': {'version': '2.0.0', 'addons': {'a': {'options': {'enabled': False}}}}})
+        ]
+
+        loader = self.createLoader()
+        with mock.patch.object(HttpLoader, 'fetchAll', return_value=documents):
+            loader.addFromUrls(urls)
+
+        self.assertDictEqual(
+            Query(loader.softwares()).toEnv(),
+            {'BVER_A_VERSION': '2.0.0', 'BVER_B_VERSION': '2.0.0', 'BVER_B_A_VERSION': '2.0.0', 'BVER_B_A_ENABLED': '0'}
+        )
+        self.assertListEqual(
+            list(map(str, loader.conflicts())),
+            [
+                'a: {0} shadows {1}'.format(urls[1], urls[0]),
+                'b: {0} shadows {1}'.format(urls[1], urls[0]),
+                'b/a: {0} shadows {1}'.format(urls[1], urls[0])
+            ]
+        )
+
+    def test_keepAlive(self):
+        """Should reuse the pooled connections."""
+        loader = self.createLoader(maxConnections=1)
+        for fileName in self.__fileNames:
+            loader.addFromUrl(self.__url(fileName))
+
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_conditionalRequest(self):
+        """Should use conditional requests for documents fetched before."""
+        loader = self.createLoader()
+        contents = loader.fetch(self.__url('simple.json'))
+
+        self.assertEqual(loader.fetch(self.__url('simple.json')), contents)
+        self.assertListEqual(self.server.statuses, [200, 304])
+
+    def test_offlineFallback(self):
+        """Should use the cached copy when the server cannot be reached."""
+        loader = self.createLoader(cacheDirectory=self.cacheDirectory)
+        contents = loader.fetch(self.__url('simple.json'))
+        url = self.__url('simple.json')
+
+        self.stopServer()
+
+        # a new loader only has the copy stored on disk
+        loader = self.createLoader(cacheDirectory=self.cacheDirectory, timeout=1)
+        self.assertEqual(loader.fetch(url), contents)
+
+        success = False
+        try:
+            self.createLoader(timeout=1).fetch(url)
+        except RemoteFetchError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_overlay(self):
+        """Should keep the settings of the loader in its overlays."""
+        overlay = self.createLoader(cacheDirectory=self.cacheDirectory).overlay()
+        self.loaders.append(overlay)
+
+        self.assertIsInstance(overlay, HttpLoader)
+        overlay.addFromUrl(self.__url('simple.json'))
+        self.assertEqual(len(os.listdir(self.cacheDirectory)), 1)
+
+    def test_notModifiedWithoutCache(self):
+        """Should fail when the server answers not modified without a cached copy."""
+        loader = self.createLoader()
+
+        success = False
+        try:
+            loader.fetch(self.__url('notModified.json'))
+        except RemoteFetchError as err:
+            success = 'cached copy' in str(err)
+
+        self.assertTrue(success)
+
+    def test_splitVersions(self):
+        """Should fail when a document uses versions split per file (instead of reading local files)."""
+        splitVersionsDirectory = os.path.join(self.__rootPath, 'data', 'jsonSplitVersions')
+        with open(os.path.join(splitVersionsDirectory, 'activeVersion.json')) as f:
+            contents = f.read()
+
+        loader = self.createLoader()
+        currentDirectory = os.getcwd()
+        os.chdir(splitVersionsDirectory)
+        self.addCleanup(os.chdir, currentDirectory)
+
+        success = False
+        try:
+            with mock.patch.object(HttpLoader, 'fetch', return_value=contents):
+                loader.addFromUrl(self.__url('activeVersion.json'))
+        except UnexpectedVersionFormatError:
+            success = True
+
+        self.assertTrue(success)
+        self.assertListEqual(loader.softwares(), [])
+
+    def test_lazyImport(self):
+        """Should not import the http and sqlite modules with the package."""
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                '-c',
+                'import sys, bver; '
+                'print(sorted(set(["http.client", "ssl", "sqlite3", "zipfile"]).intersection(sys.modules)))'
+            ],
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        )
+
+        self.assertEqual(output.decode('utf-8').strip(), '[]')
+
+    def test_missingDocument(self):
+        """Should fail when the document does not exist."""
+        loader = self.createLoader()
+
+        success = False
+        try:
+            loader.fetch(self.__url('missing.json'))
+        except RemoteFetchError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_invalidUrl(self):
+        """Should fail when passing an invalid url."""
+        loader = self.createLoader()
+
+        success = False
+        try:
+            loader.fetch('/dev/null/invalid.json')
+        except InvalidUrlError:
+            success = True
+
+        self.assertTrue(success)
+
+    def __url(self, fileName):
+        """Return the url of a file served by the http server."""
+        return 'http://127.0.0.1:{0}/{1}'.format(self.server.server_port, fileName)
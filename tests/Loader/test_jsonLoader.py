@@ -1,13 +1,20 @@
 import json
 import os
+import stat
+import shutil
+import tempfile
+import threading
+from unittest import mock
 from bver.Loader import \
     JsonLoader, \
+    MergeConflict, \
     UnexpectedRootContentError, \
     UnexpectedAddonsDataError, \
     UnexpectedAddonContentError, \
     UnexpectedVersionFormatError, \
     InvalidFileError, \
     InvalidDirectoryError
+from bver import Query, JsonBackend, Mirror
 from .CommonLoader import CommonLoader
 
 class TestJsonLoader(CommonLoader):
@@ -15,6 +22,7 @@ class TestJsonLoader(CommonLoader):
 
     __rootPath = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+    __jsonSplitVersionsDirectory = os.path.join(__rootPath, 'data', 'jsonSplitVersions')
 
     def test_constructor(self):
         """Should test the constructor."""
@@ -59,6 +67,25 @@ class TestJsonLoader(CommonLoader):
         self.checkSoftwareInfo(softwareInfos, softwares)
         self.checkAddonsInfo(softwareInfos, softwares)
 
+    def test_addingContents(self):
+        """Should test adding decoded json contents to the loader."""
+        loader = JsonLoader()
+
+        softwareInfos = {
+            'a': '10.1',
+            'b': {
+                'version': '12.1',
+                'addons': {
+                    'a': {}
+                }
+            }
+        }
+        loader.addFromContents(softwareInfos)
+
+        softwares = loader.softwares()
+        self.checkSoftwareInfo(softwareInfos, softwares)
+        self.checkAddonsInfo(softwareInfos, softwares)
+
     def test_unexpectedRootContent(self):
         """
         Should fail when json does not have the proper format for the root.
@@ -221,3 +248,542 @@ class TestJsonLoader(CommonLoader):
             success = True
 
         self.assertTrue(success)
+
+    def test_jsonFiles(self):
+        """Should collect the json files sorted by name."""
+        jsonFiles = JsonLoader.jsonFiles([self.__jsonDirectory])
+
+        self.assertListEqual(
+            jsonFiles,
+            list(map(lambda x: os.path.join(self.__jsonDirectory, x), [
+                'activeVersion.json',
+                'complex.json',
+                'externalAddons.json',
+                'simple.json'
+            ]))
+        )
+
+    def test_jsonFilesRecursive(self):
+        """Should only collect the json files from sub directories in recursive mode."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        os.makedirs(os.path.join(directory, 'b', 'c'))
+        for fileName in ['b.json', 'a.json', os.path.join('b', 'c', 'd.json'), os.path.join('b', 'a.json'), 'ignore.txt', '.hidden.json']:
+            with open(os.path.join(directory, fileName), 'w') as f:
+                f.write('{}')
+
+        self.assertListEqual(
+            JsonLoader.jsonFiles([directory]),
+            [
+                os.path.join(directory, 'a.json'),
+                os.path.join(directory, 'b.json')
+            ]
+        )
+
+        self.assertListEqual(
+            JsonLoader.jsonFiles([directory], recursive=True),
+            [
+                os.path.join(directory, 'a.json'),
+                os.path.join(directory, 'b.json'),
+                os.path.join(directory, 'b', 'a.json'),
+                os.path.join(directory, 'b', 'c', 'd.json')
+            ]
+        )
+
+    def test_jsonFilesDuplicated(self):
+        """Should only collect a file once even when it's reachable through multiple paths."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        filePath = os.path.join(directory, 'a.json')
+        with open(filePath, 'w') as f:
+            f.write('{}')
+        os.symlink(filePath, os.path.join(directory, 'b.json'))
+        os.symlink(directory, os.path.join(directory, 'loop'))
+
+        self.assertListEqual(
+            JsonLoader.jsonFiles([filePath, directory, '/dev/null/invalid'], recursive=True),
+            [filePath]
+        )
+
+    def test_addingJsonPathsRecursive(self):
+        """Should load the json files from sub directories in recursive mode."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        os.makedirs(os.path.join(directory, 'nested'))
+        with open(os.path.join(directory, 'a.json'), 'w') as f:
+            json.dump({'a': {'version': '1.0', 'addons': {'b': {}}}}, f)
+        with open(os.path.join(directory, 'nested', 'b.json'), 'w') as f:
+            json.dump({'b': '2.0'}, f)
+
+        loader = JsonLoader()
+        loader.addFromJsonPaths([directory], recursive=True)
+
+        softwares = loader.softwares()
+        self.assertEqual(len(softwares), 2)
+        self.assertEqual(softwares[0].addon('b').version(), '2.0')
+
+    def test_addingJsonSplitVersions(self):
+        """Should load versions split per file the same way as inline versions."""
+        inlineFilePath = os.path.join(self.__jsonDirectory, 'activeVersion.json')
+        splitFilePath = os.path.join(self.__jsonSplitVersionsDirectory, 'activeVersion.json')
+
+        for activeVersionFromEnv in [None, {'BVER_ACTIVEVERSION_VERSION': '16.4.200'}, {'BVER_ACTIVEVERSION_VERSION': '1.0'}]:
+            inlineLoader = JsonLoader()
+            inlineLoader.addFromJsonFile(inlineFilePath, activeVersionFromEnv)
+
+            splitLoader = JsonLoader()
+            splitLoader.addFromJsonFile(splitFilePath, activeVersionFromEnv)
+
+            self.assertDictEqual(
+                Query(splitLoader.softwares()).toEnv(),
+                Query(inlineLoader.softwares()).toEnv()
+            )
+
+            # the versions available are recorded when loading
+            self.assertListEqual(
+                splitLoader.resolvedTable().availableVersions('activeVersion'),
+                inlineLoader.resolvedTable().availableVersions('activeVersion')
+            )
+
+        splitLoader = JsonLoader()
+        splitLoader.addFromJsonFile(splitFilePath)
+        self.assertListEqual(
+            splitLoader.resolvedTable().availableVersions('activeVersion'),
+            ['16.4.200', '17.5.391']
+        )
+
+    def test_addingJsonSplitVersionsOnlyParsesSelected(self):
+        """Should not parse the version files that are not selected."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        os.makedirs(os.path.join(directory, 'a.versions'))
+        with open(os.path.join(directory, 'a.json'), 'w') as f:
+            json.dump({'a': {'active': '2.0', 'versions': 'a.versions'}}, f)
+        with open(os.path.join(directory, 'a.versions', '2.0.json'), 'w') as f:
+            json.dump({'options': {'foo': 1}}, f)
+        with open(os.path.join(directory, 'a.versions', '1.0.json'), 'w') as f:
+            f.write('invalid')
+
+        loader = JsonLoader()
+        loader.addFromJsonPaths([directory], recursive=True)
+
+        softwares = loader.softwares()
+        self.assertEqual(len(softwares), 1)
+        self.assertEqual(softwares[0].version(), '2.0')
+        self.assertEqual(softwares[0].option('foo'), 1)
+
+    def test_missingSplitActiveVersion(self):
+        """Should fail when the active version file does not exist."""
+        loader = JsonLoader()
+
+        jsonString = json.dumps({
+            'a': {
+                'active': '2.0',
+                'versions': 'a.versions'
+            }
+        })
+
+        success = False
+        try:
+            loader.addFromJson(jsonString, baseDirectory=self.__jsonSplitVersionsDirectory)
+        except InvalidFileError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_invalidSplitVersion(self):
+        """Should fail when the version refers to a file outside of the version directory."""
+        jsonString = json.dumps({
+            'a': {
+                'active': '2.0',
+                'versions': 'a.versions'
+            }
+        })
+
+        failedCount = 0
+        for version in ['../../simple', '2.0/../../simple', '..', os.path.join('sub', '2.0')]:
+            loader = JsonLoader()
+            try:
+                loader.addFromJson(
+                    jsonString,
+                    {'BVER_A_VERSION': version},
+                    baseDirectory=self.__jsonSplitVersionsDirectory
+                )
+            except UnexpectedVersionFormatError:
+                failedCount += 1
+
+        self.assertEqual(failedCount, 4)
+
+    def test_invalidSplitVersionsDirectory(self):
+        """Should fail when the version directory is outside of the base directory."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        baseDirectory = os.path.join(directory, 'base')
+        os.makedirs(baseDirectory)
+        shutil.copytree(
+            os.path.join(self.__jsonSplitVersionsDirectory, 'activeVersion.versions'),
+            os.path.join(directory, 'outside.versions')
+        )
+
+        failedCount = 0
+        for versions in ['../outside.versions', os.path.join(directory, 'outside.versions')]:
+            loader = JsonLoader()
+            try:
+                loader.addFromJson(
+                    json.dumps({'a': {'active': '17.5.391', 'versions': versions}}),
+                    baseDirectory=baseDirectory
+                )
+            except UnexpectedVersionFormatError:
+                failedCount += 1
+
+        self.assertEqual(failedCount, 2)
+
+    def test_overlay(self):
+        """Should resolve overlays the same way as loading all files in a single loader."""
+        simpleFilePath = os.path.join(self.__jsonDirectory, 'simple.json')
+        complexFilePath = os.path.join(self.__jsonDirectory, 'complex.json')
+        externalAddons = os.path.join(self.__jsonDirectory, 'externalAddons.json')
+
+        base = JsonLoader()
+        base.addFromJsonPaths([complexFilePath, simpleFilePath])
+
+        overlay = base.overlay()
+        self.assertIsInstance(overlay, JsonLoader)
+        overlay.addFromJsonPaths([externalAddons])
+
+        loader = JsonLoader()
+        loader.addFromJsonPaths([complexFilePath, simpleFilePath, externalAddons])
+
+        self.assertDictEqual(
+            Query(overlay.softwares()).toEnv(),
+            Query(loader.softwares()).toEnv()
+        )
+
+    def test_overlayBasePrecedence(self):
+        """Should resolve a base taking precedence the same way as loading it last."""
+        simpleFilePath = os.path.join(self.__jsonDirectory, 'simple.json')
+        complexFilePath = os.path.join(self.__jsonDirectory, 'complex.json')
+        externalAddons = os.path.join(self.__jsonDirectory, 'externalAddons.json')
+
+        base = JsonLoader(JsonBackend.backend('json'))
+        base.addFromJsonPaths([externalAddons])
+
+        overlay = base.overlay(basePrecedence=True)
+        self.assertEqual(overlay.jsonBackend().name, 'json')
+        overlay.addFromJsonPaths([complexFilePath, simpleFilePath])
+
+        loader = JsonLoader()
+        loader.addFromJsonPaths([complexFilePath, simpleFilePath, externalAddons])
+
+        self.assertDictEqual(
+            Query(overlay.softwares()).toEnv(),
+            Query(loader.softwares()).toEnv()
+        )
+
+    def test_addingCachedJsonPaths(self):
+        """Should reuse the cached resolution while the published manifest is unchanged."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        configDirectory = os.path.join(directory, 'config')
+        shutil.copytree(self.__jsonDirectory, configDirectory)
+        layerCacheDirectory = os.path.join(directory, 'layerCache')
+
+        os.makedirs(os.path.join(configDirectory, 'split.versions'))
+        with open(os.path.join(configDirectory, 'split.json'), 'w') as f:
+            json.dump({'split': {'active': '2.0', 'versions': 'split.versions'}}, f)
+        with open(os.path.join(configDirectory, 'split.versions', '2.0.json'), 'w') as f:
+            json.dump({'options': {'foo': 1}}, f)
+
+        def cachedLoad():
+            loader = JsonLoader()
+            cached = loader.addFromCachedJsonPaths([configDirectory])
+
+            expected = JsonLoader()
+            expected.addFromJsonPaths([configDirectory])
+            return cached, loader.resolvedTable().hash() == expected.resolvedTable().hash()
+
+        with mock.patch.dict(os.environ, {'BVER_LAYER_CACHE_DIR': layerCacheDirectory, 'BVER_LAST_GOOD_DIR': os.path.join(directory, 'lastGood')}):
+            # without a published manifest the cache is not used
+            self.assertListEqual([cachedLoad(), cachedLoad()], [(False, True), (False, True)])
+            self.assertFalse(os.path.exists(layerCacheDirectory))
+
+            Mirror.writeManifest(configDirectory)
+            self.assertListEqual([cachedLoad(), cachedLoad()], [(False, True), (True, True)])
+            self.assertFalse(os.path.exists(os.path.join(directory, 'lastGood')))
+
+            # changes are only picked up once they are published
+            with open(os.path.join(configDirectory, 'split.versions', '2.0.json'), 'w') as f:
+                json.dump({'options': {'foo': 22}}, f)
+            self.assertListEqual([cachedLoad()], [(True, False)])
+
+            Mirror.writeManifest(configDirectory)
+            self.assertListEqual([cachedLoad(), cachedLoad()], [(False, True), (True, True)])
+
+            # the files are not visited while the manifest is unchanged
+            with mock.patch.object(JsonLoader, 'jsonFiles', side_effect=AssertionError):
+                self.assertTrue(JsonLoader().addFromCachedJsonPaths([configDirectory]))
+
+    def test_addingJsonPathsWithinBudget(self):
+        """Should use the last known-good snapshot when the load exceeds the budget."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        shutil.copy(os.path.join(self.__jsonDirectory, 'simple.json'), directory)
+
+        with mock.patch.dict(os.environ, {'BVER_LAST_GOOD_DIR': os.path.join(directory, 'lastGood')}):
+            # without a snapshot it waits for the load
+            loader = JsonLoader()
+            self.assertFalse(loader.addFromJsonPathsWithinBudget([directory], 0))
+            self.assertTrue(loader.waitRevalidation())
+            expectedEnv = Query(loader.softwares()).toEnv()
+
+            # simulating a slow file server
+            with open(os.path.join(directory, 'simple.json'), 'w') as f:
+                json.dump({'a': '2.0.0'}, f)
+
+            release = threading.Event()
+            addFromJsonPaths = JsonLoader.addFromJsonPaths
+
+            def slowAddFromJsonPaths(*args, **kwargs):
+                release.wait()
+                addFromJsonPaths(*args, **kwargs)
+
+            with mock.patch.object(JsonLoader, 'addFromJsonPaths', slowAddFromJsonPaths):
+                loader = JsonLoader()
+                self.assertTrue(loader.addFromJsonPathsWithinBudget([directory], 0.01))
+                self.assertDictEqual(Query(loader.softwares()).toEnv(), expectedEnv)
+                self.assertFalse(loader.waitRevalidation(0.01))
+
+                # revalidating the snapshot in the background
+                release.set()
+                self.assertTrue(loader.waitRevalidation())
+
+            # the background load needs to finish before removing the directory
+            blocked = threading.Event()
+            loader = JsonLoader()
+            self.addCleanup(loader.waitRevalidation)
+            self.addCleanup(blocked.set)
+            with mock.patch.object(JsonLoader, 'addFromJsonPaths', lambda *args, **kwargs: blocked.wait()):
+                self.assertTrue(loader.addFromJsonPathsWithinBudget([directory], 0.01))
+            self.assertDictEqual(Query(loader.softwares()).toEnv(), {'BVER_A_VERSION': '2.0.0'})
+
+    def test_addingInvalidJsonPathsWithinBudget(self):
+        """Should use the last known-good snapshot when the load fails."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        shutil.copy(os.path.join(self.__jsonDirectory, 'simple.json'), directory)
+
+        with mock.patch.dict(os.environ, {'BVER_LAST_GOOD_DIR': os.path.join(directory, 'lastGood')}):
+            loader = JsonLoader()
+            self.assertFalse(loader.addFromJsonPathsWithinBudget([directory], 0))
+            expectedEnv = Query(loader.softwares()).toEnv()
+
+            # simulating a file read while being published
+            with open(os.path.join(directory, 'simple.json'), 'w') as f:
+                f.write('{"a": ')
+
+            loader = JsonLoader()
+            self.assertTrue(loader.addFromJsonPathsWithinBudget([directory], 1))
+            self.assertDictEqual(Query(loader.softwares()).toEnv(), expectedEnv)
+
+            success = False
+            try:
+                loader.waitRevalidation()
+            except ValueError:
+                success = True
+
+            self.assertTrue(success)
+
+        # without a snapshot the error is raised right away
+        with mock.patch.dict(os.environ, {'BVER_LAST_GOOD_DIR': os.path.join(directory, 'otherLastGood')}):
+            success = False
+            try:
+                JsonLoader().addFromJsonPathsWithinBudget([directory], 1)
+            except ValueError:
+                success = True
+
+            self.assertTrue(success)
+
+    def test_lastGoodSnapshots(self):
+        """Should keep the last known-good snapshots per env versions in a private directory."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'versions.json'), 'w') as f:
+            json.dump({'c': {'active': '2.0.0', 'versions': {'1.0.0': {}, '2.0.0': {}}}}, f)
+        lastGoodDirectory = os.path.join(directory, 'lastGood')
+
+        class CustomLoader(JsonLoader):
+            pass
+
+        jsonBackend = JsonBackend.backend('json')
+        with mock.patch.dict(os.environ, {'BVER_LAST_GOOD_DIR': lastGoodDirectory}):
+            env = {'BVER_C_VERSION': '1.0.0'}
+            loader = CustomLoader(jsonBackend)
+            addFromJsonPaths = JsonLoader.addFromJsonPaths
+            loaders = []
+
+            def trackedAddFromJsonPaths(loader, *args, **kwargs):
+                loaders.append(loader)
+                addFromJsonPaths(loader, *args, **kwargs)
+
+            with mock.patch.object(JsonLoader, 'addFromJsonPaths', trackedAddFromJsonPaths):
+                self.assertFalse(loader.addFromJsonPathsWithinBudget([directory], 0, env))
+            self.assertIsInstance(loaders[0], CustomLoader)
+            self.assertIs(loaders[0].jsonBackend(), jsonBackend)
+            self.assertEqual(stat.S_IMODE(os.stat(lastGoodDirectory).st_mode) & 0o077, 0)
+
+            # snapshots pinned by another env are not used
+            blocked = threading.Event()
+            self.addCleanup(blocked.set)
+            with mock.patch.object(JsonLoader, 'addFromJsonPaths', lambda *args, **kwargs: blocked.wait()):
+                loader = JsonLoader()
+                self.addCleanup(loader.waitRevalidation)
+                self.assertTrue(loader.addFromJsonPathsWithinBudget([directory], 0.01, env))
+                self.assertEqual(Query(loader.softwares()).softwareByName('c').version(), '1.0.0')
+
+                otherLoader = JsonLoader()
+                self.addCleanup(otherLoader.waitRevalidation)
+                thread = threading.Thread(target=otherLoader.addFromJsonPathsWithinBudget, args=([directory], 0.01, {}))
+                thread.start()
+                thread.join(0.5)
+                self.assertTrue(thread.is_alive())
+                blocked.set()
+                thread.join()
+
+            # snapshots are not served from directories writable by others
+            os.chmod(lastGoodDirectory, 0o777)
+            self.addCleanup(os.chmod, lastGoodDirectory, 0o700)
+            with mock.patch.object(JsonLoader, 'addFromJsonPaths', lambda *args, **kwargs: None):
+                loader = JsonLoader()
+                self.assertFalse(loader.addFromJsonPathsWithinBudget([directory], 0.01, env))
+                self.assertListEqual(loader.softwares(), [])
+
+    def test_addingJsonPathsOnly(self):
+        """Should only load the files required by the softwares."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for name in os.listdir(self.__jsonDirectory):
+            shutil.copy(os.path.join(self.__jsonDirectory, name), directory)
+        shutil.copytree(
+            os.path.join(self.__jsonSplitVersionsDirectory, 'activeVersion.versions'),
+            os.path.join(directory, 'activeVersion.versions')
+        )
+
+        fullEnv = Query(self.__loadPaths([directory]).softwares()).toEnv()
+        for names in [['e'], ['f'], ['activeVersion'], ['a', 'e']]:
+            loader = JsonLoader()
+            loader.addFromJsonPathsOnly([directory], names)
+
+            table = loader.resolvedTable().filter(names)
+            self.assertDictEqual(
+                table.toEnv(),
+                dict(filter(lambda x: x[0] in table.toEnv(), fullEnv.items()))
+            )
+            self.assertListEqual(sorted(table.names()), sorted(names))
+
+        # only the file defining the software is loaded (loads do not write the index)
+        loader = JsonLoader()
+        loader.addFromJsonPathsOnly([directory], ['a'])
+        self.assertListEqual(sorted(loader.softwareNames()), ['a', 'b'])
+        self.assertFalse(os.path.exists(os.path.join(directory, JsonLoader.indexName)))
+
+        # outdated entries of the published index are rebuilt in memory
+        JsonLoader().writeIndex([directory])
+        with open(os.path.join(directory, JsonLoader.indexName)) as f:
+            index = f.read()
+
+        with open(os.path.join(directory, 'simple.json'), 'w') as f:
+            json.dump({'a': {'version': '2.0.0', 'addons': {'c': {}}}}, f)
+
+        loader = JsonLoader()
+        loader.addFromJsonPathsOnly([directory], ['a'])
+        self.assertListEqual(sorted(loader.softwareNames()), ['a', 'c', 'd', 'e'])
+        with open(os.path.join(directory, JsonLoader.indexName)) as f:
+            self.assertEqual(f.read(), index)
+
+    def test_writeIndex(self):
+        """Should write the index of the directories."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        shutil.copy(os.path.join(self.__jsonDirectory, 'complex.json'), directory)
+
+        JsonLoader().writeIndex([directory])
+        with open(os.path.join(directory, JsonLoader.indexName)) as f:
+            index = json.load(f)
+
+        self.assertDictEqual(
+            index['files']['complex.json']['softwares'],
+            {'c': [], 'd': [], 'e': ['c', 'd']}
+        )
+
+        # entries of removed files are pruned
+        shutil.copy(os.path.join(self.__jsonDirectory, 'simple.json'), directory)
+        JsonLoader().writeIndex([directory])
+        os.remove(os.path.join(directory, 'complex.json'))
+        JsonLoader().writeIndex([directory])
+        with open(os.path.join(directory, JsonLoader.indexName)) as f:
+            index = json.load(f)
+
+        self.assertListEqual(list(index['files'].keys()), ['simple.json'])
+
+    def test_mergeOrder(self):
+        """Should merge the files by key following their precedence."""
+        layers = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for layer in layers:
+            self.addCleanup(shutil.rmtree, layer)
+
+        contents = [
+            (layers[0], 'b.json', {'a': {'version': '1.0.0', 'addons': {'c': {'options': {'x': 1}}, 'd': {}}}, 'c': '1.0.0', 'd': '1.0.0'}),
+            (layers[0], 'a.json', {'a': '2.0.0', 'e': {'active': '1.0.0', 'versions': {'1.0.0': {}}}}),
+            (layers[1], 'a.json', {'a': {'version': '3.0.0', 'addons': {'c': {'options': {'x': 2}}}}, 'e': {'active': '2.0.0', 'versions': {'2.0.0': {}}}})
+        ]
+        for directory, fileName, data in contents:
+            with open(os.path.join(directory, fileName), 'w') as f:
+                json.dump(data, f)
+
+        loader = self.__loadPaths(layers)
+        softwares = dict((x.name(), x) for x in loader.softwares())
+        self.assertEqual(softwares['a'].version(), '3.0.0')
+        self.assertEqual(softwares['e'].version(), '2.0.0')
+        self.assertEqual(softwares['a'].addon('c').option('x'), 2)
+        self.assertListEqual(sorted(softwares['a'].addonNames()), ['c', 'd'])
+
+        self.assertListEqual(
+            loader.conflicts(),
+            [
+                MergeConflict('a', None, os.path.join(layers[1], 'a.json'), (os.path.join(layers[0], 'b.json'), os.path.join(layers[0], 'a.json'))),
+                MergeConflict('a', 'c', os.path.join(layers[1], 'a.json'), (os.path.join(layers[0], 'b.json'),)),
+                MergeConflict('e', None, os.path.join(layers[1], 'a.json'), (os.path.join(layers[0], 'a.json'),))
+            ]
+        )
+        self.assertEqual(
+            str(loader.conflicts()[1]),
+            'a/c: {0} shadows {1}'.format(os.path.join(layers[1], 'a.json'), os.path.join(layers[0], 'b.json'))
+        )
+
+        # definitions without configuration for the version from the env are skipped
+        loader = JsonLoader()
+        loader.addFromJsonPaths(layers, {'BVER_E_VERSION': '1.0.0'})
+        softwares = dict((x.name(), x) for x in loader.softwares())
+        self.assertEqual(softwares['e'].version(), '1.0.0')
+        self.assertNotIn('e', [x.softwareName for x in loader.conflicts()])
+
+        # the layer order defines the precedence
+        loader = self.__loadPaths(list(reversed(layers)))
+        softwares = dict((x.name(), x) for x in loader.softwares())
+        self.assertEqual(softwares['a'].version(), '1.0.0')
+        self.assertEqual(softwares['a'].addon('c').option('x'), 1)
+
+    def __loadPaths(self, paths):
+        """
+        Return a json loader with the paths loaded.
+
+        @private
+        """
+        loader = JsonLoader()
+        loader.addFromJsonPaths(paths)
+
+        return loader
@@ -1,3 +1,5 @@
+import json
+import threading
 from bver.Loader import Loader, AddonNotFoundError
 from .CommonLoader import CommonLoader
 
@@ -113,6 +115,17 @@ class TestLoader(CommonLoader):
         # checking addons
         self.checkAddonsInfo(softwareInfos, softwares)
 
+    def test_names(self):
+        """Should return the names of the added softwares and addons."""
+        loader = Loader()
+        loader.addSoftwareInfo('a', '1.0')
+        loader.addSoftwareInfo('b', '1.0')
+        loader.addAddonInfo('a', 'b')
+
+        self.assertListEqual(loader.softwareNames(), ['a', 'b'])
+        self.assertListEqual(loader.addonNames('a'), ['b'])
+        self.assertListEqual(loader.addonNames('b'), [])
+
     def test_addonNotFound(self):
         """Should fail when addon is not declared as software."""
         loader = Loader()
@@ -213,3 +226,232 @@ class TestLoader(CommonLoader):
 
         # checking addons
         self.checkAddonsInfo(softwareInfosFinal, softwares)
+
+    def test_overlay(self):
+        """Should resolve the overlay information on top of the base."""
+        base = Loader()
+        base.addSoftwareInfo('a', '1.0', {'foo': 1})
+        base.addSoftwareInfo('b', '1.0')
+        base.addAddonInfo('a', 'b', {'enabled': False})
+
+        overlay = base.overlay()
+        overlay.addSoftwareInfo('b', '2.0')
+        overlay.addSoftwareInfo('c', '1.0')
+        overlay.addAddonInfo('a', 'c')
+
+        self.assertIsInstance(overlay, Loader)
+        self.assertListEqual(overlay.softwareNames(), ['a', 'b', 'c'])
+        self.assertListEqual(sorted(overlay.addonNames('a')), ['b', 'c'])
+
+        softwares = overlay.softwares()
+        self.assertEqual(softwares[0].option('foo'), 1)
+        self.assertEqual(softwares[0].addon('b').version(), '2.0')
+        self.assertEqual(softwares[0].addon('b').option('enabled'), False)
+        self.assertEqual(softwares[1].version(), '2.0')
+
+        # the base should not be affected by the overlay
+        self.assertListEqual(base.softwareNames(), ['a', 'b'])
+        self.assertListEqual(base.addonNames('a'), ['b'])
+        self.assertEqual(base.softwares()[1].version(), '1.0')
+
+    def test_overlayBasePrecedence(self):
+        """Should only add the information not defined by the base."""
+        base = Loader()
+        base.addSoftwareInfo('a', '1.0', {'foo': 1})
+        base.addSoftwareInfo('b', '1.0')
+        base.addAddonInfo('a', 'b', {'enabled': False})
+
+        overlay = base.overlay(basePrecedence=True)
+        overlay.addSoftwareInfo('b', '2.0')
+        overlay.addSoftwareInfo('c', '1.0')
+        overlay.addAddonInfo('a', 'b', {'enabled': True})
+        overlay.addAddonInfo('a', 'c')
+
+        self.assertListEqual(sorted(overlay.softwareNames()), ['a', 'b', 'c'])
+        self.assertListEqual(sorted(overlay.addonNames('a')), ['b', 'c'])
+
+        softwares = dict((x.name(), x) for x in overlay.softwares())
+        self.assertEqual(softwares['b'].version(), '1.0')
+        self.assertEqual(softwares['a'].addon('b').option('enabled'), False)
+        self.assertEqual(softwares['a'].addon('c').version(), '1.0')
+
+    def test_overlaySnapshot(self):
+        """Should not expose changes done to the base after creating the overlay."""
+        base = Loader()
+        base.addSoftwareInfo('a', '1.0')
+
+        overlay = base.overlay()
+        base.addSoftwareInfo('a', '2.0')
+        base.addSoftwareInfo('b', '1.0')
+        base.addAddonInfo('a', 'b')
+
+        self.assertListEqual(overlay.softwareNames(), ['a'])
+        self.assertListEqual(overlay.addonNames('a'), [])
+        self.assertEqual(overlay.softwares()[0].version(), '1.0')
+
+        # nested overlays
+        nested = base.overlay().overlay()
+        nested.addAddonInfo('a', 'c')
+        nested.addSoftwareInfo('c', '1.0')
+        self.assertListEqual(nested.softwareNames(), ['a', 'b', 'c'])
+        self.assertListEqual(nested.addonNames('a'), ['b', 'c'])
+
+    def test_infoData(self):
+        """Should add back the information returned as info data."""
+        loader = Loader()
+        loader.addSoftwareInfo('a', '1.0.0', {'foo': 1})
+        loader.addSoftwareInfo('b', '2.0.0')
+        loader.addAddonInfo('b', 'a', {'enabled': False})
+
+        overlay = loader.overlay()
+        overlay.addSoftwareInfo('c', '3.0.0')
+
+        infoData = json.loads(json.dumps(overlay.infoData()))
+        self.assertListEqual(sorted(infoData['softwares'].keys()), ['a', 'b', 'c'])
+        self.assertListEqual(list(infoData['addons'].keys()), ['b'])
+
+        otherLoader = Loader()
+        otherLoader.addFromInfoData(infoData)
+        self.assertEqual(
+            otherLoader.resolvedTable().hash(),
+            overlay.resolvedTable().hash()
+        )
+
+    def test_serialize(self):
+        """Should add back the serialized resolution."""
+        loader = Loader()
+        loader.addSoftwareInfo('a', '1.0.0', {'foo': 1})
+        loader.addSoftwareInfo('b', '2.0.0')
+        loader.addSoftwareInfo('c', '3.0.0')
+        loader.addAddonInfo('b', 'a', {'enabled': False})
+        loader.addAddonInfo('c', 'a', {'version': '0.1.0'})
+
+        otherLoader = Loader()
+        otherLoader.addFromSerialized(loader.serialize())
+        self.assertEqual(otherLoader.fingerprint(), loader.fingerprint())
+
+        # the resolved addon versions are kept
+        env = {'BVER_A_VERSION': '1.5.0'}
+        otherLoader = Loader()
+        otherLoader.addFromSerialized(loader.serialize(env))
+        self.assertDictEqual(
+            otherLoader.resolvedTable().toEnv(),
+            loader.resolvedTable(env).toEnv()
+        )
+
+    def test_batch(self):
+        """Should only publish the changes done inside of a batch once it exits."""
+        loader = Loader()
+        loader.addSoftwareInfo('a', '1.0')
+
+        with loader.batch():
+            loader.addSoftwareInfo('b', '1.0')
+            with loader.batch():
+                loader.addAddonInfo('a', 'b')
+
+            self.assertListEqual(loader.softwareNames(), ['a'])
+            self.assertListEqual(loader.addonNames('a'), [])
+
+        self.assertListEqual(loader.softwareNames(), ['a', 'b'])
+        self.assertListEqual(loader.addonNames('a'), ['b'])
+
+    def test_batchError(self):
+        """Should discard the changes done inside of a batch that failed."""
+        loader = Loader()
+        loader.addSoftwareInfo('a', '1.0')
+
+        success = False
+        try:
+            with loader.batch():
+                loader.addSoftwareInfo('b', '1.0')
+                raise ValueError('failed')
+        except ValueError:
+            success = True
+
+        self.assertTrue(success)
+        self.assertListEqual(loader.softwareNames(), ['a'])
+
+    def test_concurrentReaders(self):
+        """Should always return a consistent state while another thread is loading."""
+        loader = Loader()
+        errors = []
+
+        def load():
+            for index in range(200):
+                with loader.batch():
+                    for name in ['a', 'b', 'c']:
+                        loader.addSoftwareInfo(name, str(index))
+                    loader.addAddonInfo('a', 'b')
+
+        def read():
+            for index in range(200):
+                try:
+                    versions = set(map(lambda x: x.version(), loader.softwares()))
+                    if len(versions) > 1:
+                        errors.append(versions)
+                except Exception as err:
+                    errors.append(err)
+
+        threads = [threading.Thread(target=load)] + [threading.Thread(target=read) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual(errors, [])
+
+    def test_fingerprint(self):
+        """Should return a stable content hash of the resolution."""
+        loader = Loader()
+        loader.addSoftwareInfo('a', '1.0.0', {'foo': 1})
+        loader.addSoftwareInfo('b', '2.0.0')
+        loader.addSoftwareInfo('c', '3.0.0')
+        loader.addAddonInfo('b', 'a', {'enabled': False})
+        loader.addAddonInfo('c', 'a', {'version': '0.1.0'})
+
+        fingerprint = loader.fingerprint()
+        self.assertEqual(len(fingerprint), 64)
+        self.assertEqual(fingerprint, loader.resolvedTable().hash())
+
+        # independent of the order the information was added
+        otherLoader = Loader()
+        otherLoader.addSoftwareInfo('c', '3.0.0')
+        otherLoader.addAddonInfo('c', 'a', {'version': '0.1.0'})
+        otherLoader.addSoftwareInfo('b', '2.0.0')
+        otherLoader.addAddonInfo('b', 'a', {'enabled': False})
+        otherLoader.addSoftwareInfo('a', '1.0.0', {'foo': 1})
+        self.assertEqual(otherLoader.fingerprint(), fingerprint)
+
+        # overrides
+        env = {'BVER_A_VERSION': '1.5.0', 'BVER_UNKNOWN_VERSION': '1.0.0'}
+        self.assertEqual(loader.fingerprint(env), loader.resolvedTable(env).hash())
+        self.assertEqual(loader.fingerprint({'BVER_A_VERSION': '1.0.0'}), fingerprint)
+        self.assertEqual(loader.fingerprint(), fingerprint)
+
+        # incremental changes (including the dependents of a change)
+        for step in range(3):
+            with loader.batch():
+                loader.addSoftwareInfo('a', '1.{0}.0'.format(step + 1))
+                loader.addSoftwareInfo('d', '4.{0}.0'.format(step))
+            loader.addAddonInfo('d', 'b')
+
+            self.assertEqual(loader.fingerprint(), loader.resolvedTable().hash())
+            self.assertEqual(loader.fingerprint(env), loader.resolvedTable(env).hash())
+
+        self.assertNotEqual(loader.fingerprint(), fingerprint)
+
+        # overlays
+        overlay = loader.overlay()
+        overlay.addSoftwareInfo('b', '2.1.0')
+        self.assertEqual(overlay.fingerprint(), overlay.resolvedTable().hash())
+
+        # addon not found
+        loader.addAddonInfo('a', 'unknown')
+
+        success = False
+        try:
+            loader.fingerprint()
+        except AddonNotFoundError:
+            success = True
+
+        self.assertTrue(success)
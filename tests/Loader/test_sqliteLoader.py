@@ -0,0 +1,318 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+from bver import Query, JsonBackend
+from bver.Loader import \
+    JsonLoader, \
+    SqliteLoader, \
+    AddonNotFoundError, \
+    UnexpectedVersionFormatError, \
+    SoftwareNotFoundError
+from .CommonLoader import CommonLoader
+
+class TestSqliteLoader(CommonLoader):
+    """Test sqlite loader object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+    __jsonSplitVersionsDirectory = os.path.join(__rootPath, 'data', 'jsonSplitVersions')
+
+    def setUp(self):
+        """Create a temporary directory for the databases."""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_constructor(self):
+        """Should test the constructor."""
+        databasePath = os.path.join(self.directory, 'bver.db')
+        loader = self.__loader(databasePath)
+
+        self.assertEqual(loader.databasePath(), databasePath)
+        self.assertEqual(loader.softwares(), [])
+
+    def test_softwareInfo(self):
+        """Should test adding software and addon info to the loader."""
+        loader = self.__loader()
+
+        softwareInfos = {
+            'a': {
+                'version': '10.1',
+                'options': {
+                    'a': 1
+                },
+                'addons': {
+                    'b': {
+                        'options': {
+                            'enabled': False
+                        }
+                    }
+                }
+            },
+            'b': {
+                'version': '12.1',
+                'options': {}
+            }
+        }
+
+        for softwareName, softwareData in softwareInfos.items():
+            loader.addSoftwareInfo(softwareName, softwareData['version'], softwareData['options'])
+
+        loader.addAddonInfo('a', 'b', {'enabled': False})
+
+        softwares = loader.softwares()
+        self.checkSoftwareInfo(softwareInfos, softwares)
+        self.checkAddonsInfo(softwareInfos, softwares)
+        self.assertListEqual(loader.softwareNames(), ['a', 'b'])
+        self.assertListEqual(loader.addonNames('a'), ['b'])
+
+    def test_overlay(self):
+        """Should layer an overlay on top of the active versions in the database."""
+        loader = self.__loader()
+        loader.addSoftwareInfo('a', '1.0')
+        loader.addSoftwareInfo('b', '1.0')
+        loader.addAddonInfo('a', 'b')
+
+        overlay = loader.overlay()
+        overlay.addSoftwareInfo('b', '2.0')
+        loader.addSoftwareInfo('a', '3.0')
+
+        softwares = overlay.softwares()
+        self.assertListEqual([x.version() for x in softwares], ['1.0', '2.0'])
+        self.assertEqual(softwares[0].addon('b').version(), '2.0')
+
+    def test_importFromJsonPaths(self):
+        """Should resolve the imported json files the same way as the json loader."""
+        loader = self.__loader()
+        loader.importFromJsonPaths([self.__jsonDirectory])
+
+        jsonLoader = JsonLoader()
+        jsonLoader.addFromJsonPaths([self.__jsonDirectory])
+
+        self.assertDictEqual(
+            Query(loader.softwares()).toEnv(),
+            Query(jsonLoader.softwares()).toEnv()
+        )
+        self.assertListEqual(loader.versions('activeVersion'), ['17.5.391', '16.4.200'])
+        self.assertEqual(loader.resolvedTable().hash(), jsonLoader.resolvedTable().hash())
+        self.assertEqual(loader.fingerprint(), jsonLoader.fingerprint())
+
+    def test_importSplitVersions(self):
+        """Should import the versions split per file."""
+        loader = self.__loader()
+        loader.importFromJsonPaths([self.__jsonSplitVersionsDirectory])
+
+        self.assertListEqual(sorted(loader.versions('activeVersion')), ['16.4.200', '17.5.391'])
+        self.assertEqual(loader.software('activeVersion').version(), '17.5.391')
+        self.assertListEqual(loader.software('activeVersion').availableVersions(), ['16.4.200', '17.5.391'])
+        self.assertListEqual(loader.resolvedTable().availableVersions('activeVersion'), ['16.4.200', '17.5.391'])
+
+    def test_importInvalidVersions(self):
+        """Should fail to import versions referring to files outside of the json directory."""
+        for softwareContents in [
+                {'active': '1.0', 'versions': '../a.versions'},
+                {'active': '1.0', 'versions': 'a'},
+                {'active': '1.0', 'versions': {'1.0': []}},
+                {'active': '1.0', 'versions': {'1.0': {'addons': []}}}]:
+            jsonFile = os.path.join(self.directory, 'a.json')
+            with open(jsonFile, 'w') as f:
+                json.dump({'a': softwareContents}, f)
+
+            loader = self.__loader()
+            success = False
+            try:
+                loader.importFromJsonPaths([jsonFile])
+            except UnexpectedVersionFormatError:
+                success = True
+
+            self.assertTrue(success)
+            self.assertListEqual(loader.softwareNames(), [])
+
+    def test_addonWithoutSoftware(self):
+        """Should fail to add an addon to a software that has not been added."""
+        loader = self.__loader()
+
+        success = False
+        try:
+            loader.addAddonInfo('a', 'b')
+        except SoftwareNotFoundError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_batch(self):
+        """Should group the changes into a single transaction."""
+        loader = self.__loader()
+        loader.addFromInfoData({
+            'softwares': {
+                'a': {'version': '1.0', 'options': {'x': 1}, 'availableVersions': ['0.9']}
+            },
+            'addons': {
+                'a': {'b': {'options': {'enabled': True}}}
+            }
+        })
+
+        infoData = loader.infoData()
+        self.assertEqual(infoData['softwares']['a']['version'], '1.0')
+        self.assertEqual(infoData['softwares']['a']['options'], {'x': 1})
+        self.assertListEqual(sorted(infoData['softwares']['a']['availableVersions']), ['0.9', '1.0'])
+        self.assertEqual(infoData['addons']['a']['b']['options'], {'enabled': True})
+
+        success = False
+        try:
+            with loader.batch():
+                loader.addSoftwareInfo('c', '1.0')
+                loader.addAddonInfo('d', 'e')
+        except SoftwareNotFoundError:
+            success = True
+
+        self.assertTrue(success)
+        self.assertListEqual(loader.softwareNames(), ['a'])
+
+    def test_jsonBackend(self):
+        """Should decode the imported json files through the json backend."""
+        decodedFiles = []
+
+        class TrackedBackend(JsonBackend.JsonBackend):
+            def loadFile(self, filePath):
+                decodedFiles.append(os.path.basename(filePath))
+                return super(TrackedBackend, self).loadFile(filePath)
+
+        jsonBackend = TrackedBackend()
+        loader = SqliteLoader(os.path.join(self.directory, 'bver.db'), jsonBackend)
+        self.addCleanup(loader.close)
+        self.assertIs(loader.jsonBackend(), jsonBackend)
+
+        loader.importFromJsonPaths([self.__jsonSplitVersionsDirectory])
+        self.assertListEqual(sorted(decodedFiles), ['16.4.200.json', '17.5.391.json', 'activeVersion.json'])
+
+    def test_exportToJson(self):
+        """Should export the database back to the json format."""
+        loader = self.__loader()
+        loader.importFromJsonPaths([self.__jsonDirectory])
+
+        jsonFile = os.path.join(self.directory, 'export.json')
+        loader.exportToJsonFile(jsonFile)
+
+        expected = {}
+        for jsonFileName in JsonLoader.jsonFiles([self.__jsonDirectory]):
+            with open(jsonFileName) as f:
+                expected.update(json.load(f))
+
+        with open(jsonFile) as f:
+            self.assertDictEqual(json.load(f), expected)
+
+    def test_software(self):
+        """Should return a single software including its addons."""
+        loader = self.__loader()
+        loader.importFromJsonPaths([self.__jsonDirectory])
+
+        software = loader.software('e', {'BVER_C_VERSION': '2.0'})
+        self.assertEqual(software.version(), '1.2.5')
+        self.assertEqual(software.option('foo'), 10)
+        self.assertEqual(software.addon('c').version(), '2.0')
+        self.assertEqual(software.addon('d').option('enabled'), False)
+
+        success = False
+        try:
+            loader.software('missing')
+        except SoftwareNotFoundError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_addonNotFound(self):
+        """Should fail when addon is not declared as software."""
+        loader = self.__loader()
+        loader.addSoftwareInfo('a', '1.0')
+        loader.addAddonInfo('a', 'missing')
+
+        success = False
+        try:
+            loader.softwares()
+        except AddonNotFoundError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_bump(self):
+        """Should assign the versions in a single transaction."""
+        databasePath = os.path.join(self.directory, 'bver.db')
+        loader = self.__loader(databasePath)
+        loader.importFromJsonPaths([self.__jsonDirectory])
+
+        self.assertTrue(loader.bump({'activeVersion': '18.0.0', 'a': '2.0.0', 'new': '0.1.0'}))
+        self.assertFalse(loader.bump({'a': '2.0.0'}))
+        self.assertTrue(loader.bump({'b': '3.0.0'}, activateVersion=False))
+
+        # reading from another connection
+        reader = self.__loader(databasePath)
+        query = Query(reader.softwares())
+        self.assertEqual(query.softwareByName('activeVersion').version(), '18.0.0')
+        self.assertEqual(query.softwareByName('activeVersion').addon('kombi').option('enabled'), True)
+        self.assertEqual(query.softwareByName('a').version(), '2.0.0')
+        self.assertEqual(query.softwareByName('b').version(), '1.1.0')
+        self.assertEqual(query.softwareByName('new').version(), '0.1.0')
+        self.assertIn('3.0.0', reader.versions('b'))
+
+    def test_bumpRollback(self):
+        """Should not apply any change when the bump fails."""
+        loader = self.__loader()
+        loader.addSoftwareInfo('a', '1.0')
+
+        success = False
+        try:
+            loader.bump({'a': '2.0', 'b': None})
+        except Exception:
+            success = True
+
+        self.assertTrue(success)
+        self.assertListEqual(loader.versions('a'), ['1.0'])
+
+    def test_threads(self):
+        """Should run concurrent reads and writes from multiple threads."""
+        loader = self.__loader()
+        loader.importFromJsonPaths([self.__jsonDirectory])
+
+        errors = []
+        mismatches = []
+        done = threading.Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    softwares = dict((x.name(), x.version()) for x in loader.softwares())
+                    if softwares['a'] != softwares['b']:
+                        mismatches.append(softwares)
+                    loader.software('a')
+            except Exception as err:
+                errors.append(err)
+
+        def write():
+            try:
+                for index in range(30):
+                    loader.bump({'a': '5.{0}'.format(index), 'b': '5.{0}'.format(index)})
+            except Exception as err:
+                errors.append(err)
+            finally:
+                done.set()
+
+        loader.bump({'a': '5.0', 'b': '5.0'})
+        threads = [threading.Thread(target=read) for _ in range(4)] + [threading.Thread(target=write)]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual(errors, [])
+        self.assertListEqual(mismatches, [])
+        self.assertEqual(Query(loader.softwares()).softwareByName('a').version(), '5.29')
+
+    def __loader(self, databasePath=None):
+        """Return a sqlite loader closed at the end of the test."""
+        loader = SqliteLoader(databasePath or os.path.join(self.directory, 'bver.db'))
+        self.addCleanup(loader.close)
+
+        return loader
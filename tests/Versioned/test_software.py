@@ -19,6 +19,15 @@ class TestSoftware(unittest.TestCase):
 
         self.assertEqual(len(software.optionNames()), 0)
 
+    def test_availableVersions(self):
+        """Should return the available versions sorted."""
+        software = Software("foo", "1.10.0")
+        self.assertListEqual(software.availableVersions(), ["1.10.0"])
+
+        software.setAvailableVersions(["1.10.0", "1.9.0", "1.10.0-rc1", "1.9.0"])
+        self.assertListEqual(software.availableVersions(), ["1.9.0", "1.10.0-rc1", "1.10.0"])
+        self.assertEqual(software.parsedVersion(), "1.10.0")
+
     def test_addons(self):
         """Should add addons to the software."""
         software = Software("foo", "1.1")
@@ -0,0 +1,42 @@
+import unittest
+from bver.Versioned import Version, InvalidVersionError
+
+class TestVersion(unittest.TestCase):
+    """Test version object."""
+
+    def test_constructor(self):
+        """Should accept any non empty string."""
+        for text in ['1.0.0', '17.5.391', 'v2', '2019_r3', 'latest', '1.0.0-rc1+build.5']:
+            self.assertEqual(str(Version(text)), text)
+
+        for text in ['', None, 1]:
+            success = False
+            try:
+                Version(text)
+            except InvalidVersionError:
+                success = True
+
+            self.assertTrue(success)
+
+    def test_ordering(self):
+        """Should compare the versions by their numeric and alphabetic parts."""
+        versions = ['0.9', '2.9', '2.10', '16.4.200', '17.0.0-alpha', '17.0.0-beta2', '17.0.0-beta10', '17.0.0', 'v17.1', '2019_r3']
+
+        self.assertListEqual(sorted(reversed(versions), key=lambda x: Version(x).key()), versions)
+        self.assertLess(Version('2.9'), Version('2.10'))
+        self.assertGreater(Version('17.0.0'), '17.0.0-rc1')
+        self.assertEqual(Version('1.0.0+build1'), Version('1.0.0+build2'))
+        self.assertEqual(Version('v1.0'), '1.0')
+        self.assertNotEqual(Version('1.0'), Version('1.0.0'))
+        self.assertNotEqual(Version('1.0'), 1.0)
+
+    def test_parse(self):
+        """Should cache the parsed versions."""
+        self.assertIs(Version.parse('1.2.3'), Version.parse('1.2.3'))
+        self.assertEqual(len(set([Version.parse('1.2.3'), Version('1.2.3')])), 1)
+
+    def test_semver(self):
+        """Should return the semantic version parts of plain versions."""
+        self.assertEqual(Version('1.2.30').semver(), (1, 2, 30))
+        self.assertIsNone(Version('1.2').semver())
+        self.assertIsNone(Version('1.2.3-rc1').semver())
@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from bver import Mirror
+from bver.Loader import JsonLoader
+
+class TestBinstall(unittest.TestCase):
+    """Test the manifest written by binstall."""
+
+    __rootPath = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    __binstallFilePath = os.path.join(__rootPath, 'binstall')
+    __bversyncFilePath = os.path.join(__rootPath, 'src', 'bin', 'bversync')
+    __jsonSplitVersionsDirectory = os.path.join(__rootPath, 'data', 'jsonSplitVersions')
+
+    def setUp(self):
+        """Create a temporary publish directory with stubbed build commands."""
+        temporaryDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temporaryDirectory)
+
+        self.publishDirectory = os.path.join(temporaryDirectory, 'publish')
+        self.versionsDirectory = os.path.join(self.publishDirectory, 'src', 'versions')
+        shutil.copytree(self.__jsonSplitVersionsDirectory, self.versionsDirectory)
+
+        with open(os.path.join(self.publishDirectory, 'info.json'), 'w') as f:
+            json.dump({'name': 'bver-config', 'type': 'config', 'version': '1.0.0'}, f)
+
+        self.binDirectory = os.path.join(temporaryDirectory, 'bin')
+        os.mkdir(self.binDirectory)
+        self.writeCommand('cmake', 'exit 0')
+
+        self.env = dict(
+            os.environ,
+            PATH=os.pathsep.join([self.binDirectory, '/usr/bin', '/bin']),
+            PYTHONPATH=os.path.join(self.__rootPath, 'src', 'lib'),
+            BACKBONE_ROOT=os.path.join(temporaryDirectory, 'root'),
+            BACKBONE_DEV_ROOT=os.path.join(temporaryDirectory, 'dev')
+        )
+
+    def writeCommand(self, name, contents):
+        """Write an executable command available to binstall."""
+        filePath = os.path.join(self.binDirectory, name)
+        with open(filePath, 'w') as f:
+            f.write('#!/bin/bash\n{0}\n'.format(contents))
+        os.chmod(filePath, 0o755)
+
+    def binstall(self, args=(), response=''):
+        """Run binstall on the publish directory."""
+        return subprocess.run(
+            ['bash', self.__binstallFilePath] + list(args),
+            cwd=self.publishDirectory,
+            env=self.env,
+            input=response,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True
+        )
+
+    def test_releaseManualEdit(self):
+        """Should refresh the manifest when releasing manual edits."""
+        self.writeCommand('bversync', 'exec "{0}" "{1}" "$@"'.format(sys.executable, self.__bversyncFilePath))
+        Mirror.writeManifest(self.versionsDirectory)
+
+        filePath = os.path.join(self.versionsDirectory, 'activeVersion.json')
+        with open(filePath, 'a') as f:
+            f.write('\n\n')
+
+        self.assertEqual(self.binstall().returncode, 0)
+
+        fileStat = os.stat(filePath)
+        fileInfo = Mirror.readManifest(self.versionsDirectory)['files']['activeVersion.json']
+        self.assertEqual(fileInfo['sha256'], Mirror.checksum(filePath))
+        self.assertEqual(fileInfo['size'], fileStat.st_size)
+        self.assertEqual(fileInfo['mtime'], fileStat.st_mtime_ns)
+        self.assertTrue(os.path.exists(os.path.join(self.versionsDirectory, JsonLoader.indexName)))
+
+    def test_missingBversync(self):
+        """Should skip the manifest with a warning when bversync is not available."""
+        result = self.binstall()
+
+        self.assertEqual(result.returncode, 0)
+        self.assertIn('Warning, could not find bversync', result.stdout)
+        self.assertFalse(os.path.exists(os.path.join(self.versionsDirectory, JsonLoader.indexName)))
+
+    def test_declinedProductionRelease(self):
+        """Should not write the manifest when the production release is not confirmed."""
+        self.writeCommand('bversync', 'exec "{0}" "{1}" "$@"'.format(sys.executable, self.__bversyncFilePath))
+
+        self.assertEqual(self.binstall(['--production'], 'n\n').returncode, 0)
+        self.assertFalse(os.path.exists(os.path.join(self.versionsDirectory, JsonLoader.indexName)))
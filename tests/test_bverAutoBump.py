@@ -0,0 +1,86 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import importlib.util
+import importlib.machinery
+from unittest import mock
+
+class TestBverAutoBump(unittest.TestCase):
+    """Test bverautobump."""
+
+    __rootPath = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    __autoBumpFilePath = os.path.join(__rootPath, 'src', 'bin', 'bverautobump')
+    __jsonSplitVersionsDirectory = os.path.join(__rootPath, 'data', 'jsonSplitVersions')
+
+    def setUp(self):
+        """Create a temporary publish directory with a stubbed binstall."""
+        temporaryDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temporaryDirectory)
+
+        self.publishDirectory = os.path.join(temporaryDirectory, 'publish')
+        self.versionsDirectory = os.path.join(self.publishDirectory, 'src', 'versions')
+        shutil.copytree(self.__jsonSplitVersionsDirectory, self.versionsDirectory)
+
+        with open(os.path.join(self.publishDirectory, 'binstall'), 'w') as f:
+            f.write('#!/bin/bash\n')
+
+        environ = mock.patch.dict(
+            os.environ,
+            {
+                'BACKBONE_ROOT': temporaryDirectory,
+                'BACKBONE_USER': 'test',
+                'BACKBONE_BASH_EXECUTABLE': shutil.which('bash') or '/bin/bash',
+                'BVER_AUTO_BUMP_BASE_PUBLISH_DIRECTORY': self.publishDirectory
+            }
+        )
+        environ.start()
+        self.addCleanup(environ.stop)
+
+        loader = importlib.machinery.SourceFileLoader('bverautobump', self.__autoBumpFilePath)
+        module = importlib.util.module_from_spec(importlib.util.spec_from_loader('bverautobump', loader))
+        loader.exec_module(module)
+        self.BverAutoBump = module.BverAutoBump
+        self.BverAutoBumpError = module.BverAutoBumpError
+
+    def writeBverVersion(self, version):
+        """Write the info.json of the publish directory."""
+        with open(os.path.join(self.publishDirectory, 'info.json'), 'w') as f:
+            json.dump({'name': 'bver-config', 'type': 'config', 'version': version}, f)
+
+    def readBverVersion(self):
+        """Return the version from the info.json of the publish directory."""
+        with open(os.path.join(self.publishDirectory, 'info.json')) as f:
+            return json.load(f)['version']
+
+    def test_bumpBver(self):
+        """Should bump the patch of the bver version keeping the major and minor text."""
+        for version, bumpedVersion in [('1.0.9', '1.0.10'), ('1.02.003', '1.02.4')]:
+            self.writeBverVersion(version)
+            self.BverAutoBump({}, applyModifications=False)
+            self.assertEqual(self.readBverVersion(), bumpedVersion)
+
+    def test_bumpPrefixedBver(self):
+        """Should bump the patch of a bver version prefixed by "v"."""
+        self.writeBverVersion('v1.0.0')
+        self.BverAutoBump({}, applyModifications=False)
+        self.assertEqual(self.readBverVersion(), 'v1.0.1')
+
+    def test_bumpInvalidBver(self):
+        """Should keep a bver version without a numeric patch."""
+        for version in ['1.0', '1.0.0-rc1', '1.0.0.1']:
+            self.writeBverVersion(version)
+            self.BverAutoBump({}, applyModifications=False)
+            self.assertEqual(self.readBverVersion(), version)
+
+    def test_missingDatabase(self):
+        """Should fail to assign the versions to a database that does not exist."""
+        success = False
+        try:
+            self.BverAutoBump({'a': '1.0.0'}, runRelease=False, database=os.path.join(self.publishDirectory, 'bver.db'))
+        except self.BverAutoBumpError:
+            success = True
+
+        self.assertTrue(success)
+        self.assertFalse(os.path.exists(os.path.join(self.publishDirectory, 'bver.db')))
@@ -0,0 +1,148 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from bver.Checker import Checker, CheckError
+
+class TestChecker(unittest.TestCase):
+    """Test checker object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+
+    def test_constructor(self):
+        """Should test the constructor."""
+        self.assertEqual(Checker(3).processes(), 3)
+        self.assertGreater(Checker().processes(), 0)
+
+    def test_validFiles(self):
+        """Should not report errors for valid files."""
+        self.assertListEqual(Checker(1).check([self.__jsonDirectory]), [])
+
+    def test_reportAllErrors(self):
+        """Should report every error found among the files."""
+        directory = self.__createFiles()
+
+        for processes in [1, 2]:
+            errors = Checker(processes).check([directory])
+
+            self.assertListEqual(
+                list(map(lambda x: (os.path.basename(x.fileName), x.softwareName, x.errorType), errors)),
+                [
+                    ('a.json', 'b', 'UnexpectedVersionFormatError'),
+                    ('a.json', 'c', 'UnexpectedAddonContentError'),
+                    ('a.json', 'e', 'InvalidVersionError'),
+                    ('a.json', 'a', 'AddonNotFoundError'),
+                    ('b.json', None, 'UnexpectedRootContentError'),
+                    ('c.json', None, 'JSONDecodeError'),
+                    ('d.json', 'f', 'UnexpectedAddonsDataError'),
+                    ('d.json', 'g', 'UnexpectedOptionsDataError'),
+                    ('d.json', 'h', 'UnexpectedOptionsDataError')
+                ]
+            )
+
+    def test_missingPath(self):
+        """Should report the paths that could not be found."""
+        missingPath = os.path.join(self.__jsonDirectory, 'missing.json')
+        errors = Checker(1).check([self.__jsonDirectory, missingPath])
+
+        self.assertListEqual(
+            list(map(lambda x: (x.fileName, x.softwareName, x.errorType), errors)),
+            [(missingPath, None, 'InvalidFileError')]
+        )
+
+    def test_inactiveVersions(self):
+        """Should check every version, not only the active one."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with open(os.path.join(directory, 'a.json'), 'w') as f:
+            json.dump({
+                'a': {
+                    'active': '1.0',
+                    'versions': {
+                        '1.0': {'addons': {'b': {}}},
+                        '2.0': {'addons': {'missing': {}}},
+                        '3.0': {'addons': []}
+                    }
+                },
+                'b': '1.0'
+            }, f)
+
+        errors = Checker(1).check([directory])
+
+        self.assertListEqual(
+            list(map(lambda x: (x.softwareName, x.errorType), errors)),
+            [
+                ('a', 'UnexpectedAddonsDataError'),
+                ('a', 'AddonNotFoundError')
+            ]
+        )
+        self.assertIn('version "3.0"', errors[0].message)
+        self.assertIn('missing', errors[1].message)
+
+    def test_errorFormat(self):
+        """Should format the error with its location."""
+        self.assertEqual(
+            str(CheckError('a.json', 'b', 'Error', 'message')),
+            'a.json: b: Error: message'
+        )
+        self.assertEqual(
+            str(CheckError('a.json', None, 'Error', 'message')),
+            'a.json: Error: message'
+        )
+
+    def __createFiles(self):
+        """Create a directory with invalid json files."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        files = {
+            'a.json': json.dumps({
+                'a': {
+                    'version': '1.0',
+                    'addons': {
+                        'd': {},
+                        'missing': {}
+                    }
+                },
+                'b': ['1.0'],
+                'c': {
+                    'version': '1.0',
+                    'addons': {
+                        'd': None
+                    }
+                },
+                'e': {
+                    'version': 1
+                }
+            }),
+            'b.json': json.dumps(['1.0']),
+            'c.json': '{"d": "1.0"',
+            'd.json': json.dumps({
+                'd': '1.0',
+                'f': {
+                    'version': '1.0',
+                    'addons': []
+                },
+                'g': {
+                    'version': '1.0',
+                    'options': []
+                },
+                'h': {
+                    'version': '1.0',
+                    'addons': {
+                        'd': {
+                            'options': []
+                        }
+                    }
+                }
+            })
+        }
+
+        for fileName, contents in files.items():
+            with open(os.path.join(directory, fileName), 'w') as f:
+                f.write(contents)
+
+        return directory
@@ -0,0 +1,200 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from io import StringIO
+from unittest import mock
+from bver import EnvBuilder, EnvSnapshot, InvalidConfigRootError, InvalidModeError, Mirror, buildEnv
+
+class TestEnvBuilder(unittest.TestCase):
+    """Test env builder object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+    __initFile = os.path.join(__rootPath, 'src', 'init')
+
+    def setUp(self):
+        """Create a config root and a config path."""
+        temporaryDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temporaryDirectory)
+
+        self.configRoot = os.path.join(temporaryDirectory, 'root')
+        shutil.copytree(self.__jsonDirectory, self.configRoot)
+
+        self.configPath = os.path.join(temporaryDirectory, 'path')
+        os.mkdir(self.configPath)
+        with open(os.path.join(self.configPath, 'override.json'), 'w') as f:
+            json.dump({'a': '9.0.0', 'z': '9.0.0'}, f)
+
+        self.baseEnv = {
+            'BVER_CONFIG_ROOT': self.configRoot,
+            'BVER_CONFIG_PATH': self.configPath,
+            'BVER_SNAPSHOT_DIR': os.path.join(temporaryDirectory, 'snapshots'),
+            'BVER_LAST_GOOD_DIR': os.path.join(temporaryDirectory, 'lastGood'),
+            'BVER_LAYER_CACHE_DIR': os.path.join(temporaryDirectory, 'layerCache')
+        }
+
+    def test_build(self):
+        """Should return the environment updated by the bver variables."""
+        env = EnvBuilder().build(self.baseEnv)
+
+        self.assertEqual(env['BVER_A_VERSION'], '1.0.0')
+        self.assertEqual(env['BVER_Z_VERSION'], '9.0.0')
+        self.assertEqual(env['BVER_C_VERSION'], '1.0.0')
+        self.assertEqual(env['BVER_E_D_ENABLED'], '0')
+        self.assertNotIn('BVER_E_C_ENABLED', env)
+        self.assertEqual(env['BVER_CONFIG_ROOT'], self.configRoot)
+        self.assertNotIn('BVER_A_VERSION', self.baseEnv)
+
+    def test_configPaths(self):
+        """Should return the paths in the order used by the init script."""
+        env = {
+            'BVER_CONFIG_ROOT': self.configRoot,
+            'BVER_CONFIG_PATH': os.pathsep.join(['first', '', 'second'])
+        }
+
+        self.assertListEqual(EnvBuilder.configPaths(env), ['second', 'first', self.configRoot])
+
+        success = False
+        try:
+            EnvBuilder.configPaths({'BVER_CONFIG_ROOT': os.path.join(self.configRoot, 'unknown')})
+        except InvalidConfigRootError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_modes(self):
+        """Should only override the variables defined by the base environment in the override mode."""
+        self.baseEnv.update({
+            'BVER_Z_VERSION': '1.0.0',
+            'BVER_C_VERSION': '',
+            'BVER_E_C_ENABLED': '0',
+            'BVER_E_D_ENABLED': '1'
+        })
+        builder = EnvBuilder()
+
+        env = builder.build(self.baseEnv)
+        self.assertEqual(env['BVER_Z_VERSION'], '9.0.0')
+        self.assertEqual(env['BVER_C_VERSION'], '1.0.0')
+        self.assertEqual(env['BVER_E_C_ENABLED'], '1')
+        self.assertEqual(env['BVER_E_D_ENABLED'], '0')
+
+        env = builder.build(self.baseEnv, mode='dont_override')
+        self.assertEqual(env['BVER_Z_VERSION'], '1.0.0')
+        self.assertEqual(env['BVER_C_VERSION'], '1.0.0')
+        self.assertEqual(env['BVER_E_C_ENABLED'], '0')
+        self.assertEqual(env['BVER_E_D_ENABLED'], '1')
+
+        self.baseEnv['BVER_INIT_MODE'] = 'DONT_OVERRIDE'
+        self.assertEqual(builder.build(self.baseEnv)['BVER_Z_VERSION'], '1.0.0')
+
+        success = False
+        try:
+            builder.build(self.baseEnv, mode='invalid')
+        except InvalidModeError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_compact(self):
+        """Should define a single snapshot variable in the compact mode."""
+        self.baseEnv.update({
+            'BVER_INIT_COMPACT': '1',
+            'BVER_SNAPSHOT_EXPORT': 'c'
+        })
+        env = EnvBuilder().build(self.baseEnv)
+
+        self.assertEqual(env['BVER_C_VERSION'], '1.0.0')
+        self.assertNotIn('BVER_Z_VERSION', env)
+        self.assertEqual(
+            EnvSnapshot.read(env['BVER_SNAPSHOT'], self.baseEnv['BVER_SNAPSHOT_DIR'])['BVER_Z_VERSION'],
+            '9.0.0'
+        )
+
+    def test_cache(self):
+        """Should reuse the resolved catalog until it gets refreshed."""
+        builder = EnvBuilder()
+        self.assertEqual(builder.build(self.baseEnv)['BVER_Z_VERSION'], '9.0.0')
+
+        os.remove(os.path.join(self.configPath, 'override.json'))
+        self.assertEqual(builder.build(self.baseEnv)['BVER_Z_VERSION'], '9.0.0')
+        self.assertNotIn('BVER_Z_VERSION', builder.build(self.baseEnv, refresh=True))
+
+        builder.refresh()
+        self.assertNotIn('BVER_Z_VERSION', buildEnv(self.baseEnv, refresh=True))
+
+    def test_baseLayer(self):
+        """Should load the config root once for the catalogs of different config paths."""
+        builder = EnvBuilder()
+        self.assertEqual(builder.build(self.baseEnv)['BVER_A_VERSION'], '1.0.0')
+
+        with open(os.path.join(self.configRoot, 'root.json'), 'w') as f:
+            json.dump({'y': '2.0.0'}, f)
+
+        # the base layer is shared among the config paths
+        env = dict(self.baseEnv, BVER_CONFIG_PATH='')
+        self.assertNotIn('BVER_Y_VERSION', builder.build(env))
+        self.assertNotIn('BVER_Z_VERSION', builder.build(env))
+
+        builder.refresh()
+        self.assertEqual(builder.build(env)['BVER_Y_VERSION'], '2.0.0')
+        self.assertEqual(builder.build(self.baseEnv)['BVER_Z_VERSION'], '9.0.0')
+
+    def test_initOptions(self):
+        """Should support the base cache and sync modes of the init script."""
+        Mirror.writeManifest(self.configRoot)
+        mirrorRoot = os.path.join(os.path.dirname(self.configRoot), 'mirror')
+        env = dict(
+            self.baseEnv,
+            BVER_INIT_BASE_CACHE='1',
+            BVER_INIT_SYNC='1',
+            BVER_MIRROR_ROOT=mirrorRoot
+        )
+
+        with mock.patch.dict(os.environ, {'BVER_LAYER_CACHE_DIR': self.baseEnv['BVER_LAYER_CACHE_DIR']}):
+            self.assertEqual(EnvBuilder().build(env)['BVER_Z_VERSION'], '9.0.0')
+
+        self.assertTrue(os.listdir(self.baseEnv['BVER_LAYER_CACHE_DIR']))
+        self.assertIsNotNone(Mirror(mirrorRoot).resolve(self.configRoot))
+
+        # the latency budget is not supported
+        with mock.patch('sys.stderr', new_callable=StringIO) as stderr:
+            env = dict(self.baseEnv, BVER_INIT_LATENCY_BUDGET='100')
+            self.assertEqual(EnvBuilder().build(env)['BVER_Z_VERSION'], '9.0.0')
+
+        self.assertIn('BVER_INIT_LATENCY_BUDGET', stderr.getvalue())
+
+    def test_initParity(self):
+        """Should produce the same environment as sourcing the init script."""
+        Mirror.writeManifest(self.configRoot)
+        for mode, baseCache in [('', ''), ('DONT_OVERRIDE', ''), ('', '1'), ('', '1')]:
+            baseEnv = dict(os.environ)
+            baseEnv.pop('BVER_BIN_PATH', None)
+            baseEnv.update(self.baseEnv)
+            baseEnv.update({
+                'BVER_INIT_MODE': mode,
+                'BVER_INIT_BASE_CACHE': baseCache,
+                'BVER_Z_VERSION': '1.0.0',
+                'BVER_E_D_ENABLED': '1',
+                'BVER_E_C_ENABLED': '0'
+            })
+
+            output = subprocess.check_output(
+                ['bash', '-c', 'source "{0}" && env -0'.format(self.__initFile)],
+                env=baseEnv
+            ).decode('utf-8')
+            initEnv = dict(x.split('=', 1) for x in output.split('\0') if x)
+
+            env = EnvBuilder().build(baseEnv)
+            for name in set(initEnv).union(env):
+                if name.startswith('BVER_'):
+                    self.assertEqual(env.get(name), initEnv.get(name), name)
+
+            self.assertEqual(env['PATH'], initEnv['PATH'])
+            self.assertEqual(env['PYTHONPATH'], initEnv['PYTHONPATH'])
+
+        # the base layer is cached in its own directory
+        self.assertTrue(os.listdir(self.baseEnv['BVER_LAYER_CACHE_DIR']))
+        self.assertFalse(os.path.exists(self.baseEnv['BVER_LAST_GOOD_DIR']))
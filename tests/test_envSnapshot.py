@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from bver import EnvSnapshot, InvalidSnapshotError, lookup
+
+class TestEnvSnapshot(unittest.TestCase):
+    """Test env snapshot object."""
+
+    __items = [
+        ('BVER_A_VERSION', '1.0.0'),
+        ('BVER_B_VERSION', '2.0.0'),
+        ('BVER_B_A_ENABLED', '0'),
+        ('BVER_B_A_VERSION', '1.0.0')
+    ]
+
+    def setUp(self):
+        """Create a temporary snapshot directory."""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_snapshotFile(self):
+        """Should store the items in a snapshot file addressed by its content."""
+        handle = EnvSnapshot.write(self.__items, self.directory)
+
+        self.assertTrue(handle.startswith('sha256:'))
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.assertEqual(EnvSnapshot.write(self.__items, self.directory), handle)
+        self.assertDictEqual(EnvSnapshot.read(handle, self.directory), dict(self.__items))
+
+    def test_snapshotInline(self):
+        """Should store the items inline in the handle."""
+        handle = EnvSnapshot.write(self.__items, self.directory, inline=True)
+
+        self.assertTrue(handle.startswith('inline:'))
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertDictEqual(EnvSnapshot.read(handle), dict(self.__items))
+
+    def test_snapshotWithoutDirectory(self):
+        """Should store the items inline when no snapshot directory is configured."""
+        with mock.patch.dict(os.environ):
+            os.environ.pop('BVER_SNAPSHOT_DIR', None)
+            self.assertIsNone(EnvSnapshot.directory())
+
+            handle = EnvSnapshot.write(self.__items)
+            self.assertTrue(handle.startswith('inline:'))
+            self.assertDictEqual(EnvSnapshot.read(handle), dict(self.__items))
+
+            success = False
+            try:
+                EnvSnapshot.read(EnvSnapshot.write([('BVER_E_VERSION', '1.0.0')], self.directory))
+            except InvalidSnapshotError:
+                success = True
+
+            self.assertTrue(success)
+
+    def test_invalidSnapshot(self):
+        """Should fail when the snapshot cannot be read."""
+        handles = [
+            'invalid',
+            'inline:invalid',
+            'sha256:{0}'.format('0' * 64)
+        ]
+
+        failedCount = 0
+        for handle in handles:
+            try:
+                EnvSnapshot.read(handle, self.directory)
+            except InvalidSnapshotError:
+                failedCount += 1
+
+        self.assertEqual(failedCount, len(handles))
+
+    def test_lookup(self):
+        """Should look up the values from the env falling back to the snapshot."""
+        env = {
+            'BVER_SNAPSHOT': EnvSnapshot.write(self.__items, inline=True),
+            'BVER_A_VERSION': '1.5.0',
+            'BVER_C_VERSION': '3.0.0'
+        }
+
+        self.assertEqual(lookup('BVER_B_VERSION', env=env), '2.0.0')
+        self.assertEqual(lookup('b', env=env), '2.0.0')
+        self.assertEqual(lookup('BVER_B_A_ENABLED', env=env), '0')
+        self.assertEqual(lookup('c', env=env), '3.0.0')
+        self.assertIsNone(lookup('d', env=env))
+        self.assertEqual(lookup('d', '1.0', env=env), '1.0')
+        self.assertEqual(lookup('c', env={'BVER_C_VERSION': '4.0'}), '4.0')
+
+        # exported variables override the snapshot
+        self.assertEqual(lookup('a', env=env), '1.5.0')
+
+        env = {
+            'BVER_SNAPSHOT': EnvSnapshot.write(self.__items, self.directory),
+            'BVER_SNAPSHOT_DIR': self.directory
+        }
+        self.assertEqual(lookup('a', env=env), '1.0.0')
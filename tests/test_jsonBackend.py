@@ -0,0 +1,113 @@
+import os
+import io
+import json
+import mmap
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from bver import JsonBackend
+from bver.Loader import JsonLoader
+
+class TestJsonBackend(unittest.TestCase):
+    """Test json backend objects."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+    __contents = {'b': {'version': '1.0.0', 'options': {'label': 'café', 'value': 1.5}}, 'a': [1, True, None]}
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temporaryDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temporaryDirectory)
+
+    def test_availableBackends(self):
+        """Should list the installed backends, from the fastest."""
+        availableBackends = JsonBackend.availableBackends()
+
+        self.assertEqual(availableBackends[-1], 'json')
+        self.assertEqual(JsonBackend.backend().name, availableBackends[0])
+        self.assertIs(JsonBackend.backend('json'), JsonBackend.backend('json'))
+
+        with mock.patch.dict(os.environ, {'BVER_JSON_BACKEND': 'json'}):
+            self.assertEqual(JsonBackend.backend().name, 'json')
+
+        success = False
+        try:
+            JsonBackend.backend('unknown')
+        except JsonBackend.InvalidJsonBackendError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_loads(self):
+        """Should decode str and binary contents."""
+        data = json.dumps(self.__contents)
+        filePath = os.path.join(self.temporaryDirectory, 'contents.json')
+        with open(filePath, 'w') as f:
+            f.write(data)
+
+        for name in JsonBackend.availableBackends():
+            jsonBackend = JsonBackend.backend(name)
+            encoded = data.encode('utf-8')
+
+            for contents in [data, encoded, bytearray(encoded), memoryview(encoded)]:
+                self.assertEqual(jsonBackend.loads(contents), self.__contents)
+
+            with open(filePath, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mappedData:
+                    self.assertEqual(jsonBackend.loads(mappedData), self.__contents)
+
+            self.assertEqual(jsonBackend.loadFile(filePath), self.__contents)
+
+            # contents only supported by the standard library
+            self.assertEqual(jsonBackend.loads(b'{"a": NaN, "b": 123456789012345678901234567890}')['b'], 123456789012345678901234567890)
+
+            success = False
+            try:
+                jsonBackend.loads(b'{"a": ')
+            except ValueError:
+                success = True
+
+            self.assertTrue(success)
+
+    def test_loadLargeFile(self):
+        """Should decode large files from a mmap."""
+        contents = dict(('software{0}'.format(x), '1.0.{0}'.format(x)) for x in range(10000))
+        filePath = os.path.join(self.temporaryDirectory, 'large.json')
+        with open(filePath, 'w') as f:
+            json.dump(contents, f)
+
+        for name in JsonBackend.availableBackends():
+            self.assertEqual(JsonBackend.backend(name).loadFile(filePath), contents)
+
+    def test_dump(self):
+        """Should encode exactly as the standard library."""
+        for name in JsonBackend.availableBackends():
+            jsonBackend = JsonBackend.backend(name)
+
+            self.assertEqual(
+                jsonBackend.dumps(self.__contents, indent=4, sortKeys=True),
+                json.dumps(self.__contents, indent=4, sort_keys=True)
+            )
+
+            output = io.StringIO()
+            jsonBackend.dump(self.__contents, output, indent=4, sortKeys=True)
+            self.assertEqual(output.getvalue(), json.dumps(self.__contents, indent=4, sort_keys=True))
+
+    def test_loader(self):
+        """Should resolve the same softwares through any backend."""
+        results = []
+        for name in JsonBackend.availableBackends():
+            loader = JsonLoader(JsonBackend.backend(name))
+            loader.addFromJsonDirectory(self.__jsonDirectory)
+
+            self.assertEqual(loader.jsonBackend().name, name)
+            results.append(loader.resolvedTable().toEnv())
+
+        for result in results[1:]:
+            self.assertDictEqual(result, results[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+import shutil
+import zipfile
+import tempfile
+import unittest
+import subprocess
+from bver import LibArchive
+
+class TestLibArchive(unittest.TestCase):
+    """Test lib archive object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __libDirectory = os.path.join(__rootPath, 'src', 'lib')
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+
+    def setUp(self):
+        """Create a temporary install layout."""
+        self.temporaryDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temporaryDirectory)
+
+        os.mkdir(os.path.join(self.temporaryDirectory, 'bin'))
+        self.archiveFilePath = os.path.join(self.temporaryDirectory, 'lib', LibArchive.fileName)
+
+    def test_sourceFiles(self):
+        """Should list the sources of the package."""
+        sourceFiles = LibArchive(self.__libDirectory).sourceFiles()
+
+        self.assertIn('bver/__init__.py', sourceFiles)
+        self.assertIn('bver/Loader/JsonLoader.py', sourceFiles)
+        self.assertListEqual(sourceFiles, sorted(sourceFiles))
+        self.assertFalse(any('__pycache__' in x for x in sourceFiles))
+
+    def test_build(self):
+        """Should write the sources and their bytecode deterministically."""
+        libArchive = LibArchive(self.__libDirectory)
+        libArchive.build(self.archiveFilePath)
+
+        with zipfile.ZipFile(self.archiveFilePath) as archive:
+            names = archive.namelist()
+
+        for sourceFile in libArchive.sourceFiles():
+            self.assertIn(sourceFile, names)
+            self.assertIn(sourceFile + 'c', names)
+
+        with open(self.archiveFilePath, 'rb') as f:
+            contents = f.read()
+
+        libArchive.build(self.archiveFilePath)
+        with open(self.archiveFilePath, 'rb') as f:
+            self.assertEqual(f.read(), contents)
+
+        self.assertListEqual(sorted(os.listdir(os.path.dirname(self.archiveFilePath))), [LibArchive.fileName])
+
+    def test_import(self):
+        """Should import the library from the archive."""
+        LibArchive(self.__libDirectory).build(self.archiveFilePath)
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = self.archiveFilePath
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                '-c',
+                'import sys, json, bver; from bver.Loader import JsonLoader; '
+                'loader = JsonLoader(); loader.addFromJsonDirectory(sys.argv[1]); '
+                'env = bver.buildEnv({"BVER_CONFIG_ROOT": sys.argv[1]}); '
+                'json.dump([bver.__file__, [x.version() for x in loader.softwares() if x.name() == "a"][0], env["PYTHONPATH"], env["BVER_BIN_PATH"]], sys.stdout)',
+                self.__jsonDirectory
+            ],
+            env=env,
+            cwd=self.temporaryDirectory
+        )
+
+        moduleFile, version, pythonPath, binPath = json.loads(output.decode('utf-8'))
+        self.assertTrue(moduleFile.startswith(self.archiveFilePath))
+        self.assertEqual(version, '1.0.0')
+        self.assertEqual(pythonPath.split(os.pathsep)[0], self.archiveFilePath)
+        self.assertEqual(binPath, os.path.join(self.temporaryDirectory, 'bin'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from bver import Mirror, InvalidManifestError
+from bver.Loader import JsonLoader
+
+class TestMirror(unittest.TestCase):
+    """Test mirror object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __jsonSplitVersionsDirectory = os.path.join(__rootPath, 'data', 'jsonSplitVersions')
+
+    def setUp(self):
+        """Create a temporary published directory and mirror root."""
+        temporaryDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temporaryDirectory)
+
+        self.publishDirectory = os.path.join(temporaryDirectory, 'publish')
+        self.mirrorRoot = os.path.join(temporaryDirectory, 'mirror')
+        shutil.copytree(self.__jsonSplitVersionsDirectory, self.publishDirectory)
+
+    def test_writeManifest(self):
+        """Should write the checksum of every file."""
+        manifest = Mirror.writeManifest(self.publishDirectory)
+
+        self.assertListEqual(
+            sorted(manifest['files'].keys()),
+            [
+                'activeVersion.json',
+                'activeVersion.versions/16.4.200.json',
+                'activeVersion.versions/17.5.391.json'
+            ]
+        )
+        self.assertDictEqual(Mirror.readManifest(self.publishDirectory), manifest)
+        self.assertEqual(Mirror.writeManifest(self.publishDirectory)['digest'], manifest['digest'])
+        self.assertIsNone(Mirror.readManifest(self.mirrorRoot))
+
+    def test_verifiedManifest(self):
+        """Should verify the published manifest against the files."""
+        manifest = Mirror.writeManifest(self.publishDirectory)
+        self.assertDictEqual(Mirror.verifiedManifest(self.publishDirectory), manifest)
+
+        # only the contents contribute to the digest
+        filePath = os.path.join(self.publishDirectory, 'activeVersion.json')
+        os.utime(filePath, ns=(0, 0))
+        self.assertEqual(Mirror.verifiedManifest(self.publishDirectory)['digest'], manifest['digest'])
+
+        with open(filePath, 'a') as f:
+            f.write(' ')
+
+        verifiedManifest = Mirror.verifiedManifest(self.publishDirectory)
+        self.assertNotEqual(verifiedManifest['digest'], manifest['digest'])
+        self.assertEqual(verifiedManifest['files']['activeVersion.json']['sha256'], Mirror.checksum(filePath))
+
+    def test_sync(self):
+        """Should copy the published files to the mirror."""
+        mirror = Mirror(self.mirrorRoot)
+
+        success = False
+        try:
+            mirror.sync(self.publishDirectory)
+        except InvalidManifestError:
+            success = True
+
+        self.assertTrue(success)
+        self.assertIsNone(mirror.resolve(self.publishDirectory))
+
+        Mirror.writeManifest(self.publishDirectory)
+        mirrorDirectory = mirror.sync(self.publishDirectory)
+
+        self.assertTrue(os.path.islink(mirrorDirectory))
+        self.assertEqual(mirror.resolve(self.publishDirectory), mirrorDirectory)
+        self.assertEqual(
+            Mirror.checksum(os.path.join(mirrorDirectory, 'activeVersion.versions', '16.4.200.json')),
+            Mirror.checksum(os.path.join(self.publishDirectory, 'activeVersion.versions', '16.4.200.json'))
+        )
+
+    def test_syncChanges(self):
+        """Should only copy the changed files switching the mirror."""
+        mirror = Mirror(self.mirrorRoot)
+        Mirror.writeManifest(self.publishDirectory)
+        previousDirectory = os.path.realpath(mirror.sync(self.publishDirectory))
+
+        # publishing a change
+        self.__setActiveVersion('16.4.200')
+        Mirror.writeManifest(self.publishDirectory)
+        currentDirectory = os.path.realpath(mirror.sync(self.publishDirectory))
+
+        self.assertNotEqual(previousDirectory, currentDirectory)
+        self.assertTrue(os.path.samefile(
+            os.path.join(previousDirectory, 'activeVersion.versions', '17.5.391.json'),
+            os.path.join(currentDirectory, 'activeVersion.versions', '17.5.391.json')
+        ))
+        self.assertFalse(os.path.samefile(
+            os.path.join(previousDirectory, 'activeVersion.json'),
+            os.path.join(currentDirectory, 'activeVersion.json')
+        ))
+
+    def test_checksumMismatch(self):
+        """Should fail when a file does not match the manifest."""
+        Mirror.writeManifest(self.publishDirectory)
+        self.__setActiveVersion('16.4.200')
+
+        success = False
+        try:
+            Mirror(self.mirrorRoot).sync(self.publishDirectory)
+        except InvalidManifestError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_loaderPrefersMirror(self):
+        """Should load the mirror when it matches the published directory."""
+        Mirror.writeManifest(self.publishDirectory)
+        Mirror(self.mirrorRoot).sync(self.publishDirectory)
+
+        # changing the published file without updating the manifest
+        # (only noticed when reading from the mirror)
+        self.__setActiveVersion('16.4.200')
+
+        previousMirrorRoot = os.environ.get(Mirror.envName)
+        os.environ[Mirror.envName] = self.mirrorRoot
+        try:
+            loader = JsonLoader()
+            loader.addFromJsonPaths([self.publishDirectory])
+        finally:
+            if previousMirrorRoot is None:
+                del os.environ[Mirror.envName]
+            else:
+                os.environ[Mirror.envName] = previousMirrorRoot
+
+        self.assertEqual(loader.softwares()[0].version(), '17.5.391')
+
+        # once the manifest changes the published directory is used
+        Mirror.writeManifest(self.publishDirectory)
+        self.assertIsNone(Mirror(self.mirrorRoot).resolve(self.publishDirectory))
+
+    def __setActiveVersion(self, version):
+        """
+        Change the active version of the published file.
+
+        @private
+        """
+        filePath = os.path.join(self.publishDirectory, 'activeVersion.json')
+        with open(filePath) as f:
+            contents = json.load(f)
+
+        contents['activeVersion']['active'] = version
+        with open(filePath, 'w') as f:
+            json.dump(contents, f)
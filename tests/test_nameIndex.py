@@ -0,0 +1,68 @@
+import unittest
+from bver import NameIndex
+
+class TestNameIndex(unittest.TestCase):
+    """Test name index object."""
+
+    __names = ['maya', 'maya/mtoa', 'maya/yeti', 'mari', 'houdini', 'houdini/redshift', 'nuke']
+
+    def test_constructor(self):
+        """Should sort the names."""
+        nameIndex = self.__getNameIndex()
+
+        self.assertEqual(len(nameIndex), len(self.__names))
+        self.assertListEqual(nameIndex.names(), sorted(self.__names))
+        self.assertIn('maya/mtoa', nameIndex)
+        self.assertNotIn('maya/', nameIndex)
+        self.assertEqual(nameIndex.get('nuke'), 'NUKE')
+        self.assertIsNone(nameIndex.get('unknown'))
+        self.assertEqual(nameIndex.get('unknown', 1), 1)
+
+    def test_prefix(self):
+        """Should return the names starting with the prefix."""
+        nameIndex = self.__getNameIndex()
+
+        self.assertListEqual(
+            nameIndex.prefix('maya/'),
+            [('maya/mtoa', 'MAYA/MTOA'), ('maya/yeti', 'MAYA/YETI')]
+        )
+        self.assertListEqual(
+            [x[0] for x in nameIndex.prefix('ma')],
+            ['mari', 'maya', 'maya/mtoa', 'maya/yeti']
+        )
+        self.assertListEqual(nameIndex.prefix('unknown'), [])
+        self.assertEqual(len(nameIndex.prefix('')), len(self.__names))
+
+    def test_range(self):
+        """Should return the names within the range."""
+        nameIndex = self.__getNameIndex()
+
+        self.assertListEqual(
+            [x[0] for x in nameIndex.range('mari', 'maya/yeti')],
+            ['mari', 'maya', 'maya/mtoa']
+        )
+        self.assertListEqual([x[0] for x in nameIndex.range(end='mari')], ['houdini', 'houdini/redshift'])
+        self.assertListEqual([x[0] for x in nameIndex.range('n')], ['nuke'])
+        self.assertListEqual(nameIndex.range('z', 'a'), [])
+
+    def test_glob(self):
+        """Should return the names matching the pattern."""
+        nameIndex = self.__getNameIndex()
+
+        self.assertListEqual([x[0] for x in nameIndex.glob('ma*')], ['mari', 'maya'])
+        self.assertListEqual([x[0] for x in nameIndex.glob('*/*')], ['houdini/redshift', 'maya/mtoa', 'maya/yeti'])
+        self.assertListEqual([x[0] for x in nameIndex.glob('maya/[m]*')], ['maya/mtoa'])
+        self.assertListEqual([x[0] for x in nameIndex.glob('nuke')], ['nuke'])
+        self.assertListEqual(nameIndex.glob('nu'), [])
+
+        # without separator the wildcards match any character
+        nameIndex = NameIndex([(x, None) for x in self.__names])
+        self.assertEqual(len(nameIndex.glob('ma*')), 4)
+
+    def __getNameIndex(self):
+        """
+        Return a name index of the names.
+
+        @private
+        """
+        return NameIndex([(x, x.upper()) for x in self.__names], separator='/')
@@ -0,0 +1,51 @@
+import os
+import unittest
+from bver import OptionIndex
+from bver.Loader import JsonLoader
+
+class TestOptionIndex(unittest.TestCase):
+    """Test option index object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+
+    def test_entries(self):
+        """Should index the software and addon entries."""
+        optionIndex = self.__getOptionIndex()
+
+        self.assertIn(('e', None), optionIndex.keys())
+        self.assertSetEqual(optionIndex.softwareKeys('e'), set([('e', None)]))
+        self.assertSetEqual(optionIndex.softwareKeys('unknown'), set())
+        self.assertSetEqual(optionIndex.addonKeys('c'), set([('e', 'c'), ('f', 'c')]))
+        self.assertEqual(len(optionIndex.addonKeys()), 5)
+
+        software, addon = optionIndex.entry(('f', 'a'))
+        self.assertEqual(software.name(), 'f')
+        self.assertEqual(addon.name(), 'a')
+        self.assertIsNone(optionIndex.entry(('f', None))[1])
+
+    def test_optionKeys(self):
+        """Should return the entries setting an option."""
+        optionIndex = self.__getOptionIndex()
+
+        self.assertSetEqual(optionIndex.optionKeys('foo'), set([('e', None), ('f', None)]))
+        self.assertSetEqual(optionIndex.optionKeys('enabled', [False]), set([('e', 'd'), ('f', 'c')]))
+        self.assertSetEqual(optionIndex.optionKeys('foo', [11]), set())
+        self.assertSetEqual(optionIndex.optionKeys('unknown'), set())
+
+    def test_valueKey(self):
+        """Should index unhashable values and keep booleans apart from numbers."""
+        self.assertNotEqual(OptionIndex.valueKey(True), OptionIndex.valueKey(1))
+        self.assertEqual(OptionIndex.valueKey(1), OptionIndex.valueKey(1))
+        self.assertEqual(OptionIndex.valueKey({'b': [1], 'a': 2}), OptionIndex.valueKey({'a': 2, 'b': [1]}))
+
+    def __getOptionIndex(self):
+        """
+        Return an option index for the softwares from the json directory.
+
+        @private
+        """
+        loader = JsonLoader()
+        loader.addFromJsonDirectory(self.__jsonDirectory)
+
+        return OptionIndex(loader.softwares())
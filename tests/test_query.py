@@ -154,6 +154,154 @@ class TestQuery(unittest.TestCase):
 
         self.assertTrue(success)
 
+    def test_softwaresByNames(self):
+        """Should return a list of softwares following the order of the names."""
+        softwares = self.__getSoftwares()
+        query = Query(softwares)
+
+        softwareList = query.softwaresByNames(['D', 'A', 'C'])
+
+        self.assertListEqual(
+            list(map(lambda x: x.name(), softwareList)),
+            ['D', 'A', 'C']
+        )
+
+    def test_softwaresByNamesError(self):
+        """Should raise an exception when any of the softwares was not found."""
+        softwares = self.__getSoftwares()
+        query = Query(softwares)
+
+        success = False
+        try:
+            query.softwaresByNames(['A', 'E'])
+        except SoftwareNotFoundError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_iterEnvItems(self):
+        """Should yield the bver environment variables of the softwares."""
+        softwares = self.__getSoftwares()
+        softwares[2].addon('A').setOption('enabled', False)
+        query = Query(softwares)
+
+        self.assertListEqual(
+            list(query.iterEnvItems()),
+            [
+                ('BVER_A_VERSION', '1.1.0'),
+                ('BVER_B_VERSION', '1.0.0'),
+                ('BVER_B_A_VERSION', '1.1.0'),
+                ('BVER_C_VERSION', '0.1.0'),
+                ('BVER_C_A_ENABLED', '0'),
+                ('BVER_C_A_VERSION', '1.1.0'),
+                ('BVER_D_VERSION', '0.0.1')
+            ]
+        )
+
+    def test_iterEnvItemsEnabledFromEnv(self):
+        """Should only yield the addon enabled variables that differ from the env."""
+        softwares = self.__getSoftwares()
+        softwares[2].addon('A').setOption('enabled', False)
+        query = Query(softwares)
+
+        env = {
+            'BVER_B_A_ENABLED': '0',
+            'BVER_C_A_ENABLED': '0'
+        }
+        envItems = list(query.iterEnvItems(env))
+
+        self.assertIn(('BVER_B_A_ENABLED', '1'), envItems)
+        self.assertNotIn(('BVER_C_A_ENABLED', '0'), envItems)
+
+    def test_toEnv(self):
+        """Should return a dict with the bver environment variables."""
+        softwares = self.__getSoftwares()
+        query = Query(softwares)
+
+        self.assertDictEqual(
+            query.toEnv(),
+            {
+                'BVER_A_VERSION': '1.1.0',
+                'BVER_B_VERSION': '1.0.0',
+                'BVER_B_A_VERSION': '1.1.0',
+                'BVER_C_VERSION': '0.1.0',
+                'BVER_C_A_VERSION': '1.1.0',
+                'BVER_D_VERSION': '0.0.1'
+            }
+        )
+
+    def test_serialize(self):
+        """Should serialize the softwares of the query."""
+        query = Query(self.__getSoftwares())
+        data = query.serialize()
+
+        otherQuery = Query.fromSerialized(data)
+        self.assertListEqual(otherQuery.softwareNames(), query.softwareNames())
+        self.assertDictEqual(otherQuery.toEnv(), query.toEnv())
+        self.assertTrue(otherQuery.softwareByName('B').addon('A').option('enabled'))
+
+        self.assertListEqual(Query.fromSerialized(data, ['B', 'D']).softwareNames(), ['B', 'D'])
+        self.assertListEqual(Query.fromSerialized(query.serialize(['C'])).softwareNames(), ['C'])
+
+    def test_nameIndex(self):
+        """Should index the software names and the compound addon names."""
+        query = Query(self.__getSoftwares())
+        nameIndex = query.nameIndex()
+
+        self.assertListEqual(nameIndex.names(), ['A', 'B', 'B/A', 'C', 'C/A', 'D'])
+        self.assertListEqual([x[0] for x in nameIndex.prefix('B/')], ['B/A'])
+        self.assertListEqual([x[0] for x in nameIndex.glob('*')], ['A', 'B', 'C', 'D'])
+        self.assertListEqual([x[0] for x in nameIndex.glob('*/A')], ['B/A', 'C/A'])
+
+        software, addon = nameIndex.get('C/A')
+        self.assertEqual(software.name(), 'C')
+        self.assertEqual(addon.name(), 'A')
+        self.assertIsNone(nameIndex.get('D')[1])
+
+    def test_bverNameIndex(self):
+        """Should index the bver names of the softwares and addons."""
+        query = Query(self.__getSoftwares())
+        bverNameIndex = query.bverNameIndex()
+
+        self.assertListEqual(
+            [x[0] for x in bverNameIndex.prefix('BVER_B')],
+            ['BVER_B_A_VERSION', 'BVER_B_VERSION']
+        )
+        self.assertListEqual(
+            [x[0] for x in bverNameIndex.range('BVER_C', 'BVER_D')],
+            ['BVER_C_A_VERSION', 'BVER_C_VERSION']
+        )
+        self.assertEqual(bverNameIndex.get('BVER_A_VERSION')[0].name(), 'A')
+        self.assertIs(query.bverNameIndex(), bverNameIndex)
+
+    def test_versions(self):
+        """Should return the versions available for the softwares."""
+        softwares = self.__getSoftwares()
+        softwares[0].setAvailableVersions(['1.1.0', '1.10.0', '1.9.0', '0.1.0'])
+        query = Query(softwares)
+
+        self.assertEqual(query.latestVersion('A'), '1.10.0')
+        self.assertEqual(query.latestVersion('B'), '1.0.0')
+        self.assertListEqual(query.availableVersions('A'), ['0.1.0', '1.1.0', '1.9.0', '1.10.0'])
+        self.assertListEqual(query.availableVersions('A', '1.1', '1.10'), ['1.1.0', '1.9.0'])
+        self.assertListEqual(query.availableVersions('A', minimum='2'), [])
+
+        success = False
+        try:
+            query.latestVersion('unknown')
+        except SoftwareNotFoundError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_softwaresByVersionRange(self):
+        """Should return the softwares within a version range."""
+        query = Query(self.__getSoftwares())
+
+        self.assertListEqual([x.name() for x in query.softwaresByVersionRange()], ['D', 'C', 'B', 'A'])
+        self.assertListEqual([x.name() for x in query.softwaresByVersionRange(maximum='1.0')], ['D', 'C'])
+        self.assertListEqual([x.name() for x in query.softwaresByVersionRange('0.1.0', '1.1.0')], ['C', 'B'])
+
     def __getSoftwares(self):
         """Return an expected list of software with addons."""
         result = []
@@ -0,0 +1,78 @@
+import os
+import unittest
+from bver import Query, QueryFilter, OptionFilter, SoftwareFilter, AddonFilter
+from bver.Loader import JsonLoader
+
+class TestQueryFilter(unittest.TestCase):
+    """Test query filter objects."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+
+    def test_option(self):
+        """Should match the entries setting an option."""
+        query = self.__getQuery()
+
+        self.assertListEqual(self.__names(query, OptionFilter('foo')), ['e', 'f'])
+        self.assertListEqual(self.__names(query, OptionFilter('foo', 10, 11)), ['e', 'f'])
+        self.assertListEqual(self.__names(query, OptionFilter('enabled', False)), ['e/d', 'f/c'])
+
+    def test_compose(self):
+        """Should compose the filters."""
+        query = self.__getQuery()
+
+        self.assertListEqual(
+            self.__names(query, AddonFilter('c') & OptionFilter('enabled', False)),
+            ['f/c']
+        )
+        self.assertListEqual(
+            self.__names(query, AddonFilter('c') & ~OptionFilter('enabled', False)),
+            ['e/c']
+        )
+        self.assertListEqual(
+            self.__names(query, SoftwareFilter('a') | (SoftwareFilter() & OptionFilter('foo'))),
+            ['a', 'e', 'f']
+        )
+        self.assertListEqual(
+            self.__names(query, ~(AddonFilter() | OptionFilter('foo'))),
+            sorted(['a', 'activeVersion', 'b', 'c', 'd', 'kombi'])
+        )
+        self.assertListEqual(self.__names(query, AddonFilter('unknown') & AddonFilter()), [])
+
+    def test_softwaresByFilter(self):
+        """Should return the softwares with entries matching the filter."""
+        softwares = self.__getQuery().softwaresByFilter(OptionFilter('enabled', False))
+
+        self.assertListEqual([x.name() for x in softwares], ['e', 'f'])
+
+    def test_abstract(self):
+        """Should not create the abstract filter."""
+        success = False
+        try:
+            QueryFilter()
+        except TypeError:
+            success = True
+
+        self.assertTrue(success)
+
+    def __getQuery(self):
+        """
+        Return a query for the softwares from the json directory.
+
+        @private
+        """
+        loader = JsonLoader()
+        loader.addFromJsonDirectory(self.__jsonDirectory)
+
+        return Query(loader.softwares())
+
+    def __names(self, query, queryFilter):
+        """
+        Return the names ("<software>" or "<software>/<addon>") of the entries selected by the filter.
+
+        @private
+        """
+        return [
+            software.name() if addon is None else '{0}/{1}'.format(software.name(), addon.name())
+            for software, addon in query.select(queryFilter)
+        ]
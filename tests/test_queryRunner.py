@@ -0,0 +1,78 @@
+import io
+import os
+import unittest
+from bver import Query, QueryRunner, InvalidQueryError, SoftwareNotFoundError
+from bver.Loader import JsonLoader
+from bver.Versioned import InvalidAddonError, InvalidOptionError
+
+class TestQueryRunner(unittest.TestCase):
+    """Test query runner object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+
+    def test_run(self):
+        """Should return the result of the queries."""
+        runner = self.__getRunner()
+
+        self.assertEqual(runner.run('software c'), '1.0.0')
+        self.assertEqual(runner.run('software BVER_E_VERSION'), '1.2.5')
+        self.assertEqual(runner.run('addon c'), 'e f')
+        self.assertEqual(runner.run('addon BVER_C_VERSION'), 'e f')
+        self.assertEqual(runner.run('addonversion e d'), '1.1.0')
+        self.assertEqual(runner.run('option e foo'), '10')
+        self.assertEqual(runner.run('option e d enabled'), 'false')
+
+    def test_invalidQueries(self):
+        """Should fail when the query cannot be resolved."""
+        runner = self.__getRunner()
+
+        for queryLine, errorClass in [
+                ('', InvalidQueryError),
+                ('unknown c', InvalidQueryError),
+                ('software', InvalidQueryError),
+                ('software unknown', SoftwareNotFoundError),
+                ('addonversion e unknown', InvalidAddonError),
+                ('option e unknown', InvalidOptionError)]:
+            success = False
+            try:
+                runner.run(queryLine)
+            except errorClass:
+                success = True
+
+            self.assertTrue(success)
+
+    def test_runLines(self):
+        """Should write the result of each query line to the output."""
+        output = io.StringIO()
+        errorOutput = io.StringIO()
+
+        failed = self.__getRunner().runLines(
+            ['software c\n', '\n', 'software unknown\n', 'addonversion e c\n'],
+            output,
+            errorOutput
+        )
+
+        self.assertEqual(failed, 1)
+        self.assertEqual(output.getvalue(), '1.0.0\n\n\n1.0.0\n')
+        self.assertIn('unknown', errorOutput.getvalue())
+
+    def test_flush(self):
+        """Should flush the output after each result when requested."""
+        output = io.StringIO()
+        flushed = []
+        output.flush = lambda: flushed.append(output.getvalue())
+
+        self.__getRunner().runLines(['software c', ' ', 'software d'], output, flush=True)
+        self.assertListEqual(flushed, ['1.0.0\n', '1.0.0\n\n', '1.0.0\n\n1.1.0\n'])
+
+    def __getRunner(self):
+        """
+        Return a query runner for the softwares from the json directory.
+
+        @private
+        """
+        loader = JsonLoader()
+        loader.addFromJsonDirectory(self.__jsonDirectory)
+
+        return QueryRunner(Query(loader.softwares()))
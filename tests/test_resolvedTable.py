@@ -0,0 +1,176 @@
+import os
+import pickle
+import unittest
+from bver import ResolvedTable, Query, InvalidSerializedDataError
+from bver.Loader import JsonLoader
+
+class TestResolvedTable(unittest.TestCase):
+    """Test resolved table object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __complexJsonFile = os.path.join(__rootPath, 'data', 'json', 'complex.json')
+
+    def test_constructor(self):
+        """Should test the constructor."""
+        table = self.__getTable()
+
+        self.assertEqual(len(table), 3)
+        self.assertListEqual(table.names(), ['c', 'd', 'e'])
+        self.assertListEqual(table.bverNames(), ['BVER_C_VERSION', 'BVER_D_VERSION', 'BVER_E_VERSION'])
+        self.assertListEqual(table.versions(), ['1.0.0', '1.1.0', '1.2.5'])
+        self.assertEqual(table.index('e'), 2)
+        self.assertIsNone(table.index('unknown'))
+
+        success = False
+        try:
+            ResolvedTable(['a'], ['1.0.0'], [], [0, 0], [], [], [])
+        except AssertionError:
+            success = True
+
+        self.assertTrue(success)
+
+    def test_addonEdges(self):
+        """Should return the addons of a software."""
+        table = self.__getTable()
+
+        self.assertListEqual(
+            sorted(table.addonEdges('e')),
+            [('c', '1.0.0', True), ('d', '1.1.0', False)]
+        )
+        self.assertListEqual(table.addonEdges('c'), [])
+        self.assertListEqual(table.addonEdges('unknown'), [])
+
+    def test_env(self):
+        """Should return the same environment produced by the query."""
+        loader = JsonLoader()
+        loader.addFromJsonFile(self.__complexJsonFile)
+        table = loader.resolvedTable()
+        query = Query(loader.softwares())
+
+        self.assertDictEqual(table.toEnv(), query.toEnv())
+        self.assertListEqual(list(table.iterEnvItems()), list(query.iterEnvItems()))
+
+        env = {'BVER_E_D_ENABLED': '0', 'BVER_E_C_ENABLED': '0'}
+        self.assertListEqual(list(table.iterEnvItems(env)), list(query.iterEnvItems(env)))
+
+    def test_versionOverride(self):
+        """Should resolve the versions using the input env."""
+        loader = JsonLoader()
+        loader.addFromJsonFile(self.__complexJsonFile)
+        table = loader.resolvedTable({'BVER_C_VERSION': '2.0.0'})
+
+        self.assertListEqual(table.versions(), ['2.0.0', '1.1.0', '1.2.5'])
+        self.assertIn(('c', '2.0.0', True), table.addonEdges('e'))
+
+    def test_filter(self):
+        """Should return a table containing only the input softwares."""
+        table = self.__getTable().filter(['e', 'unknown'])
+
+        self.assertListEqual(table.names(), ['e'])
+        self.assertListEqual(
+            sorted(table.addonEdges('e')),
+            [('c', '1.0.0', True), ('d', '1.1.0', False)]
+        )
+        self.assertEqual(table.toEnv()['BVER_E_C_VERSION'], '1.0.0')
+
+        # the order of the table is kept
+        self.assertListEqual(self.__getTable().filter(['e', 'c']).names(), ['c', 'e'])
+
+    def test_hash(self):
+        """Should return a hash based on the contents of the table."""
+        table = self.__getTable()
+
+        self.assertEqual(table.hash(), self.__getTable().hash())
+        self.assertEqual(table.filter(['c', 'd']).rowHash(0), table.rowHash(0))
+        self.assertNotEqual(
+            table.hash(),
+            self.__getTable({'BVER_D_VERSION': '2.0.0'}).hash()
+        )
+
+    def test_diff(self):
+        """Should return the softwares added, removed and changed."""
+        table = self.__getTable()
+        otherTable = self.__getTable({'BVER_D_VERSION': '2.0.0'}).filter(['d', 'e'])
+
+        self.assertDictEqual(
+            table.diff(otherTable),
+            {
+                'added': [],
+                'removed': ['c'],
+                'changed': ['d', 'e']
+            }
+        )
+        self.assertDictEqual(
+            otherTable.diff(table),
+            {
+                'added': ['c'],
+                'removed': [],
+                'changed': ['d', 'e']
+            }
+        )
+
+    def test_softwares(self):
+        """Should return the software objects."""
+        softwares = dict((x.name(), x) for x in self.__getTable().softwares())
+
+        self.assertEqual(softwares['e'].version(), '1.2.5')
+        self.assertEqual(softwares['e'].option('foo'), 10)
+        self.assertEqual(softwares['e'].addon('c').version(), '1.0.0')
+        self.assertFalse(softwares['e'].addon('d').option('enabled'))
+
+    def test_serialize(self):
+        """Should serialize the table."""
+        table = self.__getTable()
+        data = table.serialize()
+
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(ResolvedTable.deserialize(data).hash(), table.hash())
+        self.assertEqual(ResolvedTable.deserialize(memoryview(data)).hash(), table.hash())
+        self.assertEqual(pickle.loads(pickle.dumps(table)).hash(), table.hash())
+        self.assertEqual(
+            ResolvedTable.fromSoftwares(table.softwares()).toEnv(),
+            table.toEnv()
+        )
+
+        # the available versions are kept
+        loader = JsonLoader()
+        loader.addSoftwareInfo('a', '1.0.0', availableVersions=['1.0.0', '0.9.0'])
+        self.assertListEqual(
+            ResolvedTable.deserialize(loader.serialize()).availableVersions('a'),
+            ['0.9.0', '1.0.0']
+        )
+        self.assertListEqual(table.availableVersions('c'), ['1.0.0'])
+
+        # slicing
+        self.assertEqual(
+            ResolvedTable.deserialize(table.serialize(['e'])).hash(),
+            table.filter(['e']).hash()
+        )
+        self.assertEqual(
+            ResolvedTable.deserialize(data, ['e', 'c', 'unknown']).toEnv(),
+            table.filter(['c', 'e']).toEnv()
+        )
+        self.assertEqual(
+            ResolvedTable.deserialize(data, ['c', 'e']).hash(),
+            table.filter(['c', 'e']).hash()
+        )
+
+        for invalidData in [b'', b'invalid', data[:4] + b'invalid', data[:4]]:
+            success = False
+            try:
+                ResolvedTable.deserialize(invalidData)
+            except InvalidSerializedDataError:
+                success = True
+
+            self.assertTrue(success)
+
+    def __getTable(self, env={}):
+        """
+        Return a resolved table created from the complex json file.
+
+        @private
+        """
+        loader = JsonLoader()
+        loader.addFromJsonFile(self.__complexJsonFile)
+
+        return loader.resolvedTable(env)
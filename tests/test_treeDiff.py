@@ -0,0 +1,147 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from bver import TreeDiff, DiffEntry, Mirror
+from bver.Loader import JsonLoader
+
+class TestTreeDiff(unittest.TestCase):
+    """Test tree diff object."""
+
+    __rootPath = os.path.dirname(os.path.dirname(__file__))
+    __jsonDirectory = os.path.join(__rootPath, 'data', 'json')
+    __jsonSplitVersionsDirectory = os.path.join(__rootPath, 'data', 'jsonSplitVersions')
+
+    def setUp(self):
+        """Create two copies of the config tree."""
+        temporaryDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temporaryDirectory)
+
+        self.leftDirectory = os.path.join(temporaryDirectory, 'left')
+        self.rightDirectory = os.path.join(temporaryDirectory, 'right')
+        for directory in [self.leftDirectory, self.rightDirectory]:
+            shutil.copytree(self.__jsonDirectory, directory)
+            shutil.copytree(self.__jsonSplitVersionsDirectory, os.path.join(directory, 'split'))
+
+    def test_identicalTrees(self):
+        """Should not report differences for identical trees."""
+        treeDiff = TreeDiff([self.leftDirectory], [self.rightDirectory])
+
+        self.assertListEqual(treeDiff.changedFiles(), [])
+        self.assertListEqual(treeDiff.softwareNames(), [])
+        self.assertListEqual(treeDiff.diff(), [])
+        self.assertListEqual(treeDiff.envDiff(), [])
+
+    def test_diff(self):
+        """Should report the softwares, addons and options that changed."""
+        self.__updateFile('complex.json', lambda x: x.update({'c': '2.0.0'}))
+        self.__updateFile('externalAddons.json', lambda x: x['f']['options'].update({'foo': 11, 'bar': True}))
+        self.__updateFile('simple.json', lambda x: x.update({'g': '1.0.0'}))
+
+        treeDiff = TreeDiff([self.leftDirectory], [self.rightDirectory])
+
+        self.assertListEqual(
+            treeDiff.changedFiles(),
+            ['0/complex.json', '0/externalAddons.json', '0/simple.json']
+        )
+        self.assertListEqual(
+            treeDiff.diff(),
+            [
+                DiffEntry('c', None, None, 'changed', '1.0.0', '2.0.0'),
+                DiffEntry('e', 'c', None, 'changed', '1.0.0', '2.0.0'),
+                DiffEntry('f', None, 'bar', 'added', None, True),
+                DiffEntry('f', None, 'foo', 'changed', 10, 11),
+                DiffEntry('f', 'c', None, 'changed', '1.0.0', '2.0.0'),
+                DiffEntry('g', None, None, 'added', None, '1.0.0')
+            ]
+        )
+        self.assertListEqual(
+            treeDiff.envDiff(),
+            [
+                ('BVER_C_VERSION', '1.0.0', '2.0.0'),
+                ('BVER_E_C_VERSION', '1.0.0', '2.0.0'),
+                ('BVER_F_C_VERSION', '1.0.0', '2.0.0'),
+                ('BVER_G_VERSION', None, '1.0.0')
+            ]
+        )
+        self.assertEqual(str(treeDiff.diff()[0]), 'changed: c: "1.0.0" -> "2.0.0"')
+
+    def test_diffOnlyParsesChangedFiles(self):
+        """Should only compare the softwares affected by the changed files."""
+        self.__updateFile('simple.json', lambda x: x.update({'b': '2.0.0'}))
+
+        treeDiff = TreeDiff([self.leftDirectory], [self.rightDirectory])
+
+        self.assertListEqual(treeDiff.softwareNames(), ['a', 'b', 'f'])
+        self.assertListEqual(
+            treeDiff.diff(),
+            [DiffEntry('b', None, None, 'changed', '1.1.0', '2.0.0')]
+        )
+
+    def test_diffVersionFiles(self):
+        """Should report the changes done to the version files."""
+        self.__updateFile(
+            os.path.join('split', 'activeVersion.versions', '16.4.200.json'),
+            lambda x: x.update({'options': {'foo': 1}})
+        )
+        self.assertListEqual(
+            TreeDiff([self.leftDirectory], [self.rightDirectory], recursive=True).diff(),
+            []
+        )
+
+        self.__updateFile(
+            os.path.join('split', 'activeVersion.versions', '17.5.391.json'),
+            lambda x: x.update({'options': {'foo': 1}})
+        )
+        treeDiff = TreeDiff([self.leftDirectory], [self.rightDirectory], recursive=True)
+
+        self.assertListEqual(
+            treeDiff.changedFiles(),
+            [
+                '0/split/activeVersion.versions/16.4.200.json',
+                '0/split/activeVersion.versions/17.5.391.json'
+            ]
+        )
+        self.assertListEqual(
+            treeDiff.diff(),
+            [DiffEntry('activeVersion', None, 'foo', 'added', None, 1)]
+        )
+
+    def test_diffManifests(self):
+        """Should use the published manifests verified against the files to compare the trees."""
+        Mirror.writeManifest(self.leftDirectory)
+        Mirror.writeManifest(self.rightDirectory)
+
+        # only the files that cannot be verified are hashed
+        with mock.patch.object(Mirror, 'checksum', wraps=Mirror.checksum) as checksum:
+            self.assertListEqual(TreeDiff([self.leftDirectory], [self.rightDirectory]).diff(), [])
+        self.assertEqual(checksum.call_count, 0)
+
+        # changes done after publishing are noticed
+        self.__updateFile('simple.json', lambda x: x.update({'b': '2.0.0'}))
+        with mock.patch.object(Mirror, 'checksum', wraps=Mirror.checksum) as checksum:
+            self.assertEqual(len(TreeDiff([self.leftDirectory], [self.rightDirectory]).diff()), 1)
+        self.assertEqual(checksum.call_count, 1)
+
+        Mirror.writeManifest(self.rightDirectory)
+        self.assertEqual(len(TreeDiff([self.leftDirectory], [self.rightDirectory]).diff()), 1)
+
+        # the trees are only read
+        for directory in [self.leftDirectory, self.rightDirectory]:
+            self.assertFalse(os.path.exists(os.path.join(directory, JsonLoader.indexName)))
+
+    def __updateFile(self, fileName, update):
+        """
+        Update the contents of a json file from the right tree.
+
+        @private
+        """
+        filePath = os.path.join(self.rightDirectory, fileName)
+        with open(filePath) as f:
+            contents = json.load(f)
+
+        update(contents)
+        with open(filePath, 'w') as f:
+            json.dump(contents, f)